@@ -1,32 +1,82 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
-from typing import Optional
-from langchain_core.messages import HumanMessage
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field, HttpUrl
+from starlette.background import BackgroundTask
+from typing import TYPE_CHECKING, List, Literal, Optional, Tuple, Union
 from contextlib import asynccontextmanager
+import asyncio
+import json
 import logging
+import time
+import uuid
 
-from config import DEFAULT_TOP_N
-from src.state import AgentState
-from src.graph import build_agent_graph
+from config import (
+    ANTHROPIC_API_KEY,
+    BATCH_MAX_CONCURRENCY,
+    BATCH_MAX_SUMMARIES,
+    DATA_LOAD_MODE,
+    DEFAULT_RANKING_METRIC,
+    DEFAULT_TOP_N,
+    FAST_START,
+    GENERATION_MODE,
+    INGEST_MAX_VIDEOS,
+    JOB_WORKERS,
+    MAX_TOP_N,
+    PATTERN_CACHE_WARMUP_CHANNELS,
+    REQUEST_DEADLINE,
+)
+from src.admission import AdmissionRejected, admission
+from src.cache import pattern_cache
+from src.jobs import JobFailed, JobRunner, check_webhook_url, job_queue, job_view
+from src.summary_cache import summary_cache
+from src.llm_client import llm_client_pool, llm_limiter, llm_usage
+from src.metrics import RequestTimings, http_request_seconds, metrics, request_timings
+from src.retry import llm_circuit_breaker, retry_stats
+from src.runtime import runtime
+from src.singleflight import pattern_analysis_flight, title_request_flight
+
+# The graph, state and data modules import pandas, LangGraph, LangChain and the Anthropic SDK;
+# they are imported where used, once the runtime has loaded them (src/runtime.py)
+if TYPE_CHECKING:
+    from src.state import AgentState
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
-agent_graph = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan event handler"""
-    # Startup
-    global agent_graph
-    logger.info("Building agent graph...")
-    agent_graph = build_agent_graph()
-    logger.info("Agent graph ready!")
+    # Startup: load the dataset and build the graphs; with FAST_START serve while they load
+    runtime.start()
+    if not FAST_START:
+        await runtime.wait()
+
+    # Drain jobs queued before a restart as well as new ones
+    job_runner.start()
+
+    warmup_task = None
+    if DATA_LOAD_MODE != "streaming" and ANTHROPIC_API_KEY and PATTERN_CACHE_WARMUP_CHANNELS > 0:
+        warmup_task = asyncio.create_task(warm_up())
 
     yield
 
     # Shutdown (cleanup if needed)
     logger.info("Shutting down...")
+    if warmup_task is not None:
+        warmup_task.cancel()
+    await job_runner.stop()
+    runtime.close()
+    await llm_client_pool.aclose()
+
+
+async def warm_up() -> None:
+    """Warm the pattern cache of the busiest channels once the runtime has loaded"""
+    await runtime.wait()
+    from src.warmup import warm_pattern_cache
+
+    logger.info(f"Warming pattern cache for {PATTERN_CACHE_WARMUP_CHANNELS} channels...")
+    await warm_pattern_cache()
 
 
 app = FastAPI(
@@ -36,12 +86,94 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Existing stats objects, exported on /metrics at scrape time
+metrics.register_stats("pattern_cache", pattern_cache.stats, counters=("hits", "misses"))
+metrics.register_stats(
+    "summary_cache",
+    summary_cache.stats,
+    counters=("exact_hits", "near_hits", "misses", "evictions"),
+)
+metrics.register_stats("llm_limiter", llm_limiter.stats, counters=("total_calls",))
+metrics.register_stats(
+    "llm_usage",
+    llm_usage.stats,
+    counters=(
+        "calls",
+        "input_tokens",
+        "output_tokens",
+        "cache_read_input_tokens",
+        "cache_creation_input_tokens",
+    ),
+)
+metrics.register_stats("llm_retry", retry_stats.stats, counters=retry_stats.FIELDS)
+metrics.register_stats(
+    "llm_circuit", llm_circuit_breaker.stats, counters=("times_opened", "rejected_calls")
+)
+metrics.register_stats("jobs", job_queue.stats)
+metrics.register_stats("checkpoints", runtime.checkpoint_stats, counters=("checkpoints_written",))
+metrics.register_stats("startup", runtime.stats)
+metrics.register_stats("admission", admission.stats, counters=("admitted", "rejected", "timed_out"))
+for name, flight in (("pattern", pattern_analysis_flight), ("title", title_request_flight)):
+    metrics.register_stats(
+        f"singleflight_{name}", flight.stats, counters=("executions", "coalesced")
+    )
+
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    """Record the wall time of every request by route"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        http_request_seconds.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            path=route.path if route is not None else "unmatched",
+            status=status,
+        )
+
 
 # Request/Response Models
+RankingMetric = Literal["views", "outliers"]
+GenerationMode = Literal["separate", "fused", "fast"]
+Priority = Literal["interactive", "batch"]
+DEADLINE_DESCRIPTION = f"Time budget in seconds for all LLM calls (default {REQUEST_DEADLINE:g})"
+TIMINGS_DESCRIPTION = "Add per-node and per-LLM-call timings to the response metadata"
+MODE_DESCRIPTION = (
+    "separate: one LLM call for the pattern analysis and one for the titles; "
+    "fused: a single call returning both (one round trip when the analysis is not cached); "
+    "fast: local title statistics instead of the LLM analysis, then one call for the titles"
+)
+PRIORITY_DESCRIPTION = (
+    "Admission priority when the server is busy: interactive requests are admitted "
+    "before batch traffic"
+)
+RANKING_METRIC_DESCRIPTION = (
+    "How top performers are chosen: by views, or only the statistical outliers among them"
+)
+
+
 class TitleRequest(BaseModel):
     channel_id: str = Field(..., description="YouTube channel ID")
     summary: str = Field(..., description="Video summary")
-    top_n: Optional[int] = Field(DEFAULT_TOP_N, ge=5, le=50)
+    top_n: Optional[int] = Field(DEFAULT_TOP_N, ge=5, le=MAX_TOP_N)
+    ranking_metric: RankingMetric = Field(
+        DEFAULT_RANKING_METRIC, description=RANKING_METRIC_DESCRIPTION
+    )
+    mode: GenerationMode = Field(GENERATION_MODE, description=MODE_DESCRIPTION)
+    priority: Priority = Field("interactive", description=PRIORITY_DESCRIPTION)
+    deadline_seconds: Optional[float] = Field(None, gt=0, le=600, description=DEADLINE_DESCRIPTION)
+    include_timings: bool = Field(False, description=TIMINGS_DESCRIPTION)
+
+
+class RetryRequest(BaseModel):
+    deadline_seconds: Optional[float] = Field(None, gt=0, le=600, description=DEADLINE_DESCRIPTION)
+    include_timings: bool = Field(False, description=TIMINGS_DESCRIPTION)
 
 
 class TitleResponse(BaseModel):
@@ -52,6 +184,86 @@ class TitleResponse(BaseModel):
     metadata: dict
 
 
+class BatchTitleRequest(BaseModel):
+    channel_id: str = Field(..., description="YouTube channel ID")
+    summaries: List[str] = Field(
+        ..., min_length=1, max_length=BATCH_MAX_SUMMARIES, description="Video summaries"
+    )
+    top_n: Optional[int] = Field(DEFAULT_TOP_N, ge=5, le=MAX_TOP_N)
+    ranking_metric: RankingMetric = Field(
+        DEFAULT_RANKING_METRIC, description=RANKING_METRIC_DESCRIPTION
+    )
+    priority: Priority = Field("batch", description=PRIORITY_DESCRIPTION)
+    deadline_seconds: Optional[float] = Field(None, gt=0, le=600, description=DEADLINE_DESCRIPTION)
+    include_timings: bool = Field(False, description=TIMINGS_DESCRIPTION)
+
+
+class BatchTitleItem(BaseModel):
+    index: int
+    summary: str
+    status: str  # "ok" or "error"
+    generated_titles: str = ""
+    cached: bool = False  # titles reused from a near-duplicate summary
+    error: Optional[str] = None
+
+
+class BatchTitleResponse(BaseModel):
+    channel_id: str
+    pattern_analysis: str
+    results: List[BatchTitleItem]
+    metadata: dict
+
+
+class JobRequest(TitleRequest):
+    priority: Priority = Field("batch", description=PRIORITY_DESCRIPTION)
+    # A job's lease outlives its deadline, so the deadline is capped to keep leases short
+    deadline_seconds: Optional[float] = Field(
+        None, gt=0, le=REQUEST_DEADLINE, description=DEADLINE_DESCRIPTION
+    )
+    webhook_url: Optional[HttpUrl] = Field(
+        None,
+        description="https URL on a public host that receives the job (as JSON) once it finishes",
+    )
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: str  # queued | running | succeeded | failed | expired
+    attempts: int
+    max_attempts: int
+    created_at: float
+    updated_at: float
+    expires_at: float
+    result: Optional[TitleResponse] = None
+    error: Optional[str] = None  # error of the last failed attempt
+    webhook_status: Optional[str] = None  # delivered | failed
+
+
+class VideoRecord(BaseModel):
+    channel_id: str = Field(..., description="YouTube channel ID")
+    video_id: str = Field(..., description="YouTube video ID")
+    views_in_period: int = Field(..., ge=0, description="Current 28-day views")
+    title: Optional[str] = Field(None, description="Required for videos not yet in the dataset")
+    summary: Optional[str] = None
+
+
+class IngestRequest(BaseModel):
+    videos: List[VideoRecord] = Field(..., min_length=1, max_length=INGEST_MAX_VIDEOS)
+
+
+class IngestedChannel(BaseModel):
+    channel_id: str
+    top_changed_at: Optional[int]  # first rank whose video changed; None if unchanged
+    pattern_analyses_invalidated: int
+    titles_invalidated: int
+
+
+class IngestResponse(BaseModel):
+    dataset_version: str
+    videos: int
+    channels: List[IngestedChannel]
+
+
 @app.get("/")
 async def root():
     return {"message": "YouTube Title Optimizer API", "status": "healthy"}
@@ -59,50 +271,549 @@ async def root():
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy", "graph_ready": agent_graph is not None}
+    # A failed load is retried by the next request that needs the runtime
+    return {
+        "status": "degraded" if runtime.load_error else "healthy",
+        "graph_ready": runtime.is_ready,
+        "dataset_version": dataset_version(),
+        "load_error": runtime.load_error,
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus text format metrics: node/LLM/HTTP latencies, tokens, caches, retries"""
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/stats")
+async def stats():
+    return {
+        "pattern_cache": pattern_cache.stats(),
+        "summary_cache": summary_cache.stats(),
+        "llm_pool": llm_client_pool.stats(),
+        "llm_limiter": llm_limiter.stats(),
+        "llm_usage": llm_usage.stats(),
+        "llm_retry": {**retry_stats.stats(), "circuit": llm_circuit_breaker.stats()},
+        "singleflight": {
+            "pattern_analysis": pattern_analysis_flight.stats(),
+            "title_requests": title_request_flight.stats(),
+        },
+        "jobs": await asyncio.to_thread(job_queue.stats),
+        "admission": admission.stats(),
+        "checkpoints": runtime.checkpoint_stats(),
+        "startup": runtime.stats(),
+    }
+
+
+def dataset_version() -> Optional[str]:
+    """Version of the resident dataset, None until it is loaded"""
+    if not runtime.is_ready:
+        return None
+    from src.data_store import data_store
+
+    return data_store.version if data_store.is_loaded else None
+
+
+def client_id(http_request: Request) -> str:
+    """Identity of the caller for fair admission: X-Client-ID, else the remote address"""
+    client = http_request.headers.get("x-client-id")
+    if client:
+        return client
+    return http_request.client.host if http_request.client else "unknown"
+
+
+def server_busy(error: AdmissionRejected) -> HTTPException:
+    """429 response for a request that was not admitted"""
+    return HTTPException(
+        status_code=429, detail=str(error), headers={"Retry-After": str(error.retry_after)}
+    )
+
+
+def request_deadline(request: Union[TitleRequest, BatchTitleRequest]) -> float:
+    """Unix timestamp by which the request's LLM calls must finish"""
+    return time.time() + (request.deadline_seconds or REQUEST_DEADLINE)
+
+
+def initial_state(request: TitleRequest) -> "AgentState":
+    """Build the graph input for a title request"""
+    from langchain_core.messages import HumanMessage
+    from src.state import AgentState
+
+    return AgentState(
+        messages=[HumanMessage(content="Generate titles")],
+        channel_id=request.channel_id,
+        top_n=request.top_n,
+        ranking_metric=request.ranking_metric,
+        new_video_summary=request.summary,
+        deadline=request_deadline(request),
+    )
+
+
+def request_timing_summary(
+    request: Union[TitleRequest, BatchTitleRequest], timings: RequestTimings
+) -> Optional[dict]:
+    """The request's timing breakdown if it asked for one"""
+    return timings.summary() if request.include_timings else None
+
+
+def title_request_key(request: TitleRequest) -> tuple:
+    """Identity of a title request's result, for coalescing identical requests"""
+    return (
+        request.channel_id,
+        request.summary,
+        request.top_n,
+        request.ranking_metric,
+        request.mode,
+        dataset_version() or "",
+    )
+
+
+def title_graph(request: TitleRequest):
+    """The compiled graph for the request's generation mode"""
+    return runtime.graph(request.mode)
+
+
+def run_config(run_id: str, request: TitleRequest, **configurable) -> dict:
+    """Graph config of a checkpointed run; its metadata records how to resume it"""
+    return {
+        "configurable": {"thread_id": run_id, **configurable},
+        "metadata": {"mode": request.mode, "priority": request.priority},
+    }
+
+
+async def run_title_graph(request: TitleRequest, run_id: str) -> Tuple[dict, dict, str]:
+    """Run the agent graph for a request and return the final state, timings and run ID"""
+    with request_timings() as timings:
+        result = await title_graph(request).ainvoke(
+            initial_state(request), run_config(run_id, request)
+        )
+    return result, timings.summary(), run_id
+
+
+async def resume_title_graph(
+    request: TitleRequest, run_id: str
+) -> Tuple[dict, dict, Optional[str]]:
+    """
+    Resume a checkpointed run from the node after its last completed one.
+
+    The data loading, ranking and analysis a failed run already did are not
+    repeated. The resumed nodes get a new deadline.
+
+    Args:
+        request: The run's request, rebuilt from its checkpoint
+        run_id: ID of the run
+
+    Returns:
+        Tuple of (final state, timings, node the run resumed at or None if it
+        had already finished with titles)
+    """
+    from src.graph import resume_point
+
+    graph = title_graph(request)
+    config = run_config(run_id, request)
+    with request_timings() as timings:
+        snapshot = await resume_point(graph, config)
+        if snapshot is None:
+            result = (await graph.aget_state(config)).values
+        else:
+            # Forks the run at that checkpoint; the metadata carries over to the new branch
+            metadata = config["metadata"]
+            update = {"deadline": request_deadline(request)}
+            config = await graph.aupdate_state({**snapshot.config, "metadata": metadata}, update)
+            result = await graph.ainvoke(None, {**config, "metadata": metadata})
+    return result, timings.summary(), snapshot.next[0] if snapshot else None
+
+
+async def run_admitted_title_graph(
+    request: TitleRequest, client: str, run_id: str
+) -> Tuple[dict, dict, str]:
+    """Wait for admission, then run the agent graph; the deadline starts once admitted"""
+    async with admission.admit(request.priority, client, request.channel_id):
+        return await run_title_graph(request, run_id)
+
+
+def average(top_performers: List[dict], key: str) -> float:
+    """Mean of one field of the top performer records (0 if there are none)"""
+    if not top_performers:
+        return 0.0
+    return sum(video[key] for video in top_performers) / len(top_performers)
+
+
+def build_title_response(
+    request: TitleRequest,
+    result: dict,
+    timings: Optional[dict] = None,
+    run_id: Optional[str] = None,
+) -> TitleResponse:
+    """Turn the final graph state into a TitleResponse"""
+    metadata = {
+        "top_n": request.top_n,
+        "ranking_metric": request.ranking_metric,
+        "mode": request.mode,
+        "total_videos": result["total_videos"],
+        "avg_views": int(average(result["top_performers"], "views_in_period")),
+        "avg_median_ratio": round(average(result["top_performers"], "median_ratio"), 2),
+        "dataset_version": result["dataset_version"],
+        "patterns_cached": result["patterns_cached"],
+        "titles_cached": result["titles_cached"],
+        "run_id": run_id,
+    }
+    if timings is not None:
+        metadata["timings"] = timings
+
+    return TitleResponse(
+        channel_id=request.channel_id,
+        summary=request.summary,
+        pattern_analysis=result["title_patterns"].strip(),
+        generated_titles=result["generated_titles"].strip(),
+        metadata=metadata,
+    )
+
+
+def sse_event(event: str, data: dict) -> str:
+    """Format a server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 
 @app.post("/generate-titles", response_model=TitleResponse)
-async def generate_titles(request: TitleRequest):
+async def generate_titles(request: TitleRequest, http_request: Request):
     """Generate optimized YouTube titles"""
     try:
-        # Run agent graph
-        result = agent_graph.invoke(
+        await runtime.wait()
+        # Run agent graph; identical concurrent requests share one run (and one admission)
+        client = client_id(http_request)
+        run_id = uuid.uuid4().hex
+        (result, timings, run_id), coalesced = await title_request_flight.do(
+            title_request_key(request), lambda: run_admitted_title_graph(request, client, run_id)
+        )
+        response = build_title_response(
+            request, result, timings if request.include_timings else None, run_id
+        )
+        response.metadata["coalesced"] = coalesced
+        return response
+
+    except AdmissionRejected as e:
+        raise server_busy(e)
+    except Exception as e:
+        logger.error(f"Error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/generate-titles/stream")
+async def generate_titles_stream(request: TitleRequest, http_request: Request):
+    """
+    Generate titles as a server-sent event stream.
+
+    Events: "progress" after each graph node, "token" for each Claude text
+    delta (with its stage), "retry" when a Claude call is retried, then a
+    final "result" (TitleResponse) or "error".
+    """
+    await runtime.wait()
+    # Admitted before the response starts so a busy server can still answer 429;
+    # the slot is held until the stream ends
+    slot = admission.admit(request.priority, client_id(http_request), request.channel_id)
+    try:
+        await slot.__aenter__()
+    except AdmissionRejected as e:
+        raise server_busy(e)
+    released = False
+
+    async def release_slot():
+        # Called when the stream ends and again as the response's background task,
+        # which also runs if the client left before the stream started
+        nonlocal released
+        if not released:
+            released = True
+            await slot.__aexit__(None, None, None)
+
+    run_id = uuid.uuid4().hex
+
+    async def events():
+        result = None
+        try:
+            with request_timings() as timings:
+                async for mode, chunk in title_graph(request).astream(
+                    initial_state(request),
+                    config=run_config(run_id, request, stream_tokens=True),
+                    stream_mode=["updates", "custom", "values"],
+                ):
+                    if mode == "custom":
+                        yield sse_event(chunk["type"], chunk)
+                    elif mode == "updates":
+                        for node, update in chunk.items():
+                            messages = (update or {}).get("messages") or []
+                            message = messages[-1].content if messages else ""
+                            yield sse_event("progress", {"node": node, "message": message})
+                    else:
+                        result = chunk
+
+            response = build_title_response(
+                request, result, request_timing_summary(request, timings), run_id
+            )
+            yield sse_event("result", response.model_dump())
+
+        except Exception as e:
+            logger.error(f"Error: {str(e)}")
+            yield sse_event("error", {"detail": str(e), "run_id": run_id})
+        finally:
+            await release_slot()
+
+    try:
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            background=BackgroundTask(release_slot),
+        )
+    except BaseException:
+        await release_slot()
+        raise
+
+
+@app.post("/generate-titles/batch", response_model=BatchTitleResponse)
+async def generate_titles_batch(request: BatchTitleRequest, http_request: Request):
+    """
+    Generate titles for many summaries of one channel.
+
+    The channel is loaded, ranked and analyzed once; title generation then
+    fans out over the summaries with bounded parallelism. Failures are
+    reported per item instead of failing the whole batch. The batch takes
+    one admission slot.
+    """
+    await runtime.wait()
+    try:
+        async with admission.admit(request.priority, client_id(http_request), request.channel_id):
+            with request_timings() as timings:
+                return await _generate_titles_batch(request, timings)
+    except AdmissionRejected as e:
+        raise server_busy(e)
+
+
+async def _generate_titles_batch(
+    request: BatchTitleRequest, timings: RequestTimings
+) -> BatchTitleResponse:
+    from langchain_core.messages import HumanMessage
+    from src.agents import agenerate_titles_node
+    from src.state import AgentState
+
+    try:
+        analysis = await runtime.graph("analysis").ainvoke(
             AgentState(
-                messages=[HumanMessage(content="Generate titles")],
+                messages=[HumanMessage(content="Analyze channel")],
                 channel_id=request.channel_id,
                 top_n=request.top_n,
-                new_video_summary=request.summary,
+                ranking_metric=request.ranking_metric,
+                deadline=request_deadline(request),
             )
         )
+    except Exception as e:
+        logger.error(f"Error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not analysis["title_patterns"]:
+        detail = analysis["messages"][-1].content if analysis["messages"] else "Analysis failed"
+        raise HTTPException(status_code=502, detail=detail)
+
+    analyzed_state = AgentState(**analysis)
+    semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
 
-        # Extract text from messages
-        pattern_analysis = ""
-        generated_titles = ""
-
-        for msg in result["messages"]:
-            content = msg.content
-            if "Pattern Analysis:" in content:
-                pattern_analysis = content.split("Pattern Analysis:")[1].strip()
-            elif "Generated Title Options:" in content:
-                generated_titles = content.split("Generated Title Options:")[1].strip()
-
-        return TitleResponse(
-            channel_id=request.channel_id,
-            summary=request.summary,
-            pattern_analysis=pattern_analysis,
-            generated_titles=generated_titles,
-            metadata={
-                "top_n": request.top_n,
-                "total_videos": len(result["raw_data"]) if result["raw_data"] is not None else 0,
-                "avg_views": int(result["top_performers"]["views_in_period"].mean()),
-            },
+    async def generate(index: int, summary: str) -> BatchTitleItem:
+        async with semaphore:
+            try:
+                state = analyzed_state.model_copy(update={"new_video_summary": summary})
+                update = await agenerate_titles_node(state)
+            except Exception as e:
+                logger.error(f"Batch item {index} failed: {str(e)}")
+                return BatchTitleItem(index=index, summary=summary, status="error", error=str(e))
+
+        if not update.get("generated_titles"):
+            return BatchTitleItem(
+                index=index,
+                summary=summary,
+                status="error",
+                error=update["messages"][-1].content,
+            )
+        return BatchTitleItem(
+            index=index,
+            summary=summary,
+            status="ok",
+            generated_titles=update["generated_titles"],
+            cached=update["titles_cached"],
         )
 
+    results = await asyncio.gather(
+        *(generate(index, summary) for index, summary in enumerate(request.summaries))
+    )
+    succeeded = sum(item.status == "ok" for item in results)
+
+    metadata = {
+        "top_n": request.top_n,
+        "ranking_metric": request.ranking_metric,
+        "total_videos": analysis["total_videos"],
+        "avg_views": int(average(analysis["top_performers"], "views_in_period")),
+        "avg_median_ratio": round(average(analysis["top_performers"], "median_ratio"), 2),
+        "dataset_version": analysis["dataset_version"],
+        "patterns_cached": analysis["patterns_cached"],
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "titles_cached": sum(item.cached for item in results),
+    }
+    if request.include_timings:
+        metadata["timings"] = timings.summary()
+
+    return BatchTitleResponse(
+        channel_id=request.channel_id,
+        pattern_analysis=analysis["title_patterns"],
+        results=results,
+        metadata=metadata,
+    )
+
+
+def run_error(result: dict) -> str:
+    """The error of a run without titles: its first error message, else its last message"""
+    messages = [message.content for message in result["messages"]]
+    return next((m for m in messages if m.startswith("Error")), messages[-1])
+
+
+async def run_job(job: dict) -> dict:
+    """Run a queued title request; a run without titles counts as a failed attempt"""
+    await runtime.wait()
+    from src.checkpoints import checkpointer
+
+    title_request = TitleRequest(**job["request"])
+    # Not admitted in time counts as a failed attempt, retried with backoff
+    async with admission.admit(title_request.priority, "jobs", title_request.channel_id):
+        # The job ID is the run ID, so a retried attempt resumes where the last one failed
+        run = {"configurable": {"thread_id": job["id"]}}
+        if job["attempts"] > 1 and await checkpointer.aget_tuple(run) is not None:
+            result, timings, _ = await resume_title_graph(title_request, job["id"])
+        else:
+            result, timings, _ = await run_title_graph(title_request, job["id"])
+    if not result.get("generated_titles"):
+        raise JobFailed(run_error(result))
+    return build_title_response(
+        title_request, result, timings if title_request.include_timings else None, job["id"]
+    ).model_dump()
+
+
+job_runner = JobRunner(job_queue, run_job, lease=REQUEST_DEADLINE + 60, workers=JOB_WORKERS)
+
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def submit_job(request: JobRequest):
+    """
+    Queue a title request and return its job ID at once.
+
+    Poll GET /jobs/{job_id} for the result, or pass webhook_url to have the
+    finished job posted to it. Queued jobs survive a restart; failed attempts
+    are retried, and jobs not started within their TTL expire.
+    """
+    webhook_url = str(request.webhook_url) if request.webhook_url else None
+    if webhook_url:
+        try:
+            await asyncio.to_thread(check_webhook_url, webhook_url)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    job = await asyncio.to_thread(
+        job_queue.submit, request.model_dump(exclude={"webhook_url"}), webhook_url
+    )
+    job_runner.notify()
+    return job_view(job)
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Status of a job, with its result once it succeeded"""
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job_view(job)
+
+
+@app.post("/runs/{run_id}/retry", response_model=TitleResponse)
+async def retry_run(run_id: str, http_request: Request, request: Optional[RetryRequest] = None):
+    """
+    Retry a run (metadata.run_id of a title response) from its last completed node.
+
+    A run that failed in title generation reuses its data, ranking and
+    pattern analysis; a run that already succeeded returns its result.
+    """
+    await runtime.wait()
+    from src.checkpoints import checkpointer
+
+    request = request or RetryRequest()
+    config = {"configurable": {"thread_id": run_id}}
+    latest = await checkpointer.aget_tuple(config)
+    if latest is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired run {run_id}")
+
+    # Both graphs share the AgentState channels, so either reads the run's request fields
+    values = (await runtime.graph("separate").aget_state(config)).values
+    title_request = TitleRequest(
+        channel_id=values["channel_id"],
+        summary=values["new_video_summary"],
+        top_n=values["top_n"],
+        ranking_metric=values["ranking_metric"],
+        mode=latest.metadata.get("mode", "separate"),
+        priority=latest.metadata.get("priority", "interactive"),
+        **request.model_dump(),
+    )
+    try:
+        async with admission.admit(
+            title_request.priority, client_id(http_request), title_request.channel_id
+        ):
+            result, timings, resumed_from = await resume_title_graph(title_request, run_id)
+    except AdmissionRejected as e:
+        raise server_busy(e)
     except Exception as e:
         logger.error(f"Error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+    response = build_title_response(
+        title_request, result, timings if title_request.include_timings else None, run_id
+    )
+    response.metadata["resumed_from"] = resumed_from
+    return response
+
+
+@app.post("/ingest", response_model=IngestResponse)
+async def ingest(request: IngestRequest):
+    """
+    Append new videos or update view counts without reloading the dataset.
+
+    Only the affected channels are re-ranked, and only results derived from
+    channels whose top videos changed are invalidated. Records are persisted
+    to an append log replayed on startup and picked up by other workers.
+    """
+    if DATA_LOAD_MODE == "streaming":
+        raise HTTPException(status_code=409, detail="Ingestion needs DATA_LOAD_MODE=resident")
+
+    await runtime.wait()
+    from src.data_store import data_store
+    from src.ingest import invalidate_derived
+
+    records = [video.model_dump(exclude_none=True) for video in request.videos]
+    try:
+        changes = await asyncio.to_thread(data_store.ingest, records)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    invalidated = invalidate_derived(changes)
+    return IngestResponse(
+        dataset_version=data_store.version,
+        videos=len(records),
+        channels=[
+            IngestedChannel(channel_id=channel_id, **result)
+            for channel_id, result in invalidated.items()
+        ],
+    )
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,132 @@
+"""
+Compare per-request channel loading from the CSV against the columnar Arrow file.
+
+Each mode runs in a fresh subprocess so RSS numbers are not polluted by the
+other mode. The "csv" mode reproduces the original retriever (parse the whole
+CSV, then mask by channel_id); the "columnar" mode memory-maps the Arrow file
+and materializes only the requested columns of one channel's row range.
+
+Usage:
+    python -m benchmarks.bench_data_load
+    python -m benchmarks.bench_data_load --csv big.csv --arrow big.arrow --requests 20
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from config import DATA_PATH
+
+COLUMNS = ["channel_id", "video_id", "title", "summary", "views_in_period"]
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB (Linux)"""
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / 1024**2
+
+
+def run_mode(mode: str, csv_path: str, arrow_path: str, sample: list) -> dict:
+    """Load each channel in `sample` in the given mode and report timings"""
+    import pandas as pd
+
+    baseline_rss = current_rss_mb()
+
+    timings = []
+    open_time = 0.0
+    if mode == "csv":
+        for channel_id in sample:
+            start = time.perf_counter()
+            df = pd.read_csv(csv_path)
+            df[df["channel_id"] == channel_id][COLUMNS]
+            timings.append(time.perf_counter() - start)
+    else:
+        from src.columnar import ColumnarDataset
+
+        start = time.perf_counter()
+        dataset = ColumnarDataset(arrow_path)
+        open_time = time.perf_counter() - start
+        for channel_id in sample:
+            start = time.perf_counter()
+            dataset.read_channel(channel_id, COLUMNS)
+            timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    return {
+        "mode": mode,
+        "open_s": open_time,
+        "mean_ms": 1000 * sum(timings) / len(timings),
+        "p50_ms": 1000 * timings[len(timings) // 2],
+        "max_ms": 1000 * timings[-1],
+        "rss_mb": current_rss_mb(),
+        "rss_delta_mb": current_rss_mb() - baseline_rss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CSV vs columnar channel loading")
+    parser.add_argument("--csv", default=DATA_PATH, help="Source CSV")
+    parser.add_argument("--arrow", default=None, help="Arrow file (converted if missing)")
+    parser.add_argument("--requests", type=int, default=10, help="Channel loads per mode")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mode", choices=["csv", "columnar"], help=argparse.SUPPRESS)
+    parser.add_argument("--channels", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        # Child process: run a single mode and print the result as JSON
+        sample = json.loads(args.channels)
+        print(json.dumps(run_mode(args.mode, args.csv, args.arrow, sample)))
+        return
+
+    from src.columnar import ColumnarDataset, write_columnar
+
+    arrow_path = args.arrow
+    if arrow_path is None or not os.path.exists(arrow_path):
+        arrow_path = arrow_path or os.path.join(tempfile.mkdtemp(), "bench.arrow")
+        write_columnar(args.csv, arrow_path)
+
+    # Sample the same channels for both modes
+    channel_ids = sorted(ColumnarDataset(arrow_path).index)
+    rng = random.Random(args.seed)
+    sample = [rng.choice(channel_ids) for _ in range(args.requests)]
+
+    print(f"Dataset: {args.csv} ({os.path.getsize(args.csv) / 1024**2:.1f} MB CSV)")
+    print(
+        f"{'mode':<10} {'open_s':>8} {'mean_ms':>10} {'p50_ms':>10} {'max_ms':>10} "
+        f"{'rss_mb':>8} {'rss_delta_mb':>13}"
+    )
+    for mode in ("csv", "columnar"):
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.bench_data_load",
+                "--mode",
+                mode,
+                "--csv",
+                args.csv,
+                "--arrow",
+                arrow_path,
+                "--channels",
+                json.dumps(sample),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        r = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{r['mode']:<10} {r['open_s']:>8.3f} {r['mean_ms']:>10.2f} {r['p50_ms']:>10.2f} "
+            f"{r['max_ms']:>10.2f} {r['rss_mb']:>8.1f} {r['rss_delta_mb']:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Micro-benchmarks of the pipeline stages and full agent graph runs.
+
+Micro-benchmarks time each stage in isolation on one channel:
+load_channel_data_node, identify_top_performers_node (per ranking metric),
+format_titles_with_views and rendering of both prompts. Graph benchmarks run
+the whole agent graph against the fake LLM backend, sequentially and with
+concurrent ainvoke calls, with the pattern cache cleared before every run,
+in each generation mode (separate analysis and title calls, one fused call, or
+local title statistics and one title call).
+
+Generate a large dataset first to see how stages scale:
+    python -m scripts.generate_synthetic_data --rows 1000000 --output /tmp/synth.csv
+
+Usage:
+    python -m benchmarks.bench_nodes
+    python -m benchmarks.bench_nodes --data-path /tmp/synth.csv --runs 500
+    FAKE_LLM_LATENCY=0.2 python -m benchmarks.bench_nodes --graph-concurrency 1 8 32
+    FAKE_LLM_LATENCY=0.5 python -m benchmarks.bench_nodes --runs 10 --graph-runs 20 --modes fused
+"""
+
+import os
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("FAKE_LLM_LATENCY", "0")
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import itertools  # noqa: E402
+import time  # noqa: E402
+from typing import Callable, List  # noqa: E402
+
+from langchain_core.messages import HumanMessage  # noqa: E402
+
+from src.agents import (  # noqa: E402
+    compute_title_stats_node,
+    identify_top_performers_node,
+    load_channel_data_node,
+)
+from src.cache import pattern_cache  # noqa: E402
+from src.data_store import RANKING_METRICS, data_store  # noqa: E402
+from src.graph import build_agent_graph, build_fast_graph, build_fused_graph  # noqa: E402
+from src.prompt_manager import prompt_manager  # noqa: E402
+from src.state import AgentState  # noqa: E402
+from src.summary_cache import summary_cache  # noqa: E402
+from src.title_stats import (  # noqa: E402
+    format_title_stats,
+    title_stats_cache,
+    title_stats_index,
+)
+from src.utils import format_titles_with_views, get_example_titles  # noqa: E402
+
+SUMMARY = "A tutorial on building AI apps"
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
+
+
+def time_calls(func: Callable[[], object], runs: int) -> List[float]:
+    """Call func runs times after one warm-up call and return sorted wall times"""
+    func()
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return sorted(durations)
+
+
+def print_micro(name: str, durations: List[float]) -> None:
+    mean_us = 1e6 * sum(durations) / len(durations)
+    print(
+        f"{name:<44} {mean_us:>10.1f} {1e6 * percentile(durations, 0.5):>10.1f} "
+        f"{1e6 * percentile(durations, 0.95):>10.1f} {1e6 * percentile(durations, 0.99):>10.1f}"
+    )
+
+
+def run_micro(channel_id: str, top_n: int, runs: int) -> None:
+    state = AgentState(channel_id=channel_id, top_n=top_n)
+    state = state.model_copy(update=load_channel_data_node(state))
+    ranked = state.model_copy(update=identify_top_performers_node(state))
+    patterns = "\n".join(f"{i}. Pattern {i}: a recurring title structure" for i in range(1, 6))
+
+    print(f"{'stage (us)':<44} {'mean':>10} {'p50':>10} {'p95':>10} {'p99':>10}")
+    print_micro("load_channel_data_node", time_calls(lambda: load_channel_data_node(state), runs))
+    for metric in RANKING_METRICS:
+        metric_state = state.model_copy(update={"ranking_metric": metric})
+        print_micro(
+            f"identify_top_performers_node[{metric}]",
+            time_calls(lambda: identify_top_performers_node(metric_state), runs),
+        )
+    stats_state = ranked.model_copy(update=compute_title_stats_node(ranked))
+    print_micro(
+        "compute_title_stats_node (uncached)",
+        time_calls(lambda: (title_stats_cache.clear(), compute_title_stats_node(ranked)), runs),
+    )
+    print_micro(
+        "compute_title_stats_node (cached)",
+        time_calls(lambda: compute_title_stats_node(ranked), runs),
+    )
+    # As the server does after loading; the graph runs below use the precomputed statistics
+    title_stats_index.top_ns = [top_n]
+    title_stats_index.build(data_store.snapshot)
+    print(f"{'  title stats index build (s)':<44} {title_stats_index.build_seconds:>10.3f}")
+    print_micro(
+        "compute_title_stats_node (precomputed)",
+        time_calls(lambda: (title_stats_cache.clear(), compute_title_stats_node(ranked)), runs),
+    )
+    print_micro(
+        "format_title_stats",
+        time_calls(lambda: format_title_stats(stats_state.title_stats), runs),
+    )
+    print_micro(
+        "format_titles_with_views",
+        time_calls(lambda: format_titles_with_views(ranked.top_performers), runs),
+    )
+    print_micro(
+        "render pattern analysis prompt",
+        time_calls(
+            lambda: (
+                prompt_manager.render("pattern_analysis_system.jinja2"),
+                prompt_manager.render(
+                    "pattern_analysis.jinja2",
+                    top_n=top_n,
+                    titles=format_titles_with_views(ranked.top_performers),
+                ),
+            ),
+            runs,
+        ),
+    )
+    print_micro(
+        "render title generation prompt",
+        time_calls(
+            lambda: (
+                prompt_manager.render("title_generation_system.jinja2"),
+                prompt_manager.render(
+                    "title_generation_context.jinja2",
+                    pattern_analysis=patterns,
+                    example_titles=get_example_titles(ranked.top_performers),
+                    title_stats=format_title_stats(stats_state.title_stats),
+                ),
+                prompt_manager.render("title_generation.jinja2", video_summary=SUMMARY),
+            ),
+            runs,
+        ),
+    )
+
+
+def graph_input(channel_id: str, top_n: int, i: int) -> AgentState:
+    return AgentState(
+        messages=[HumanMessage(content="Generate titles")],
+        channel_id=channel_id,
+        top_n=top_n,
+        new_video_summary=f"{SUMMARY} (run {i})",
+    )
+
+
+async def run_graph_level(graph, channel_id: str, top_n: int, concurrency: int, runs: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    durations = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            pattern_cache.clear()
+            title_stats_cache.clear()
+            start = time.perf_counter()
+            await graph.ainvoke(graph_input(channel_id, top_n, i))
+            durations.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(runs)))
+    return time.perf_counter() - start, sorted(durations)
+
+
+GRAPH_BUILDERS = {
+    "separate": build_agent_graph,
+    "fused": build_fused_graph,
+    "fast": build_fast_graph,
+}
+
+
+def run_graphs(
+    mode: str, channel_id: str, top_n: int, runs: int, concurrency_levels: List[int]
+) -> None:
+    graph = GRAPH_BUILDERS[mode]()
+    counter = itertools.count()
+
+    def invoke_once() -> None:
+        pattern_cache.clear()
+        title_stats_cache.clear()
+        graph.invoke(graph_input(channel_id, top_n, next(counter)))
+
+    print(
+        f"\n{mode + ' graph (ms)':<22} {'runs/s':>8} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9}"
+    )
+    durations = time_calls(invoke_once, runs)
+    print_graph("invoke (sequential)", runs / sum(durations), durations)
+
+    for concurrency in concurrency_levels:
+        elapsed, durations = asyncio.run(
+            run_graph_level(graph, channel_id, top_n, concurrency, runs)
+        )
+        print_graph(f"ainvoke x{concurrency}", runs / elapsed, durations)
+
+
+def print_graph(name: str, throughput: float, durations: List[float]) -> None:
+    mean_ms = 1000 * sum(durations) / len(durations)
+    p50, p95, p99 = (1000 * percentile(durations, p) for p in (0.5, 0.95, 0.99))
+    print(f"{name:<22} {throughput:>8.1f} {mean_ms:>9.2f} {p50:>9.2f} {p95:>9.2f} {p99:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline micro-benchmarks and graph runs")
+    parser.add_argument("--data-path", help="CSV dataset to load instead of the default")
+    parser.add_argument("--channel-id", help="Channel to benchmark (default: the largest)")
+    parser.add_argument("--top-n", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=200, help="Runs per micro-benchmark")
+    parser.add_argument("--graph-runs", type=int, default=100, help="Graph runs per level")
+    parser.add_argument(
+        "--graph-concurrency", type=int, nargs="+", default=[1, 8], help="ainvoke levels"
+    )
+    parser.add_argument(
+        "--modes", nargs="+", choices=list(GRAPH_BUILDERS), default=list(GRAPH_BUILDERS)
+    )
+    args = parser.parse_args()
+
+    if args.data_path:
+        data_store.data_path = args.data_path
+    summary_cache.enabled = False  # every graph run makes both LLM calls
+
+    start = time.perf_counter()
+    data_store.load()
+    sizes = data_store.channel_sizes()
+    channel_id = args.channel_id or max(sizes, key=sizes.get)
+    print(
+        f"Loaded {sum(sizes.values()):,} rows / {len(sizes):,} channels in "
+        f"{time.perf_counter() - start:.2f}s; channel {channel_id} has {sizes[channel_id]:,} "
+        f"videos, top_n={args.top_n}\n"
+    )
+
+    run_micro(channel_id, args.top_n, args.runs)
+    for mode in args.modes:
+        run_graphs(mode, channel_id, args.top_n, args.graph_runs, args.graph_concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Compare title generation with and without Anthropic prompt caching.
+
+Runs many summaries for one channel through the agent graph against the fake
+LLM backend, which simulates the prompt cache and charges prefill time only
+for uncached input tokens. The channel's pattern analysis is seeded with a
+realistic-length text so the shared prefix is above the minimum cacheable size.
+Each mode runs in a fresh subprocess (PROMPT_CACHING is read at import).
+
+Usage:
+    python -m benchmarks.bench_prompt_cache
+    python -m benchmarks.bench_prompt_cache --summaries 50 --prefill 0.3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+DEFAULT_CHANNEL_ID = "UC510QYlOlKNyhy_zdQxnGYw"
+
+# Roughly the size of a real pattern analysis (~1,000 tokens)
+PATTERN_ANALYSIS = "\n\n".join(
+    f"{i}. PATTERN {i}: Titles that pair a concrete subject with a curiosity gap "
+    "(a question, a surprising claim or an unusual comparison) outperform plain "
+    "descriptions. Specific numbers, named vehicles or places, and strong verbs "
+    "appear in most top videos, while generic words rarely do. Keep the hook in "
+    "the first 40 characters and avoid clickbait that the video does not deliver."
+    for i in range(1, 13)
+)
+
+
+async def run_mode(channel_id: str, summaries: int, top_n: int) -> dict:
+    """Generate titles for `summaries` summaries and report TTFT and token usage"""
+    from langchain_core.messages import HumanMessage
+
+    from src.agents import identify_top_performers_node, load_channel_data_node
+    from src.cache import pattern_cache, pattern_cache_key
+    from src.graph import build_agent_graph
+    from src.llm_client import llm_usage
+    from src.state import AgentState
+
+    # Seed the pattern analysis so every run only makes the title generation call
+    state = AgentState(channel_id=channel_id, top_n=top_n)
+    state = state.model_copy(update=load_channel_data_node(state))
+    state = state.model_copy(update=identify_top_performers_node(state))
+    pattern_cache.set(pattern_cache_key(channel_id, top_n, state.top_performers), PATTERN_ANALYSIS)
+
+    graph = build_agent_graph()
+    ttfts = []
+    for i in range(summaries):
+        first_token = None
+        async for mode, chunk in graph.astream(
+            AgentState(
+                messages=[HumanMessage(content="Generate titles")],
+                channel_id=channel_id,
+                top_n=top_n,
+                new_video_summary=f"Benchmark video {i}: how armored trains are built",
+            ),
+            config={"configurable": {"stream_tokens": True}},
+            stream_mode=["updates", "custom"],
+        ):
+            if mode == "updates" and "extract_title_patterns" in chunk:
+                call_start = time.perf_counter()
+            elif mode == "custom" and first_token is None:
+                first_token = time.perf_counter()
+                ttfts.append(first_token - call_start)
+
+    ttfts.sort()
+    return {
+        **llm_usage.stats(),
+        "ttft_mean_ms": 1000 * sum(ttfts) / len(ttfts),
+        "ttft_p50_ms": 1000 * ttfts[len(ttfts) // 2],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prompt caching on the fake LLM")
+    parser.add_argument("--channel-id", default=DEFAULT_CHANNEL_ID)
+    parser.add_argument("--summaries", type=int, default=20, help="Title generations per mode")
+    parser.add_argument("--top-n", type=int, default=15)
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake generation seconds")
+    parser.add_argument(
+        "--prefill", type=float, default=0.2, help="Fake seconds per 1k uncached input tokens"
+    )
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # Child process: run one mode (from PROMPT_CACHING) and print the result as JSON
+        result = asyncio.run(run_mode(args.channel_id, args.summaries, args.top_n))
+        print(json.dumps(result))
+        return
+
+    print(f"{args.summaries} title generations for channel {args.channel_id}")
+    print(
+        f"{'caching':<8} {'input':>8} {'cache_read':>11} {'cache_write':>12} "
+        f"{'ttft_mean_ms':>13} {'ttft_p50_ms':>12}"
+    )
+    for caching in ("false", "true"):
+        env = {
+            **os.environ,
+            "LLM_BACKEND": "fake",
+            "FAKE_LLM_LATENCY": str(args.latency),
+            "FAKE_LLM_PREFILL_PER_1K_TOKENS": str(args.prefill),
+            "PROMPT_CACHING": caching,
+            "PATTERN_CACHE_DB": "",
+        }
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.bench_prompt_cache",
+                "--child",
+                "--channel-id",
+                args.channel_id,
+                "--summaries",
+                str(args.summaries),
+                "--top-n",
+                str(args.top_n),
+            ],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        r = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{caching:<8} {r['input_tokens']:>8} {r['cache_read_input_tokens']:>11} "
+            f"{r['cache_creation_input_tokens']:>12} {r['ttft_mean_ms']:>13.1f} "
+            f"{r['ttft_p50_ms']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
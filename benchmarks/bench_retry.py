@@ -0,0 +1,159 @@
+"""
+Tail latency of LLM calls under injected faults, per retry policy.
+
+Fires concurrent calls at the fault-injecting fake client (529 errors and
+slow responses) and reports success rate and latency percentiles for:
+
+- legacy:   the previous policy (retry everything, fixed 2s/4s sleeps, no deadline)
+- deadline: classified retries with jittered backoff inside a per-call deadline
+- hedged:   the same plus a hedged duplicate after --hedge-delay seconds
+
+A second scenario simulates a full brownout (every call fails) and shows the
+circuit breaker failing fast instead of each call sleeping through its retries.
+
+Usage:
+    python -m benchmarks.bench_retry
+    python -m benchmarks.bench_retry --calls 400 --error-rate 0.2 --slow-rate 0.1
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from config import MAX_RETRIES, RETRY_DELAY
+from src.fake_llm import FakeAsyncAnthropic, FaultInjector
+from src.retry import CircuitBreaker, acall_with_retry
+
+REQUEST = dict(
+    model="fake",
+    max_tokens=100,
+    messages=[{"role": "user", "content": [{"type": "text", "text": "Benchmark prompt"}]}],
+)
+
+
+async def legacy_call(client: FakeAsyncAnthropic) -> None:
+    # The policy this module replaced, kept here as the baseline
+    for attempt in range(MAX_RETRIES):
+        try:
+            return await client.messages.create(**REQUEST)
+        except Exception:
+            if attempt == MAX_RETRIES - 1:
+                raise
+            await asyncio.sleep(RETRY_DELAY * (2**attempt))
+
+
+async def run_policy(policy: str, args: argparse.Namespace, faults: FaultInjector) -> dict:
+    client = FakeAsyncAnthropic(latency=args.latency, faults=faults)
+    breaker = CircuitBreaker(
+        failure_threshold=args.breaker_threshold if args.breaker else 10**9,
+        reset_timeout=args.breaker_reset,
+    )
+    hedge_delay = args.hedge_delay if policy == "hedged" else 0.0
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, failures = [], 0
+
+    async def attempt(timeout: float):
+        return await client.messages.create(**REQUEST, timeout=timeout)
+
+    async def one() -> None:
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                if policy == "legacy":
+                    await legacy_call(client)
+                else:
+                    await acall_with_retry(
+                        attempt,
+                        deadline=time.time() + args.deadline,
+                        hedge_delay=hedge_delay,
+                        breaker=breaker,
+                    )
+            except Exception:
+                failures += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(args.calls)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+
+    def pct(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    return {
+        "policy": policy,
+        "ok_pct": 100 * (args.calls - failures) / args.calls,
+        "p50": pct(0.50),
+        "p95": pct(0.95),
+        "p99": pct(0.99),
+        "max": latencies[-1],
+        "elapsed": elapsed,
+        "breaker_opened": breaker.times_opened,
+    }
+
+
+def print_table(title: str, rows: list) -> None:
+    print(f"\n{title}")
+    print(
+        f"{'policy':<10} {'ok_%':>6} {'p50_s':>7} {'p95_s':>7} {'p99_s':>7} {'max_s':>7} "
+        f"{'total_s':>8} {'breaker':>8}"
+    )
+    for r in rows:
+        print(
+            f"{r['policy']:<10} {r['ok_pct']:>6.1f} {r['p50']:>7.2f} {r['p95']:>7.2f} "
+            f"{r['p99']:>7.2f} {r['max']:>7.2f} {r['elapsed']:>8.2f} {r['breaker_opened']:>8}"
+        )
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    rows = []
+    for policy in ("legacy", "deadline", "hedged"):
+        faults = FaultInjector(
+            error_rate=args.error_rate,
+            slow_rate=args.slow_rate,
+            slow_latency=args.slow_latency,
+            seed=args.seed,
+        )
+        rows.append(await run_policy(policy, args, faults))
+    print_table(
+        f"{args.calls} calls, concurrency {args.concurrency}: {args.error_rate:.0%} errors, "
+        f"{args.slow_rate:.0%} slow (+{args.slow_latency:g}s), deadline {args.deadline:g}s",
+        rows,
+    )
+
+    brownout_args = argparse.Namespace(**{**vars(args), "calls": args.brownout_calls})
+    rows = []
+    for breaker in (False, True):
+        brownout_args.breaker = breaker
+        faults = FaultInjector(error_rate=1.0, seed=args.seed)
+        row = await run_policy("deadline", brownout_args, faults)
+        row["policy"] = "breaker" if breaker else "no-breaker"
+        rows.append(row)
+    print_table(f"Brownout: {args.brownout_calls} calls, every call fails", rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retry policy tail latency under faults")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2, help="Healthy call seconds")
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--slow-latency", type=float, default=5.0)
+    parser.add_argument("--deadline", type=float, default=10.0, help="Per-call budget seconds")
+    parser.add_argument("--hedge-delay", type=float, default=0.5)
+    parser.add_argument("--brownout-calls", type=int, default=40)
+    parser.add_argument("--breaker-threshold", type=int, default=5)
+    parser.add_argument("--breaker-reset", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    args.breaker = True
+    logging.getLogger("src.retry").setLevel(logging.ERROR)  # silence per-attempt retry warnings
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
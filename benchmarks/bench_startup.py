@@ -0,0 +1,169 @@
+"""
+Cold start of the API: import time of `api` and time to the first served request.
+
+Each measurement runs in a fresh interpreter against the fake LLM backend
+(no latency, no warm-up), with its job queue, checkpoints and ingestion log
+in a temporary directory:
+
+- import: `import api` alone, and whether it pulled in a heavy library
+  (those are imported when the runtime loads, see src/runtime.py)
+- for the default startup and for FAST_START: seconds from spawning
+  `uvicorn api:app` until /health first answers (listen) and until the
+  response of a /generate-titles request sent as soon as it listens (first
+  request), plus the seconds the runtime took to load in the server (load)
+
+Medians of --repeats runs are reported. The script exits with status 1 if
+a median exceeds its budget or `import api` loads a heavy library, so it
+can gate CI against startup regressions; raise the budgets on slow machines.
+
+Usage:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --repeats 5 --max-import 1.0 --max-first-request 4
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+# Must not be imported by `import api`
+HEAVY_MODULES = ("pandas", "langgraph", "langchain_core", "anthropic", "pyarrow")
+MAX_IMPORT_SECONDS = 1.5
+MAX_FIRST_REQUEST_SECONDS = 5.0
+
+IMPORT_SCRIPT = f"""
+import json, sys, time
+start = time.perf_counter()
+import api
+seconds = time.perf_counter() - start
+heavy = [name for name in {HEAVY_MODULES!r} if name in sys.modules]
+print(json.dumps({{"seconds": seconds, "heavy": heavy}}))
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_env(workdir: str, fast_start: bool) -> dict:
+    return {
+        **os.environ,
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_LATENCY": "0",
+        "PATTERN_CACHE_WARMUP_CHANNELS": "0",
+        "JOBS_DB": os.path.join(workdir, "jobs.db"),
+        "CHECKPOINT_DB": os.path.join(workdir, "checkpoints.db"),
+        "INGEST_LOG_DIR": os.path.join(workdir, "ingest"),
+        "FAST_START": "true" if fast_start else "false",
+    }
+
+
+def measure_import(env: dict) -> dict:
+    """Seconds `import api` takes in a fresh interpreter, and the heavy modules it loaded"""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT], env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def measure_startup(env: dict, channel_id: str, timeout: float) -> dict:
+    """Seconds from spawning the server until it listens and until it served a first request"""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(timeout=timeout) as client:
+            while True:
+                if time.perf_counter() - start > timeout:
+                    raise RuntimeError(f"API at {url} did not start within {timeout:g}s")
+                try:
+                    client.get(f"{url}/health", timeout=1).raise_for_status()
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.01)
+            listen = time.perf_counter() - start
+
+            response = client.post(
+                f"{url}/generate-titles",
+                json={"channel_id": channel_id, "summary": "Cold start benchmark"},
+            )
+            response.raise_for_status()
+            first_request = time.perf_counter() - start
+            load = client.get(f"{url}/stats").json()["startup"]["load_seconds"]
+        return {"listen": listen, "first_request": first_request, "load": load}
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API import time and time to first request")
+    parser.add_argument("--channel-id", default="UC510QYlOlKNyhy_zdQxnGYw")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per measurement (median)")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds allowed to start")
+    parser.add_argument(
+        "--max-import", type=float, default=MAX_IMPORT_SECONDS, help="Budget for `import api`"
+    )
+    parser.add_argument(
+        "--max-first-request",
+        type=float,
+        default=MAX_FIRST_REQUEST_SECONDS,
+        help="Budget for the first request after spawning the server, in either startup mode",
+    )
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as workdir:
+        imports = [measure_import(server_env(workdir, False)) for _ in range(args.repeats)]
+        import_seconds = statistics.median(r["seconds"] for r in imports)
+        heavy = sorted({name for r in imports for name in r["heavy"]})
+        print(f"import api: {import_seconds:.3f}s, heavy modules: {', '.join(heavy) or 'none'}")
+        if heavy:
+            failures.append(f"`import api` loads {', '.join(heavy)}")
+        if import_seconds > args.max_import:
+            failures.append(f"import {import_seconds:.3f}s > budget {args.max_import:g}s")
+
+        print(f"\n{'startup':<10} {'listen_s':>9} {'first_s':>8} {'load_s':>7}")
+        for fast_start in (False, True):
+            name = "fast" if fast_start else "default"
+            runs = [
+                measure_startup(server_env(workdir, fast_start), args.channel_id, args.timeout)
+                for _ in range(args.repeats)
+            ]
+            median = {key: statistics.median(r[key] for r in runs) for key in runs[0]}
+            print(
+                f"{name:<10} {median['listen']:>9.3f} {median['first_request']:>8.3f} "
+                f"{median['load']:>7.3f}"
+            )
+            if median["first_request"] > args.max_first_request:
+                failures.append(
+                    f"{name} startup: first request {median['first_request']:.3f}s "
+                    f"> budget {args.max_first_request:g}s"
+                )
+
+    if failures:
+        print("\nStartup budget exceeded:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Per-node timing and memory of a full agent graph run.
+
+Runs the graph against the fake LLM backend with zero latency, so the
+numbers isolate state handling, data access and prompt rendering. For each
+node it reports the mean wall time and the mean peak traced memory (tracemalloc)
+while the node and its state update ran.
+
+Usage:
+    python -m benchmarks.bench_state
+    python -m benchmarks.bench_state --runs 200 --channel-id UC510QYlOlKNyhy_zdQxnGYw
+    python -m benchmarks.bench_state --data-path /tmp/big.csv --top-n 50
+"""
+
+import os
+
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("FAKE_LLM_LATENCY", "0")
+
+import argparse  # noqa: E402
+import time  # noqa: E402
+import tracemalloc  # noqa: E402
+from collections import defaultdict  # noqa: E402
+
+from langchain_core.messages import HumanMessage  # noqa: E402
+
+from src.cache import pattern_cache  # noqa: E402
+from src.data_store import data_store  # noqa: E402
+from src.graph import build_agent_graph  # noqa: E402
+from src.state import AgentState  # noqa: E402
+
+DEFAULT_CHANNEL_ID = "UC510QYlOlKNyhy_zdQxnGYw"
+
+
+def run(channel_id: str, runs: int, top_n: int) -> None:
+    data_store.load()  # keep the initial load out of the traced runs
+    graph = build_agent_graph()
+    timings = defaultdict(list)
+    peaks = defaultdict(list)
+    totals = []
+
+    for i in range(runs + 1):
+        pattern_cache.clear()
+        state = AgentState(
+            messages=[HumanMessage(content="Generate titles")],
+            channel_id=channel_id,
+            top_n=top_n,
+            new_video_summary="A tutorial on building AI apps",
+        )
+
+        tracemalloc.start()
+        start = run_start = time.perf_counter()
+        for update in graph.stream(state, stream_mode="updates"):
+            now = time.perf_counter()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            node = next(iter(update))
+            if i > 0:  # first run is warm-up
+                timings[node].append(now - start)
+                peaks[node].append(peak)
+            start = time.perf_counter()
+        tracemalloc.stop()
+        if i > 0:
+            totals.append(time.perf_counter() - run_start)
+
+    print(f"{runs} runs, channel {channel_id}, top_n={top_n}\n")
+    print(f"{'node':<26} {'mean_ms':>9} {'peak_kib':>10}")
+    for node, values in timings.items():
+        mean_ms = 1000 * sum(values) / len(values)
+        peak_kib = sum(peaks[node]) / len(peaks[node]) / 1024
+        print(f"{node:<26} {mean_ms:>9.3f} {peak_kib:>10.1f}")
+    print(f"{'total (traced)':<26} {1000 * sum(totals) / len(totals):>9.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-node state timing and memory benchmark")
+    parser.add_argument("--channel-id", default=DEFAULT_CHANNEL_ID)
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--top-n", type=int, default=15)
+    parser.add_argument("--data-path", help="CSV dataset to load instead of the default")
+    args = parser.parse_args()
+    if args.data_path:
+        data_store.data_path = args.data_path
+    run(args.channel_id, args.runs, args.top_n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark the local title statistics engine.
+
+Times the bulk computation over every channel of a dataset in one vectorized
+pass (what the server precomputes after each load), and the per-request
+fallback: the statistics of one channel computed on a cache miss, and the
+cache hit. Compare with the seconds an LLM pattern analysis takes.
+
+Usage:
+    python -m benchmarks.bench_title_stats
+    python -m scripts.generate_synthetic_data --rows 1000000 --output /tmp/synth.csv
+    python -m benchmarks.bench_title_stats --data-path /tmp/synth.csv --top-n 15
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from config import DATA_PATH
+from src.data_store import data_store, rank_channels
+from src.title_stats import title_stats, title_stats_cache, top_n_mask
+from src.utils import top_performer_records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the title statistics engine")
+    parser.add_argument("--data-path", default=DATA_PATH, help="CSV dataset")
+    parser.add_argument("--top-n", type=int, default=15)
+    parser.add_argument("--channels", type=int, default=20, help="Channels timed per request")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data_path, usecols=["channel_id", "video_id", "title", "views_in_period"])
+    ranked = rank_channels(df)
+    ranked["is_top"] = top_n_mask(ranked, args.top_n)
+
+    start = time.perf_counter()
+    stats = title_stats(ranked)
+    elapsed = time.perf_counter() - start
+    print(
+        f"bulk: {len(stats):,} channels / {len(ranked):,} titles in {elapsed:.2f}s "
+        f"({1000 * elapsed / len(stats):.3f} ms per channel)"
+    )
+
+    data_store.data_path = args.data_path
+    data_store.load()
+    sizes = data_store.channel_sizes()
+    channels = sorted(sizes, key=sizes.get, reverse=True)[: args.channels]
+    misses, hits = [], []
+    for channel_id in channels:
+        top = data_store.top_videos(channel_id, args.top_n)
+        records = top_performer_records(top)
+        start = time.perf_counter()
+        title_stats_cache.get_or_compute(channel_id, records, data_store.version)
+        misses.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        title_stats_cache.get_or_compute(channel_id, records, data_store.version)
+        hits.append(time.perf_counter() - start)
+
+    print(
+        f"per request ({len(channels)} largest channels, up to {sizes[channels[0]]:,} titles): "
+        f"miss {1000 * sum(misses) / len(misses):.2f} ms, "
+        f"hit {1e6 * sum(hits) / len(hits):.1f} us"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Memory of N uvicorn workers serving the dataset, CSV vs shared columnar file.
+
+For each data format and worker count, starts `uvicorn api:app --workers N`
+against the fake LLM backend, sends requests for many channels so every
+worker has touched the data, then sums the workers' RSS and PSS. RSS counts
+shared pages once per process; PSS splits them between the processes
+mapping them, so PSS is what the workers actually cost the machine.
+
+In CSV mode every worker parses the CSV into its own pandas frames, so
+memory grows linearly with workers. In columnar mode every worker maps the
+same Arrow file read-only and the page cache holds one copy.
+
+Usage:
+    python -m scripts.generate_synthetic_data --rows 1000000 --output /tmp/synth.csv --arrow
+    python -m benchmarks.bench_workers_memory --csv /tmp/synth.csv --workers 1 2 4
+"""
+
+import argparse
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+from config import DATA_PATH
+
+
+def worker_pids(parent: int) -> list:
+    """PIDs of the uvicorn worker processes spawned by parent (Linux /proc)"""
+    workers = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces; fields after ")" are fixed
+                fields = f.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                cmdline = f.read()
+        except OSError:
+            continue
+        # Skip multiprocessing's resource tracker, which is also a child
+        if int(fields[1]) == parent and b"spawn_main" in cmdline:
+            workers.append(int(entry))
+    return workers
+
+
+def memory_kib(pid: int) -> dict:
+    """RSS and PSS of a process in KiB"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key.lower()] = int(rest.split()[0])
+    return values
+
+
+def wait_settled(pids: list, interval: float = 1.0) -> None:
+    """Wait until the processes' total RSS stops changing (every worker finished loading)"""
+    previous = None
+    while True:
+        total = sum(memory_kib(pid)["rss"] for pid in pids)
+        if previous is not None and abs(total - previous) < 1024:
+            return
+        previous = total
+        time.sleep(interval)
+
+
+def wait_healthy(url: str, timeout: float) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{url}/health", timeout=1).json().get("dataset_version"):
+                return
+        except (httpx.HTTPError, ValueError):
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"API at {url} did not become healthy")
+
+
+def measure(data_format: str, workers: int, args: argparse.Namespace, channels: list) -> dict:
+    env = {
+        **os.environ,
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_LATENCY": "0",
+        "PATTERN_CACHE_WARMUP_CHANNELS": "0",
+        "DATA_FORMAT": data_format,
+        "DATA_PATH": args.csv,
+        "COLUMNAR_DATA_PATH": args.arrow,
+    }
+    url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "api:app",
+            "--port",
+            str(args.port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        start = time.perf_counter()
+        wait_healthy(url, args.startup_timeout)
+        # With one worker uvicorn serves from the main process; otherwise from
+        # child processes, which load at startup independently
+        pids = [server.pid]
+        if workers > 1:
+            while len(worker_pids(server.pid)) < workers:
+                time.sleep(0.5)
+            pids = worker_pids(server.pid)
+        wait_settled(pids)
+        ready_seconds = time.perf_counter() - start
+
+        with httpx.Client(timeout=60) as client:
+            for i in range(args.requests):
+                client.post(
+                    f"{url}/generate-titles",
+                    json={"channel_id": random.choice(channels), "summary": f"Memory test {i}"},
+                )
+
+        usage = [memory_kib(pid) for pid in pids]
+        return {
+            "format": data_format,
+            "workers": workers,
+            "processes": len(usage),
+            "rss_mib": sum(u["rss"] for u in usage) / 1024,
+            "pss_mib": sum(u["pss"] for u in usage) / 1024,
+            "ready_s": ready_seconds,
+        }
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker memory: CSV vs shared columnar dataset")
+    parser.add_argument("--csv", default=DATA_PATH)
+    parser.add_argument(
+        "--arrow", help="Columnar file (default: next to the CSV; converted if missing)"
+    )
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--formats", nargs="+", default=["csv", "columnar"])
+    parser.add_argument("--requests", type=int, default=50, help="Requests per measurement")
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--startup-timeout", type=float, default=300)
+    args = parser.parse_args()
+    args.arrow = args.arrow or os.path.splitext(args.csv)[0] + ".arrow"
+
+    if "columnar" in args.formats and not os.path.exists(args.arrow):
+        from src.columnar import write_columnar
+
+        print(f"Converting {args.csv} -> {args.arrow}")
+        write_columnar(args.csv, args.arrow)
+
+    import pandas as pd
+
+    channels = pd.read_csv(args.csv, usecols=["channel_id"])["channel_id"].unique().tolist()
+    print(f"{len(channels):,} channels in {args.csv}\n")
+    print(
+        f"{'format':<9} {'workers':>7} {'procs':>6} {'rss_mib':>9} {'pss_mib':>9} "
+        f"{'pss/worker':>10} {'ready_s':>8}"
+    )
+    for data_format in args.formats:
+        for workers in args.workers:
+            r = measure(data_format, workers, args, channels)
+            print(
+                f"{r['format']:<9} {r['workers']:>7} {r['processes']:>6} {r['rss_mib']:>9.1f} "
+                f"{r['pss_mib']:>9.1f} {r['pss_mib'] / r['workers']:>10.1f} {r['ready_s']:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
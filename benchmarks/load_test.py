@@ -0,0 +1,105 @@
+"""
+HTTP load test for /generate-titles.
+
+Fires batches of concurrent requests at a running API and reports throughput
+and latency per concurrency level. With a non-blocking graph, throughput on a
+single uvicorn worker should grow with concurrency.
+
+Usage (fake LLM backend with 0.5s per call, single worker):
+    LLM_BACKEND=fake FAKE_LLM_LATENCY=0.5 uvicorn api:app --workers 1 &
+    python -m benchmarks.load_test --concurrency 1 4 16 --requests 32
+
+Against a synthetic dataset with realistic output length and speed:
+    python -m scripts.generate_synthetic_data --rows 1000000 --output /tmp/synth.csv
+    DATA_PATH=/tmp/synth.csv LLM_BACKEND=fake FAKE_LLM_LATENCY=0.3 FAKE_LLM_OUTPUT_TOKENS=400 \
+        FAKE_LLM_OUTPUT_TOKENS_PER_SECOND=80 uvicorn api:app --workers 1 &
+    python -m benchmarks.load_test --channel-id <id> --concurrency 1 16 64 --requests 128
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+
+DEFAULT_CHANNEL_ID = "UC510QYlOlKNyhy_zdQxnGYw"
+
+
+async def run_level(
+    url: str, channel_id: str, concurrency: int, total_requests: int, top_n: int
+) -> dict:
+    """Send total_requests requests with at most `concurrency` in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    # Unique summaries per level, so no request is served by the summary cache
+    level_id = uuid.uuid4().hex[:8]
+    latencies = []
+    failures = 0
+    rejected = 0  # 429s from admission control
+
+    async with httpx.AsyncClient(timeout=600) as client:
+
+        async def one(i: int) -> None:
+            nonlocal failures, rejected
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(
+                    f"{url}/generate-titles",
+                    json={
+                        "channel_id": channel_id,
+                        "summary": f"Load test video {level_id} {i}",
+                        "top_n": top_n,
+                    },
+                )
+                latencies.append(time.perf_counter() - start)
+                if response.status_code == 429:
+                    rejected += 1
+                elif response.status_code != 200:
+                    failures += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total_requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "failures": failures,
+        "rejected": rejected,
+        "throughput": total_requests / elapsed,
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "max": latencies[-1],
+    }
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    print(
+        f"{'concurrency':>11} {'requests':>8} {'failures':>8} {'rejected':>8} {'req/s':>8} "
+        f"{'p50_s':>7} {'p95_s':>7} {'p99_s':>7} {'max_s':>7}"
+    )
+    for concurrency in args.concurrency:
+        r = await run_level(args.url, args.channel_id, concurrency, args.requests, args.top_n)
+        print(
+            f"{r['concurrency']:>11} {r['requests']:>8} {r['failures']:>8} {r['rejected']:>8} "
+            f"{r['throughput']:>8.2f} {r['p50']:>7.2f} {r['p95']:>7.2f} {r['p99']:>7.2f} "
+            f"{r['max']:>7.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the title generation API")
+    parser.add_argument("--url", default="http://localhost:8000", help="API base URL")
+    parser.add_argument("--channel-id", default=DEFAULT_CHANNEL_ID)
+    parser.add_argument("--top-n", type=int, default=15)
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 4, 16], help="Concurrency levels"
+    )
+    parser.add_argument("--requests", type=int, default=32, help="Requests per level")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
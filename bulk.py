@@ -0,0 +1,266 @@
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+from langchain_core.messages import HumanMessage
+from rich.console import Console
+
+from config import DEFAULT_RANKING_METRIC, DEFAULT_TOP_N
+from src.agents import agenerate_titles_node
+from src.graph import build_analysis_graph
+from src.state import AgentState
+
+console = Console()
+
+
+def load_jobs(path: str, default_top_n: int = DEFAULT_TOP_N) -> List[dict]:
+    """
+    Read (channel_id, summary, top_n, ranking_metric) jobs from a JSONL or CSV file.
+
+    Jobs without a job_id get one derived from their content, so the same
+    input file always yields the same ids and an interrupted run can resume.
+
+    Args:
+        path: Path to a .jsonl or .csv file
+        default_top_n: top_n used when a job does not specify one
+
+    Returns:
+        List of job dicts with job_id, channel_id, summary, top_n and ranking_metric
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    jobs = []
+    seen: Dict[str, int] = defaultdict(int)
+    for row in rows:
+        top_n = int(row.get("top_n") or default_top_n)
+        ranking_metric = row.get("ranking_metric") or DEFAULT_RANKING_METRIC
+        job_id = row.get("job_id")
+        if not job_id:
+            key = f"{row['channel_id']}|{top_n}|{row['summary']}"
+            if ranking_metric != DEFAULT_RANKING_METRIC:
+                # Default-metric jobs keep the ids they had before metrics existed
+                key += f"|{ranking_metric}"
+            digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+            # Identical jobs are kept apart by their occurrence number
+            job_id = f"{digest}-{seen[digest]}"
+            seen[digest] += 1
+        jobs.append(
+            {
+                "job_id": str(job_id),
+                "channel_id": row["channel_id"],
+                "summary": row["summary"],
+                "top_n": top_n,
+                "ranking_metric": ranking_metric,
+            }
+        )
+    return jobs
+
+
+def completed_job_ids(output_path: str) -> Set[str]:
+    """
+    Collect ids of jobs that already succeeded in a previous run.
+
+    Failed jobs are not included, so they are retried on resume. A partially
+    written last line (from a crash) is ignored.
+
+    Args:
+        output_path: Path of the append-only JSONL results file
+
+    Returns:
+        Set of completed job ids
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("status") == "ok":
+                done.add(record["job_id"])
+    return done
+
+
+class BulkRunner:
+    """Runs title generation jobs grouped by channel with a bounded worker pool"""
+
+    def __init__(self, output_path: str, workers: int):
+        """
+        Initialize the runner.
+
+        Args:
+            output_path: Append-only JSONL file receiving one record per job
+            workers: Maximum number of graph stages (analyses or generations) in flight
+        """
+        self.output_path = output_path
+        self.workers = workers
+        self.analysis_graph = build_analysis_graph()
+        self.stats = defaultdict(int)
+        self._output = None
+
+    async def run(self, jobs: List[dict]) -> None:
+        groups: Dict[Tuple[str, int, str], List[dict]] = defaultdict(list)
+        for job in jobs:
+            groups[(job["channel_id"], job["top_n"], job["ranking_metric"])].append(job)
+
+        semaphore = asyncio.Semaphore(self.workers)
+        with open(self.output_path, "a", encoding="utf-8") as output:
+            self._output = output
+            await asyncio.gather(
+                *(
+                    self._run_group(channel_id, top_n, metric, group_jobs, semaphore)
+                    for (channel_id, top_n, metric), group_jobs in groups.items()
+                )
+            )
+
+    async def _run_group(
+        self,
+        channel_id: str,
+        top_n: int,
+        ranking_metric: str,
+        jobs: List[dict],
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        # One load + rank + pattern analysis shared by every job of the group
+        async with semaphore:
+            try:
+                analysis = await self.analysis_graph.ainvoke(
+                    AgentState(
+                        messages=[HumanMessage(content="Analyze channel")],
+                        channel_id=channel_id,
+                        top_n=top_n,
+                        ranking_metric=ranking_metric,
+                    )
+                )
+            except Exception as e:
+                for job in jobs:
+                    self._write(job, status="error", error=str(e))
+                return
+
+        self.stats["groups"] += 1
+        if not analysis["patterns_cached"]:
+            # Without grouping every job would run its own pattern analysis call
+            self.stats["pattern_llm_calls"] += 1
+            self.stats["llm_calls_saved"] += len(jobs) - 1
+
+        if not analysis["title_patterns"]:
+            error = analysis["messages"][-1].content if analysis["messages"] else "Analysis failed"
+            for job in jobs:
+                self._write(job, status="error", error=error)
+            return
+
+        analyzed_state = AgentState(**analysis)
+
+        async def generate(job: dict) -> None:
+            async with semaphore:
+                try:
+                    state = analyzed_state.model_copy(update={"new_video_summary": job["summary"]})
+                    update = await agenerate_titles_node(state)
+                except Exception as e:
+                    self._write(job, status="error", error=str(e))
+                    return
+
+            if update.get("titles_cached"):
+                self.stats["title_cache_hits"] += 1
+            else:
+                self.stats["title_llm_calls"] += 1
+            if update.get("generated_titles"):
+                self._write(job, status="ok", generated_titles=update["generated_titles"])
+            else:
+                self._write(job, status="error", error=update["messages"][-1].content)
+
+        await asyncio.gather(*(generate(job) for job in jobs))
+
+    def _write(self, job: dict, status: str, **fields) -> None:
+        self.stats[status] += 1
+        record = {**job, "status": status, **fields}
+        self._output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._output.flush()
+
+
+def run_bulk(input_path: str, output_path: str, workers: int, default_top_n: int) -> None:
+    """Run every pending job in input_path, appending results to output_path"""
+    jobs = load_jobs(input_path, default_top_n)
+    done = completed_job_ids(output_path)
+    pending = [job for job in jobs if job["job_id"] not in done]
+
+    console.print(
+        f"\n[bold]{len(jobs)} jobs[/bold] in {input_path} "
+        f"({len(jobs) - len(pending)} already completed, {len(pending)} to run)\n"
+    )
+    if not pending:
+        return
+
+    runner = BulkRunner(output_path, workers)
+    start = time.perf_counter()
+    interrupted = False
+    try:
+        asyncio.run(runner.run(pending))
+    except KeyboardInterrupt:
+        interrupted = True
+    elapsed = time.perf_counter() - start
+
+    stats = runner.stats
+    processed = stats["ok"] + stats["error"]
+
+    if interrupted:
+        console.print("[bold yellow]Interrupted - re-run the same command to resume[/bold yellow]")
+    else:
+        console.print("[bold green]Bulk run complete[/bold green]")
+    console.print(f"  Succeeded: {stats['ok']}  Failed: {stats['error']}")
+    console.print(
+        f"  Elapsed: {elapsed:.1f}s  Throughput: {processed / max(elapsed, 1e-9):.2f} jobs/s"
+    )
+    console.print(
+        f"  Channel groups: {stats['groups']}  Pattern analysis calls: "
+        f"{stats['pattern_llm_calls']}  Title generation calls: {stats['title_llm_calls']}"
+    )
+    console.print(
+        f"  LLM calls saved by grouping: {stats['llm_calls_saved']}  "
+        f"Titles reused from the summary cache: {stats['title_cache_hits']}"
+    )
+    console.print(f"  Results: {output_path}\n")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="YouTube Title Optimizer - Offline bulk title generation",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Input files contain one job per line (JSONL) or row (CSV) with the fields
+channel_id, summary and optionally top_n, ranking_metric and job_id.
+
+Examples:
+  python bulk.py jobs.jsonl results.jsonl
+  python bulk.py jobs.csv results.jsonl --workers 16
+        """,
+    )
+
+    parser.add_argument("input", help="JSONL or CSV file of jobs")
+    parser.add_argument("output", help="Append-only JSONL results file (used to resume)")
+    parser.add_argument(
+        "--workers", type=int, default=8, help="Concurrent graph stages (default: 8)"
+    )
+    parser.add_argument(
+        "--top-n",
+        type=int,
+        default=DEFAULT_TOP_N,
+        help=f"top_n for jobs that do not set one (default: {DEFAULT_TOP_N})",
+    )
+
+    args = parser.parse_args()
+    run_bulk(args.input, args.output, args.workers, args.top_n)
@@ -1,16 +1,40 @@
+import json
+
 import requests
-from rich.console import Console
+from rich.console import Console, Group
+from rich.live import Live
 from rich.markdown import Markdown
+from rich.text import Text
 
 console = Console()
 
+NODE_LABELS = {
+    "load_channel_data": "Channel data loaded",
+    "identify_top_performers": "Top performers found",
+    "stream_top_performers": "Top performers found",
+    "extract_title_patterns": "Pattern analysis complete",
+    "generate_titles": "Titles generated",
+    "analyze_and_generate_titles": "Pattern analysis and titles complete",
+    "respond": "Done",
+}
+
+
+def request_body(channel_id: str, summary: str, top_n: int, metric: str, mode=None) -> dict:
+    """Title request body; mode None leaves the generation mode to the server"""
+    body = {"channel_id": channel_id, "summary": summary, "top_n": top_n, "ranking_metric": metric}
+    if mode:
+        body["mode"] = mode
+    return body
+
 
-def generate_titles(channel_id: str, summary: str, top_n: int = 15):
+def generate_titles(
+    channel_id: str, summary: str, top_n: int = 15, metric: str = "views", mode=None
+):
     """Generate titles via API"""
     try:
         response = requests.post(
             "http://localhost:8000/generate-titles",
-            json={"channel_id": channel_id, "summary": summary, "top_n": top_n},
+            json=request_body(channel_id, summary, top_n, metric, mode),
             timeout=180,
         )
 
@@ -47,6 +71,84 @@ def generate_titles(channel_id: str, summary: str, top_n: int = 15):
         console.print(f"[bold red]Error:[/bold red] {str(e)}")
 
 
+def iter_sse(response: requests.Response):
+    """Yield (event, data) pairs from a server-sent event stream"""
+    event, data_lines = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if not line:
+            if data_lines:
+                yield event, json.loads("\n".join(data_lines))
+            event, data_lines = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:") :].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[len("data:") :].strip())
+
+
+def render_stream(progress: list, pattern_analysis: str, generated_titles: str) -> Group:
+    """Build the live view of a streaming generation"""
+    parts = [Text(f"✓ {label}", style="dim") for label in progress]
+    if pattern_analysis:
+        parts += [Text("\nPattern Analysis:\n", style="bold cyan"), Markdown(pattern_analysis)]
+    if generated_titles:
+        parts += [Text("\nGenerated Titles:\n", style="bold green"), Markdown(generated_titles)]
+    return Group(*parts)
+
+
+def generate_titles_stream(
+    channel_id: str, summary: str, top_n: int = 15, metric: str = "views", mode=None
+):
+    """Generate titles via the streaming API, rendering progress and tokens live"""
+    progress = []
+    buffers = {"pattern_analysis": "", "title_generation": ""}
+
+    try:
+        with requests.post(
+            "http://localhost:8000/generate-titles/stream",
+            json=request_body(channel_id, summary, top_n, metric, mode),
+            stream=True,
+            timeout=(10, 180),
+        ) as response:
+            if response.status_code != 200:
+                console.print(f"[bold red]Error {response.status_code}:[/bold red]")
+                console.print(response.json())
+                return
+
+            metadata = None
+            with Live(console=console, refresh_per_second=10, vertical_overflow="visible") as live:
+                for event, data in iter_sse(response):
+                    if event == "progress":
+                        progress.append(NODE_LABELS.get(data["node"], data["node"]))
+                    elif event == "token":
+                        buffers[data["stage"]] = buffers.get(data["stage"], "") + data["text"]
+                    elif event == "retry":
+                        buffers[data["stage"]] = ""
+                    elif event == "result":
+                        buffers["pattern_analysis"] = data["pattern_analysis"]
+                        buffers["title_generation"] = data["generated_titles"]
+                        metadata = data["metadata"]
+                    elif event == "error":
+                        console.print(f"[bold red]Error:[/bold red] {data['detail']}")
+                        return
+
+                    live.update(
+                        render_stream(
+                            progress, buffers["pattern_analysis"], buffers["title_generation"]
+                        )
+                    )
+
+            if metadata:
+                console.print(f"\n[dim]Analyzed {metadata.get('top_n', 'N/A')} videos[/dim]\n")
+
+    except requests.exceptions.ConnectionError:
+        console.print("[bold red]Error: Cannot connect to API. Is it running?[/bold red]")
+        console.print("[dim]Start with: python api.py[/dim]")
+    except requests.exceptions.Timeout:
+        console.print("[bold red]Error: Request timed out[/bold red]")
+    except Exception as e:
+        console.print(f"[bold red]Error:[/bold red] {str(e)}")
+
+
 if __name__ == "__main__":
     import argparse
 
@@ -57,6 +159,9 @@ if __name__ == "__main__":
 Examples:
   python client.py UC510QYlOlKNyhy_zdQxnGYw "A tutorial on AI apps"
   python client.py UC510QYlOlKNyhy_zdQxnGYw "Building web apps with Python" --top-n 20
+  python client.py UC510QYlOlKNyhy_zdQxnGYw "A tutorial on AI apps" --stream
+  python client.py UC510QYlOlKNyhy_zdQxnGYw "A tutorial on AI apps" --metric outliers
+  python client.py UC510QYlOlKNyhy_zdQxnGYw "A tutorial on AI apps" --mode fused
         """,
     )
 
@@ -68,6 +173,25 @@ Examples:
         "--top-n", type=int, default=15, help="Number of top videos to analyze (default: 15)"
     )
 
+    parser.add_argument(
+        "--metric",
+        choices=["views", "outliers"],
+        default="views",
+        help="How top videos are ranked (default: views)",
+    )
+
+    parser.add_argument(
+        "--mode",
+        choices=["separate", "fused", "fast"],
+        help="separate: two LLM calls; fused: one call for analysis and titles; "
+        "fast: local title statistics and one call for titles "
+        "(default: the server's GENERATION_MODE)",
+    )
+
+    parser.add_argument(
+        "--stream", action="store_true", help="Stream progress and tokens as they are generated"
+    )
+
     args = parser.parse_args()
 
     # Show what we're doing
@@ -76,4 +200,7 @@ Examples:
     console.print(f"  Summary: {args.summary}")
     console.print(f"  Analyzing top {args.top_n} videos\n")
 
-    generate_titles(args.channel_id, args.summary, args.top_n)
+    if args.stream:
+        generate_titles_stream(args.channel_id, args.summary, args.top_n, args.metric, args.mode)
+    else:
+        generate_titles(args.channel_id, args.summary, args.top_n, args.metric, args.mode)
@@ -8,17 +8,120 @@ load_dotenv()
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 ANTHROPIC_MODEL = "claude-sonnet-4-20250514"
 ANTHROPIC_TIMEOUT = 120.0
+LLM_BACKEND = os.getenv("LLM_BACKEND", "anthropic")  # "anthropic" or "fake" (load tests)
+FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "1.0"))  # seconds per fake call
+# Extra fake time-to-first-token per 1k uncached input tokens (0 disables)
+FAKE_LLM_PREFILL_PER_1K_TOKENS = float(os.getenv("FAKE_LLM_PREFILL_PER_1K_TOKENS", "0.0"))
+# Fault injection for the fake backend: share of 529 errors and of slow (tail) calls
+FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0.0"))
+FAKE_LLM_SLOW_RATE = float(os.getenv("FAKE_LLM_SLOW_RATE", "0.0"))
+FAKE_LLM_SLOW_LATENCY = float(os.getenv("FAKE_LLM_SLOW_LATENCY", "10.0"))  # extra seconds
+# Fake decoding: response length in tokens (0 keeps the short canned text) and output speed
+FAKE_LLM_OUTPUT_TOKENS = int(os.getenv("FAKE_LLM_OUTPUT_TOKENS", "0"))
+FAKE_LLM_OUTPUT_TOKENS_PER_SECOND = float(os.getenv("FAKE_LLM_OUTPUT_TOKENS_PER_SECOND", "0"))
+
+# Prompt Caching
+PROMPT_CACHING = os.getenv("PROMPT_CACHING", "true").lower() != "false"
+PROMPT_CACHE_MIN_TOKENS = 1024  # shortest prefix the API will cache (Sonnet)
+
+# LLM Connection Pool and Rate Limiting
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "10"))
+LLM_KEEPALIVE_EXPIRY = 30.0  # seconds an idle connection is kept open
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # in-flight LLM calls
 
 # Data Configuration
-DATA_PATH = "data/electrify__applied_ai_engineer__training_data.csv"
+DATA_PATH = os.getenv("DATA_PATH", "data/electrify__applied_ai_engineer__training_data.csv")
+COLUMNAR_DATA_PATH = os.getenv(
+    "COLUMNAR_DATA_PATH", "data/electrify__applied_ai_engineer__training_data.arrow"
+)
+DATA_FORMAT = os.getenv("DATA_FORMAT", "csv")  # "csv" or "columnar"
+# In columnar mode, rebuild the Arrow file from DATA_PATH when the CSV changes
+COLUMNAR_AUTO_CONVERT = os.getenv("COLUMNAR_AUTO_CONVERT", "true").lower() == "true"
+DATA_LOAD_MODE = os.getenv("DATA_LOAD_MODE", "resident")  # "resident" or "streaming"
+STREAM_CHUNK_SIZE = 100_000  # rows parsed per chunk in streaming mode
 PROMPTS_DIR = "prompts"
+DATA_RELOAD_INTERVAL = 30.0  # seconds between checks for a changed dataset file
+# Append logs of ingested videos, one per version of the dataset file; replayed on load
+INGEST_LOG_DIR = os.getenv("INGEST_LOG_DIR", "data/ingest")
+INGEST_MAX_VIDEOS = 10_000  # video records accepted per ingestion request
 
 # Agent Configuration
 DEFAULT_TOP_N = 15
+MAX_TOP_N = 50  # largest top_n a request may analyze
+DEFAULT_RANKING_METRIC = "views"  # views | outliers
+OUTLIER_ZSCORE = 2.0  # videos at least this many std devs above their channel mean
 MAX_RETRIES = 3
-RETRY_DELAY = 2
+RETRY_DELAY = 2  # base of the jittered exponential backoff, in seconds
+RETRY_MAX_DELAY = 20.0  # cap on a single backoff sleep
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", "90"))  # seconds per API request
+LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "0"))  # seconds before a hedge; 0 disables
+CIRCUIT_FAILURE_THRESHOLD = 5  # consecutive upstream failures that open the circuit
+CIRCUIT_RESET_TIMEOUT = 30.0  # seconds the circuit stays open before a trial call
+# "separate" makes one LLM call for pattern analysis and one for titles, "fused" a single
+# call returning both, "fast" replaces the analysis with local title statistics
+# (per-request override: "mode" in the request body)
+GENERATION_MODE = os.getenv("GENERATION_MODE", "separate")
+# Admission control: graph runs executing at once, requests allowed to wait for one (more get
+# 429 with Retry-After), and how long they may wait. Priorities are admitted in this order.
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "32"))  # 0 disables
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "128"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "30"))
+PRIORITIES = ("interactive", "batch")
+BATCH_MAX_SUMMARIES = 100  # summaries accepted per batch request
+BATCH_MAX_CONCURRENCY = 8  # title generations run in parallel per batch request
+
+# Graph Checkpoints: state saved after every node, so a failed run resumes from its last
+# completed node (POST /runs/{run_id}/retry)
+CHECKPOINT_DB = os.getenv("CHECKPOINT_DB")  # SQLite path; unset keeps checkpoints in memory
+CHECKPOINT_TTL = 60 * 60  # seconds a run can be resumed
+
+# Startup: by default the dataset is loaded and the graphs are built before the server accepts
+# requests. With FAST_START it accepts them at once (GET /health answers, graph_ready false),
+# loading runs in the background and requests needing it wait for it.
+FAST_START = os.getenv("FAST_START", "false").lower() == "true"
+
+# Pattern Analysis Cache
+PATTERN_CACHE_MAX_ENTRIES = 1024
+PATTERN_CACHE_TTL = 24 * 60 * 60  # seconds
+PATTERN_CACHE_DB = os.getenv("PATTERN_CACHE_DB")  # SQLite path; unset keeps the cache in memory
+PATTERN_CACHE_WARMUP_CHANNELS = int(os.getenv("PATTERN_CACHE_WARMUP_CHANNELS", "10"))
+PATTERN_CACHE_WARMUP_CONCURRENCY = 2
+
+# Background Jobs (POST /jobs)
+JOBS_DB = os.getenv("JOBS_DB", "data/jobs.db")  # SQLite queue; survives restarts
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))  # jobs run concurrently per process; 0 disables
+JOB_MAX_ATTEMPTS = 3
+JOB_RETRY_DELAY = 5.0  # seconds before the first retry of a failed job; doubles per attempt
+JOB_TTL = 60 * 60  # seconds a job may wait in the queue before it expires
+JOB_RETENTION = 24 * 60 * 60  # seconds finished jobs stay available for polling
+JOB_POLL_INTERVAL = 1.0  # seconds an idle worker waits before polling the queue again
+JOB_WEBHOOK_TIMEOUT = 10.0  # seconds per webhook delivery attempt
+# Webhooks must be https URLs whose host resolves only to public addresses. A comma-separated
+# allowlist ("hooks.example.com", or ".example.com" for its subdomains) restricts the hosts
+# further; JOB_WEBHOOK_ALLOW_PRIVATE lifts the https and public-address checks (local testing).
+JOB_WEBHOOK_ALLOWED_HOSTS = [
+    host.strip().lower() for host in os.getenv("JOB_WEBHOOK_ALLOWED_HOSTS", "").split(",") if host
+]
+JOB_WEBHOOK_ALLOW_PRIVATE = os.getenv("JOB_WEBHOOK_ALLOW_PRIVATE", "false").lower() == "true"
+
+# Local Title Statistics (length, features, keyword lift and view-weighted n-grams)
+TITLE_STATS_TOP_K = 8  # keywords and n-grams reported per channel
+TITLE_STATS_CACHE_ENTRIES = 1024
+# Statistics of every channel are precomputed in the background after each dataset (re)load for
+# these top_n values (comma-separated, empty disables); other top_n are computed per request
+TITLE_STATS_PRECOMPUTE_TOP_N = [
+    int(n) for n in os.getenv("TITLE_STATS_PRECOMPUTE_TOP_N", str(DEFAULT_TOP_N)).split(",") if n
+]
+
+# Near-duplicate Summary Cache
+SUMMARY_CACHE_ENABLED = os.getenv("SUMMARY_CACHE_ENABLED", "true").lower() == "true"
+SUMMARY_CACHE_MAX_ENTRIES = 2048
+SUMMARY_CACHE_THRESHOLD = float(os.getenv("SUMMARY_CACHE_THRESHOLD", "0.8"))  # MinHash Jaccard
+SUMMARY_CACHE_NUM_PERM = 64  # MinHash signature length
 
 # Model Parameters
 DEFAULT_MAX_TOKENS = 1500
 PATTERN_ANALYSIS_TEMPERATURE = 0.7
 TITLE_GENERATION_TEMPERATURE = 0.8
+FUSED_MAX_TOKENS = 3000  # one response holds both the pattern analysis and the titles
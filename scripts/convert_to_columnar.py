@@ -0,0 +1,37 @@
+"""
+Convert the CSV dataset into the channel-sorted Arrow IPC file used by the
+columnar data store (DATA_FORMAT=columnar).
+
+Usage:
+    python -m scripts.convert_to_columnar
+    python -m scripts.convert_to_columnar --csv data/other.csv --output data/other.arrow
+"""
+
+import argparse
+import time
+
+from config import COLUMNAR_DATA_PATH, DATA_PATH
+from src.columnar import write_columnar
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the CSV dataset to columnar format")
+    parser.add_argument("--csv", default=DATA_PATH, help=f"Source CSV (default: {DATA_PATH})")
+    parser.add_argument(
+        "--output",
+        default=COLUMNAR_DATA_PATH,
+        help=f"Arrow IPC output file (default: {COLUMNAR_DATA_PATH})",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = write_columnar(args.csv, args.output)
+    elapsed = time.perf_counter() - start
+
+    total_rows = sum(length for _, length in index.values())
+    print(f"Wrote {total_rows:,} rows for {len(index):,} channels to {args.output}")
+    print(f"Conversion took {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Generate a synthetic dataset with the schema of the CSV in data/.
+
+Channel sizes follow a heavy-tailed (Pareto) distribution like real channels,
+views are log-normal per channel with occasional breakout videos, and titles
+and summaries are drawn from the real dataset with a per-row variant suffix.
+Rows are generated and written in chunks of whole channels, so millions of
+rows fit in a small amount of memory.
+
+Usage:
+    python -m scripts.generate_synthetic_data --rows 1000000 --channels 5000
+    python -m scripts.generate_synthetic_data --rows 200000 --output /tmp/synth.csv --arrow
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import DATA_PATH
+
+ID_ALPHABET = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"))
+
+
+def channel_sizes(rows: int, channels: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Split `rows` videos over `channels` channels with a heavy-tailed size distribution.
+
+    Args:
+        rows: Total number of videos
+        channels: Number of channels (each gets at least one video)
+        rng: Random generator
+
+    Returns:
+        Integer array of channel sizes summing to rows
+    """
+    if channels > rows:
+        raise ValueError("Need at least one row per channel")
+    weights = rng.pareto(1.5, size=channels) + 1
+    sizes = 1 + np.floor(weights / weights.sum() * (rows - channels)).astype(np.int64)
+    # Hand out the rounding remainder to the largest channels
+    remainder = rows - sizes.sum()
+    sizes[np.argsort(-weights)[:remainder]] += 1
+    return sizes
+
+
+def random_ids(n: int, length: int, rng: np.random.Generator) -> np.ndarray:
+    """Random YouTube-style ids (base64url characters)"""
+    chars = ID_ALPHABET[rng.integers(0, len(ID_ALPHABET), size=(n, length))]
+    return chars.view(f"<U{length}").ravel()
+
+
+def chunk_frame(
+    channel_ids: np.ndarray, sizes: np.ndarray, source: pd.DataFrame, rng: np.random.Generator
+) -> pd.DataFrame:
+    """
+    Build the rows of a run of consecutive synthetic channels.
+
+    Args:
+        channel_ids: Channel IDs of the run
+        sizes: Number of videos of each channel
+        source: Real rows to draw titles and summaries from
+        rng: Random generator
+
+    Returns:
+        DataFrame with the dataset columns, grouped by channel
+    """
+    rows = int(sizes.sum())
+    picks = rng.integers(0, len(source), size=rows)
+    variants = rng.integers(1, 1000, size=rows).astype(str)
+
+    # Channel popularity times per-video spread, plus a few breakout videos
+    scales = np.repeat(rng.lognormal(mean=9.0, sigma=1.5, size=len(sizes)), sizes)
+    views = scales * rng.lognormal(mean=0.0, sigma=1.0, size=rows)
+    breakouts = rng.random(rows) < 0.02
+    views[breakouts] *= rng.uniform(5, 50, size=breakouts.sum())
+
+    return pd.DataFrame(
+        {
+            "channel_id": np.repeat(channel_ids, sizes),
+            "video_id": random_ids(rows, 11, rng),
+            "title": np.char.add(np.char.add(source["title"].to_numpy(str)[picks], " #"), variants),
+            "summary": source["summary"].to_numpy()[picks],
+            "views_in_period": views.astype(np.int64),
+        }
+    )
+
+
+def generate(
+    output: str, rows: int, channels: int, source_path: str, seed: int, chunk_rows: int
+) -> None:
+    """
+    Write the synthetic CSV.
+
+    Args:
+        output: CSV path to write
+        rows: Total number of videos
+        channels: Number of channels
+        source_path: Real CSV to draw titles and summaries from
+        seed: Random seed (same seed, same dataset)
+        chunk_rows: Approximate rows generated per CSV write
+    """
+    rng = np.random.default_rng(seed)
+    source = pd.read_csv(source_path, usecols=["title", "summary"]).dropna()
+    sizes = channel_sizes(rows, channels, rng)
+    channel_ids = np.char.add("UC", random_ids(channels, 22, rng))
+
+    # Cut the channels into runs of about chunk_rows rows
+    ends = np.searchsorted(np.cumsum(sizes), np.arange(chunk_rows, rows, chunk_rows))
+    bounds = [0, *np.unique(ends + 1).tolist(), channels]
+
+    with open(output, "w", newline="", encoding="utf-8") as f:
+        for i, (first, last) in enumerate(zip(bounds, bounds[1:])):
+            if first >= last:
+                continue
+            frame = chunk_frame(channel_ids[first:last], sizes[first:last], source, rng)
+            frame.to_csv(f, index=False, header=i == 0)
+
+    print(f"Wrote {rows:,} rows for {channels:,} channels to {output}")
+    print(f"Largest channel: {sizes.max():,} videos, median: {int(np.median(sizes)):,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic title dataset")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Total videos")
+    parser.add_argument("--channels", type=int, default=5_000)
+    parser.add_argument("--output", default="data/synthetic.csv")
+    parser.add_argument(
+        "--source", default=DATA_PATH, help="Real CSV to draw titles and summaries from"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-rows", type=int, default=200_000, help="Rows per CSV write")
+    parser.add_argument(
+        "--arrow", action="store_true", help="Also write the columnar file next to the CSV"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    generate(args.output, args.rows, args.channels, args.source, args.seed, args.chunk_rows)
+    print(f"Generation took {time.perf_counter() - start:.2f}s")
+
+    if args.arrow:
+        from src.columnar import write_columnar
+
+        arrow_path = os.path.splitext(args.output)[0] + ".arrow"
+        start = time.perf_counter()
+        write_columnar(args.output, arrow_path)
+        print(f"Wrote {arrow_path} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
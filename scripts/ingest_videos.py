@@ -0,0 +1,76 @@
+"""
+Send new videos and updated view counts to a running API (POST /ingest).
+
+Reads a JSONL or CSV file of channel_id, video_id, views_in_period and
+optionally title and summary (required for videos not yet in the dataset),
+and posts it in batches. Each batch reports which channels' top videos
+changed and how many cached results were invalidated.
+
+Usage:
+    python -m scripts.ingest_videos updates.csv
+    python -m scripts.ingest_videos updates.jsonl --url http://localhost:8000 --batch-size 500
+"""
+
+import argparse
+import csv
+import json
+from typing import List
+
+import httpx
+
+from config import INGEST_MAX_VIDEOS
+
+RECORD_FIELDS = ("channel_id", "video_id", "views_in_period", "title", "summary")
+
+
+def load_records(path: str) -> List[dict]:
+    """
+    Read video records from a JSONL or CSV file.
+
+    Args:
+        path: Path to a .jsonl or .csv file
+
+    Returns:
+        Records with the RECORD_FIELDS present in each row (empty values dropped)
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    records = []
+    for row in rows:
+        record = {key: row[key] for key in RECORD_FIELDS if row.get(key) not in (None, "")}
+        record["views_in_period"] = int(record["views_in_period"])
+        records.append(record)
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest new videos and view counts")
+    parser.add_argument("path", help="JSONL or CSV file of video records")
+    parser.add_argument("--url", default="http://localhost:8000", help="API base URL")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Records per request")
+    args = parser.parse_args()
+
+    records = load_records(args.path)
+    batch_size = min(args.batch_size, INGEST_MAX_VIDEOS)
+    with httpx.Client(timeout=120) as client:
+        for start in range(0, len(records), batch_size):
+            response = client.post(
+                f"{args.url}/ingest", json={"videos": records[start : start + batch_size]}
+            )
+            response.raise_for_status()
+            result = response.json()
+            changed = [c for c in result["channels"] if c["top_changed_at"] is not None]
+            invalidated = sum(c["pattern_analyses_invalidated"] for c in result["channels"])
+            print(
+                f"{result['videos']} records, {len(result['channels'])} channels "
+                f"({len(changed)} re-ranked), {invalidated} analyses invalidated, "
+                f"version {result['dataset_version']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Admission control in front of the agent graph.
+
+At most max_in_flight graph runs execute at once; further requests wait in a
+bounded queue and are rejected with a Retry-After hint once it is full.
+Waiting requests are admitted by priority ("interactive" before "batch") and,
+within a priority, round-robin across clients and then across each client's
+channels, so one heavy client or channel cannot starve the others.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+
+from config import (
+    ADMISSION_MAX_IN_FLIGHT,
+    ADMISSION_MAX_QUEUE,
+    ADMISSION_QUEUE_TIMEOUT,
+    PRIORITIES,
+)
+from src.metrics import metrics
+
+admission_wait_seconds = metrics.histogram(
+    "admission_wait_seconds", "Time requests waited for admission", ("priority",)
+)
+
+
+class AdmissionRejected(Exception):
+    """The request was not admitted; retry after retry_after seconds"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bounded, prioritized and fair queue in front of a fixed number of execution slots"""
+
+    def __init__(
+        self,
+        max_in_flight: int = ADMISSION_MAX_IN_FLIGHT,
+        max_queue: int = ADMISSION_MAX_QUEUE,
+        queue_timeout: float = ADMISSION_QUEUE_TIMEOUT,
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            max_in_flight: Requests executing at once (0 admits everything)
+            max_queue: Requests allowed to wait for a slot; more are rejected at once
+            queue_timeout: Seconds a request may wait before it is rejected
+        """
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        # priority -> client -> channel -> waiters, each level in round-robin order
+        self._queues: Dict[str, OrderedDict] = {priority: OrderedDict() for priority in PRIORITIES}
+        self._queued = {priority: 0 for priority in PRIORITIES}
+        self._stats_lock = threading.Lock()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.peak_queued = 0
+        self.total_wait_seconds = 0.0
+        self.avg_service_seconds = 1.0  # moving average of slot hold times
+
+    @asynccontextmanager
+    async def admit(self, priority: str, client: str, channel: str):
+        """
+        Hold an execution slot for the duration of the block.
+
+        Args:
+            priority: One of PRIORITIES; earlier priorities are admitted first
+            client: Identity of the caller, for fairness between clients
+            channel: Channel of the request, for fairness within a client
+
+        Raises:
+            AdmissionRejected: The queue is full or the wait exceeded queue_timeout
+        """
+        start = time.perf_counter()
+        await self._acquire(priority, client, channel)
+        waited = time.perf_counter() - start
+        admission_wait_seconds.observe(waited, priority=priority)
+        with self._stats_lock:
+            self.admitted += 1
+            self.total_wait_seconds += waited
+
+        held_from = time.perf_counter()
+        try:
+            yield
+        finally:
+            held = time.perf_counter() - held_from
+            self.avg_service_seconds += 0.1 * (held - self.avg_service_seconds)
+            self._release()
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free for a newly queued request"""
+        queued = sum(self._queued.values())
+        slots = max(self.max_in_flight, 1)
+        return max(1, math.ceil(self.avg_service_seconds * (queued + 1) / slots))
+
+    def stats(self) -> dict:
+        """Slots, queue depth per priority, and admission counters"""
+        with self._stats_lock:
+            return {
+                "max_in_flight": self.max_in_flight,
+                "max_queue": self.max_queue,
+                "in_flight": self.in_flight,
+                "queued": sum(self._queued.values()),
+                **{f"queued_{priority}": count for priority, count in self._queued.items()},
+                "peak_queued": self.peak_queued,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "avg_wait_seconds": (
+                    self.total_wait_seconds / self.admitted if self.admitted else 0.0
+                ),
+                "avg_service_seconds": self.avg_service_seconds,
+            }
+
+    async def _acquire(self, priority: str, client: str, channel: str) -> None:
+        # Everything below runs on the event loop without awaiting, so it is atomic
+        if self.max_in_flight <= 0 or (
+            self.in_flight < self.max_in_flight and not any(self._queued.values())
+        ):
+            self.in_flight += 1
+            return
+
+        if sum(self._queued.values()) >= self.max_queue:
+            with self._stats_lock:
+                self.rejected += 1
+            raise AdmissionRejected("Server busy: admission queue is full", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        channels = self._queues[priority].setdefault(client, OrderedDict())
+        channels.setdefault(channel, deque()).append(waiter)
+        self._queued[priority] += 1
+        with self._stats_lock:
+            self.peak_queued = max(self.peak_queued, sum(self._queued.values()))
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot while giving up: hand it to the next waiter
+                self._release()
+            else:
+                waiter.cancel()
+                self._discard(priority, client, channel, waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            with self._stats_lock:
+                self.timed_out += 1
+            raise AdmissionRejected(
+                f"Server busy: not admitted within {self.queue_timeout:g}s", self.retry_after()
+            )
+
+    def _release(self) -> None:
+        # The slot passes straight to the next waiter, so in_flight only drops when none wait
+        waiter = self._next_waiter()
+        if waiter is None:
+            self.in_flight -= 1
+        else:
+            waiter.set_result(None)
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        for priority in PRIORITIES:
+            clients = self._queues[priority]
+            if not clients:
+                continue
+            client, channels = next(iter(clients.items()))
+            channel, waiters = next(iter(channels.items()))
+            waiter = waiters.popleft()
+            self._queued[priority] -= 1
+            # Served client and channel go to the back of their round-robin order
+            self._rotate(channels, channel, waiters)
+            self._rotate(clients, client, channels)
+            return waiter
+        return None
+
+    def _discard(self, priority: str, client: str, channel: str, waiter: asyncio.Future) -> None:
+        clients = self._queues[priority]
+        channels = clients.get(client)
+        waiters: Optional[Deque] = channels.get(channel) if channels else None
+        if waiters is None or waiter not in waiters:
+            return
+        waiters.remove(waiter)
+        self._queued[priority] -= 1
+        if not waiters:
+            del channels[channel]
+        if not channels:
+            del clients[client]
+
+    @staticmethod
+    def _rotate(order: OrderedDict, key: str, remaining) -> None:
+        if remaining:
+            order.move_to_end(key)
+        else:
+            del order[key]
+
+
+# Graph executions of the title endpoints and background jobs
+admission = AdmissionController()
@@ -1,13 +1,30 @@
 from src.agents.data_retriever import load_channel_data_node
 from src.agents.performance_analyser import identify_top_performers_node
-from src.agents.pattern_extractor import extract_title_patterns_with_llm_node
-from src.agents.title_generator import generate_titles_node
+from src.agents.title_statistics import compute_title_stats_node, summarize_title_stats_node
+from src.agents.pattern_extractor import (
+    extract_title_patterns_with_llm_node,
+    aextract_title_patterns_with_llm_node,
+)
+from src.agents.title_generator import generate_titles_node, agenerate_titles_node
+from src.agents.fused_generator import (
+    analyze_and_generate_titles_node,
+    aanalyze_and_generate_titles_node,
+)
 from src.agents.responder import respond_node
+from src.agents.streaming_retriever import stream_top_performers_node, astream_top_performers_node
 
 __all__ = [
     "load_channel_data_node",
     "identify_top_performers_node",
+    "compute_title_stats_node",
+    "summarize_title_stats_node",
     "extract_title_patterns_with_llm_node",
+    "aextract_title_patterns_with_llm_node",
     "generate_titles_node",
+    "agenerate_titles_node",
+    "analyze_and_generate_titles_node",
+    "aanalyze_and_generate_titles_node",
     "respond_node",
+    "stream_top_performers_node",
+    "astream_top_performers_node",
 ]
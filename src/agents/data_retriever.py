@@ -1,45 +1,43 @@
-import pandas as pd
 from langchain_core.messages import AIMessage
 
-from config import DATA_PATH
+from src.data_store import data_store
 from src.state import AgentState
 
+# Only the columns the graph uses are materialized for a request
+RETRIEVER_COLUMNS = ["channel_id", "video_id", "title", "summary", "views_in_period"]
 
-def load_channel_data_node(state: AgentState) -> AgentState:
+
+def load_channel_data_node(state: AgentState) -> dict:
     """
-    Agent 1: Data Retriever - Loads and filters data by channel_id
+    Agent 1: Data Retriever - Looks up the channel in the resident data store
+
+    The channel's rows stay in the data store; only its size and the dataset
+    version are recorded in the state.
 
     Args:
         state: Current agent state
 
     Returns:
-        Updated agent state with loaded data
+        Partial state update with the channel size and dataset version
     """
     try:
-        # Load data
-        df = pd.read_csv(DATA_PATH)
-
-        # Filter by channel_id and select relevant columns
-        df_filtered = df[df["channel_id"] == state.channel_id][
-            ["channel_id", "video_id", "title", "summary", "views_in_period"]
-        ]
+        snapshot = data_store.snapshot
+        total_videos = snapshot.channel_size(state.channel_id)
 
         # Check if channel exists
-        if df_filtered.empty:
+        if total_videos == 0:
             raise ValueError(f"Channel ID '{state.channel_id}' not found in the dataset")
 
-        message = f"Retrieved {len(df_filtered)} videos for channel {state.channel_id}"
+        message = f"Retrieved {total_videos} videos for channel {state.channel_id}"
 
-        return AgentState(
-            messages=state.messages + [AIMessage(content=message)],
-            raw_data=df_filtered,
-            channel_id=state.channel_id,
-            top_n=state.top_n,
-            new_video_summary=state.new_video_summary,
-        )
+        return {
+            "messages": [AIMessage(content=message)],
+            "total_videos": total_videos,
+            "dataset_version": snapshot.version,
+        }
 
     except FileNotFoundError:
-        raise FileNotFoundError(f"Data file not found: {DATA_PATH}")
+        raise FileNotFoundError(f"Data file not found: {data_store.data_path}")
     except ValueError:
         raise
     except Exception as e:
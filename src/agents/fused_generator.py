@@ -0,0 +1,202 @@
+from typing import List
+
+from config import FUSED_MAX_TOKENS, TITLE_GENERATION_TEMPERATURE
+from src.agents.pattern_extractor import (
+    MISSING_API_KEY_MESSAGE,
+    _pattern_state,
+    aextract_title_patterns_with_llm_node,
+    extract_title_patterns_with_llm_node,
+)
+from src.agents.title_generator import _titles_state, agenerate_titles_node, generate_titles_node
+from src.cache import pattern_cache, pattern_cache_key
+from src.state import AgentState
+from src.utils import (
+    get_anthropic_client,
+    get_async_anthropic_client,
+    call_claude_with_retry,
+    acall_claude_with_retry,
+    add_message_to_state,
+    get_token_writer,
+    format_titles_with_views,
+)
+from src.prompt_manager import prompt_manager
+from src.summary_cache import summary_cache, summary_scope
+
+OPERATION_NAME = "Fused analysis and titles"
+
+# Structured output: the model is forced to call this tool, so its input
+# carries the analysis and the titles as separate fields
+FUSED_TOOL = {
+    "name": "record_analysis_and_titles",
+    "description": "Record the pattern analysis of the channel's top titles and the new titles",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "pattern_analysis": {
+                "type": "string",
+                "description": "The pattern analysis of the top performing titles (step 1)",
+            },
+            "titles": {
+                "type": "array",
+                "description": "3-5 title options for the new video (step 2)",
+                "minItems": 3,
+                "maxItems": 5,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "title": {"type": "string"},
+                        "reasoning": {"type": "string"},
+                    },
+                    "required": ["title", "reasoning"],
+                },
+            },
+        },
+        "required": ["pattern_analysis", "titles"],
+    },
+}
+
+
+def analyze_and_generate_titles_node(state: AgentState) -> dict:
+    """
+    Agents 3+4 fused: analyzes title patterns and generates titles in one Claude call
+
+    Args:
+        state: Current agent state
+
+    Returns:
+        Partial state update with extracted patterns and generated titles
+    """
+    if not state.top_performers:
+        return add_message_to_state("No top performers to analyze.")
+
+    # Without a summary only the analysis is needed
+    if not state.new_video_summary:
+        return extract_title_patterns_with_llm_node(state)
+
+    # With a cached analysis only the titles are missing
+    cache_key = pattern_cache_key(state.channel_id, state.top_n, state.top_performers)
+    cached_analysis = pattern_cache.get(cache_key)
+    if cached_analysis is not None:
+        patterns = _pattern_state(cached_analysis, cached=True)
+        return _merge(patterns, generate_titles_node(state.model_copy(update=patterns)))
+
+    # Get Anthropic client
+    client = get_anthropic_client()
+    if not client:
+        return add_message_to_state(MISSING_API_KEY_MESSAGE)
+
+    # Call Claude API with retry logic
+    output, success = call_claude_with_retry(
+        client=client,
+        **_render_prompt(state),
+        max_tokens=FUSED_MAX_TOKENS,
+        temperature=TITLE_GENERATION_TEMPERATURE,
+        operation_name=OPERATION_NAME,
+        deadline=state.deadline,
+        tool=FUSED_TOOL,
+    )
+
+    return _handle_response(state, cache_key, output, success)
+
+
+async def aanalyze_and_generate_titles_node(state: AgentState) -> dict:
+    """
+    Agents 3+4 fused (async): Uses AsyncAnthropic so the event loop stays free
+
+    Args:
+        state: Current agent state
+
+    Returns:
+        Partial state update with extracted patterns and generated titles
+    """
+    if not state.top_performers:
+        return add_message_to_state("No top performers to analyze.")
+
+    # Without a summary only the analysis is needed
+    if not state.new_video_summary:
+        return await aextract_title_patterns_with_llm_node(state)
+
+    # With a cached analysis only the titles are missing
+    cache_key = pattern_cache_key(state.channel_id, state.top_n, state.top_performers)
+    cached_analysis = pattern_cache.get(cache_key)
+    if cached_analysis is not None:
+        patterns = _pattern_state(cached_analysis, cached=True)
+        return _merge(patterns, await agenerate_titles_node(state.model_copy(update=patterns)))
+
+    # Get Anthropic client
+    client = get_async_anthropic_client()
+    if not client:
+        return add_message_to_state(MISSING_API_KEY_MESSAGE)
+
+    # Call Claude API with retry logic
+    output, success = await acall_claude_with_retry(
+        client=client,
+        **_render_prompt(state),
+        max_tokens=FUSED_MAX_TOKENS,
+        temperature=TITLE_GENERATION_TEMPERATURE,
+        operation_name=OPERATION_NAME,
+        deadline=state.deadline,
+        on_event=get_token_writer("fused_generation"),
+        tool=FUSED_TOOL,
+    )
+
+    return _handle_response(state, cache_key, output, success)
+
+
+def format_title_options(titles: List[dict]) -> str:
+    """
+    Render structured title options in the numbered format of the title generator.
+
+    Args:
+        titles: Dicts with 'title' and 'reasoning'
+
+    Returns:
+        Numbered titles, each followed by its reasoning
+    """
+    return "\n\n".join(
+        f"{i}. **{option.get('title', '').strip()}**\n"
+        f"Reasoning: {option.get('reasoning', '').strip()}"
+        for i, option in enumerate(titles, start=1)
+    )
+
+
+def _render_prompt(state: AgentState) -> dict:
+    # Instructions, then the channel's titles as a cacheable context shared by
+    # every summary of the channel, then the summary
+    return {
+        "system": prompt_manager.render(
+            "fused_generation_system.jinja2", tool_name=FUSED_TOOL["name"]
+        ),
+        "context": prompt_manager.render(
+            "pattern_analysis.jinja2",
+            top_n=state.top_n,
+            titles=format_titles_with_views(state.top_performers),
+        ),
+        "prompt": prompt_manager.render(
+            "title_generation.jinja2", video_summary=state.new_video_summary
+        ),
+    }
+
+
+def _handle_response(state: AgentState, cache_key: str, output, success: bool) -> dict:
+    if not success:
+        return add_message_to_state(output)  # Error message already formatted
+
+    pattern_analysis = str(output.get("pattern_analysis") or "").strip()
+    titles = [option for option in output.get("titles") or [] if isinstance(option, dict)]
+    if not pattern_analysis or not titles:
+        return add_message_to_state(f"Error: incomplete {FUSED_TOOL['name']} call")
+
+    generated_titles = format_title_options(titles)
+    pattern_cache.set(cache_key, pattern_analysis)
+    scope = summary_scope(state.channel_id, pattern_analysis, state.top_performers)
+    summary_cache.set(scope, state.new_video_summary, generated_titles)
+
+    return _merge(
+        _pattern_state(pattern_analysis, cached=False), _titles_state(generated_titles, True)
+    )
+
+
+def _merge(patterns: dict, titles: dict) -> dict:
+    # One update holding both stages' fields and messages
+    return {**patterns, **titles, "messages": patterns["messages"] + titles.get("messages", [])}
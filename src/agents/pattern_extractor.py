@@ -1,17 +1,35 @@
+import asyncio
+import time
+from typing import Callable, Optional, Tuple
+
 from langchain_core.messages import AIMessage
 
-from config import PATTERN_ANALYSIS_TEMPERATURE
+from config import PATTERN_ANALYSIS_TEMPERATURE, REQUEST_DEADLINE
+from src.cache import pattern_cache, pattern_cache_key
+from src.singleflight import pattern_analysis_flight
 from src.state import AgentState
 from src.utils import (
     get_anthropic_client,
+    get_async_anthropic_client,
     call_claude_with_retry,
+    acall_claude_with_retry,
     add_message_to_state,
+    get_token_writer,
     format_titles_with_views,
 )
 from src.prompt_manager import prompt_manager
 
+MISSING_API_KEY_MESSAGE = (
+    "ANTHROPIC_API_KEY not found!\n\n"
+    "Please create a .env file in your project root with:\n"
+    "ANTHROPIC_API_KEY=your-api-key-here"
+)
+DEADLINE_MESSAGE = (
+    "Error: DeadlineExceeded\n\nDetails: Deadline exceeded waiting for pattern extraction\n\n"
+)
+
 
-def extract_title_patterns_with_llm_node(state: AgentState) -> AgentState:
+def extract_title_patterns_with_llm_node(state: AgentState) -> dict:
     """
     Agent 3: LLM Pattern Extractor - Uses Claude to analyze title patterns
 
@@ -19,48 +37,158 @@ def extract_title_patterns_with_llm_node(state: AgentState) -> AgentState:
         state: Current agent state
 
     Returns:
-        Updated agent state with extracted patterns
+        Partial state update with extracted patterns
     """
-    if state.top_performers is None or state.top_performers.empty:
-        return add_message_to_state(state, "No top performers to analyze.")
+    if not state.top_performers:
+        return add_message_to_state("No top performers to analyze.")
+
+    # Reuse a previous analysis of the same top-N titles
+    cache_key = pattern_cache_key(state.channel_id, state.top_n, state.top_performers)
+    cached_analysis = pattern_cache.get(cache_key)
+    if cached_analysis is not None:
+        return _pattern_state(cached_analysis, cached=True)
 
     # Get Anthropic client
     client = get_anthropic_client()
     if not client:
-        error_msg = (
-            "ANTHROPIC_API_KEY not found!\n\n"
-            "Please create a .env file in your project root with:\n"
-            "ANTHROPIC_API_KEY=your-api-key-here"
-        )
-        return add_message_to_state(state, error_msg)
-
-    # Prepare data for analysis
-    titles_data = format_titles_with_views(state.top_performers)
-
-    # Render prompt using Jinja2 template
-    prompt = prompt_manager.render("pattern_analysis.jinja2", top_n=state.top_n, titles=titles_data)
+        return add_message_to_state(MISSING_API_KEY_MESSAGE)
 
     # Call Claude API with retry logic
     pattern_analysis, success = call_claude_with_retry(
         client=client,
-        prompt=prompt,
+        **_render_prompt(state),
         temperature=PATTERN_ANALYSIS_TEMPERATURE,
         operation_name="Pattern extraction",
+        deadline=state.deadline,
     )
 
-    if success:
-        message = "AI-Powered Title Pattern Analysis:\n\n" + pattern_analysis
-    else:
-        message = pattern_analysis  # Error message already formatted
-        pattern_analysis = ""
-
-    return AgentState(
-        messages=state.messages + [AIMessage(content=message)],
-        raw_data=state.raw_data,
-        top_performers=state.top_performers,
-        filtered_data=state.filtered_data,
-        title_patterns=pattern_analysis,
-        channel_id=state.channel_id,
-        top_n=state.top_n,
-        new_video_summary=state.new_video_summary,
+    return _handle_response(cache_key, pattern_analysis, success)
+
+
+async def aextract_title_patterns_with_llm_node(state: AgentState) -> dict:
+    """
+    Agent 3 (async): LLM Pattern Extractor - Uses AsyncAnthropic so the event loop stays free
+
+    Args:
+        state: Current agent state
+
+    Returns:
+        Partial state update with extracted patterns
+    """
+    if not state.top_performers:
+        return add_message_to_state("No top performers to analyze.")
+
+    # Reuse a previous analysis of the same top-N titles
+    cache_key = pattern_cache_key(state.channel_id, state.top_n, state.top_performers)
+    cached_analysis = pattern_cache.get(cache_key)
+    if cached_analysis is not None:
+        return _pattern_state(cached_analysis, cached=True)
+
+    # Get Anthropic client
+    client = get_async_anthropic_client()
+    if not client:
+        return add_message_to_state(MISSING_API_KEY_MESSAGE)
+
+    # A streamed run needs its own call: the tokens go to this run's stream only
+    on_event = get_token_writer("pattern_analysis")
+    if on_event is not None:
+        pattern_analysis, success = await _aanalyze(client, state, state.deadline, on_event)
+        return _handle_response(cache_key, pattern_analysis, success)
+
+    # Concurrent requests for the same analysis wait for one shared call
+    try:
+        (pattern_analysis, success), _ = await asyncio.wait_for(
+            pattern_analysis_flight.do(
+                cache_key,
+                lambda: _aanalyze(
+                    client, state, _shared_deadline(state.deadline), cache_key=cache_key
+                ),
+            ),
+            timeout=None if state.deadline is None else max(0.0, state.deadline - time.time()),
+        )
+    except asyncio.TimeoutError:
+        return add_message_to_state(DEADLINE_MESSAGE)
+
+    return _handle_response(cache_key, pattern_analysis, success)
+
+
+async def _aanalyze(
+    client,
+    state: AgentState,
+    deadline: Optional[float],
+    on_event: Optional[Callable[[dict], None]] = None,
+    cache_key: Optional[str] = None,
+) -> Tuple[str, bool]:
+    """
+    Make the pattern analysis call, caching the result under cache_key if given.
+
+    Run through pattern_analysis_flight, the call is shared by every request
+    for the same analysis, so it does not take the first caller's deadline:
+    it is bounded by _shared_deadline, and each caller stops waiting at its own
+    deadline while the call continues for the others (its result is cached
+    here, so it is not lost if they all give up). Shared calls send no token
+    events; streamed runs make their own call instead of joining one.
+
+    Args:
+        client: AsyncAnthropic client
+        state: Current agent state
+        deadline: Unix timestamp bounding all attempts
+        on_event: Callback for the streamed response's token events
+        cache_key: Pattern cache key to store a successful analysis under
+
+    Returns:
+        Tuple of (analysis or error message, success_boolean)
+    """
+    pattern_analysis, success = await acall_claude_with_retry(
+        client=client,
+        **_render_prompt(state),
+        temperature=PATTERN_ANALYSIS_TEMPERATURE,
+        operation_name="Pattern extraction",
+        deadline=deadline,
+        on_event=on_event,
     )
+    if success and cache_key is not None:
+        pattern_cache.set(cache_key, pattern_analysis)
+    return pattern_analysis, success
+
+
+def _shared_deadline(deadline: Optional[float]) -> Optional[float]:
+    # Late enough for any request that may join the call (API deadlines are capped
+    # at REQUEST_DEADLINE); a caller without a deadline leaves the call unbounded
+    if deadline is None:
+        return None
+    return max(deadline, time.time() + REQUEST_DEADLINE)
+
+
+def _render_prompt(state: AgentState) -> dict:
+    # Prepare data for analysis
+    titles_data = format_titles_with_views(state.top_performers)
+
+    # Instructions as the system prompt, the channel's titles after them. Each
+    # analysis runs once per top-N titles (later ones hit pattern_cache), and the
+    # system prompt alone is below PROMPT_CACHE_MIN_TOKENS, so nothing is marked
+    # for prompt caching here
+    return {
+        "system": prompt_manager.render("pattern_analysis_system.jinja2"),
+        "prompt": prompt_manager.render(
+            "pattern_analysis.jinja2", top_n=state.top_n, titles=titles_data
+        ),
+    }
+
+
+def _handle_response(cache_key: str, pattern_analysis: str, success: bool) -> dict:
+    if not success:
+        return add_message_to_state(pattern_analysis)  # Error message already formatted
+
+    pattern_cache.set(cache_key, pattern_analysis)
+    return _pattern_state(pattern_analysis, cached=False)
+
+
+def _pattern_state(pattern_analysis: str, cached: bool) -> dict:
+    message = "AI-Powered Title Pattern Analysis:\n\n" + pattern_analysis
+
+    return {
+        "messages": [AIMessage(content=message)],
+        "title_patterns": pattern_analysis,
+        "patterns_cached": cached,
+    }
@@ -1,42 +1,74 @@
+from typing import List
+
 from langchain_core.messages import AIMessage
 
+from config import DEFAULT_RANKING_METRIC, OUTLIER_ZSCORE
+from src.data_store import data_store
 from src.state import AgentState
-from src.utils import add_message_to_state
+from src.utils import add_message_to_state, top_performer_records
+
+# Columns needed to rank a channel and build the top performer records
+RANKING_COLUMNS = ["video_id", "title", "views_in_period"]
 
 
-def identify_top_performers_node(state: AgentState) -> AgentState:
+def summarize_top_performers(
+    top_performers: List[dict], metric: str = DEFAULT_RANKING_METRIC
+) -> str:
     """
-    Agent 2: Performance Analyzer - Identifies top performing videos
+    Build the progress message describing the top performing videos.
 
     Args:
-        state: Current agent state
+        top_performers: Top performer records with 'views_in_period', 'median_ratio'
+            and 'zscore' keys
+        metric: Ranking metric the videos were selected by
 
     Returns:
-        Updated agent state with top performers identified
+        Summary message with total and average views and their standing in the channel
     """
-    if state.raw_data is None or state.raw_data.empty:
-        return add_message_to_state(state, "No data available to analyze.")
-
-    # Get top N performers
-    df_top = state.raw_data.nlargest(state.top_n, "views_in_period")
-
-    # Calculate statistics
-    total_views = df_top["views_in_period"].sum()
-    avg_views = df_top["views_in_period"].mean()
-    csv_text = df_top.to_string(index=False)
+    total_views = sum(video["views_in_period"] for video in top_performers)
+    avg_views = total_views / len(top_performers)
 
     message = (
-        f"Identified top {len(df_top)} performing videos:\n"
+        f"Identified top {len(top_performers)} performing videos:\n"
         f"- Total views: {total_views:,}\n"
         f"- Average views: {avg_views:,.0f}\n"
     )
+    avg_ratio = sum(video["median_ratio"] for video in top_performers) / len(top_performers)
+    avg_zscore = sum(video["zscore"] for video in top_performers) / len(top_performers)
+    message += f"- Average {avg_ratio:.2f}x the channel median views (z-score {avg_zscore:.2f})\n"
+    if metric == "outliers":
+        message += f"- Outliers only (z-score >= {OUTLIER_ZSCORE})\n"
+    return message
 
-    return AgentState(
-        messages=state.messages + [AIMessage(content=message)],
-        raw_data=state.raw_data,
-        top_performers=df_top,
-        filtered_data=csv_text,
-        channel_id=state.channel_id,
-        top_n=state.top_n,
-        new_video_summary=state.new_video_summary,
-    )
+
+def identify_top_performers_node(state: AgentState) -> dict:
+    """
+    Agent 2: Performance Analyzer - Identifies top performing videos
+
+    Args:
+        state: Current agent state
+
+    Returns:
+        Partial state update with the top performer records
+    """
+    metric = state.ranking_metric
+    snapshot = data_store.snapshot
+
+    # Slice of the channel's precomputed ranking; no per-request sort
+    df_top = snapshot.top_videos(state.channel_id, state.top_n, metric, columns=RANKING_COLUMNS)
+    if df_top is None:
+        return add_message_to_state("No data available to analyze.")
+    if df_top.empty:
+        return add_message_to_state(f"No videos qualify as top performers by {metric}.")
+
+    top_performers = top_performer_records(df_top)
+    update = {
+        "messages": [AIMessage(content=summarize_top_performers(top_performers, metric))],
+        "top_performers": top_performers,
+    }
+
+    # The data store may have swapped in a new snapshot since the channel was looked up
+    if snapshot.version != state.dataset_version:
+        update["total_videos"] = snapshot.channel_size(state.channel_id)
+        update["dataset_version"] = snapshot.version
+    return update
@@ -2,7 +2,7 @@ from src.state import AgentState
 from src.utils import add_message_to_state
 
 
-def respond_node(state: AgentState) -> AgentState:
+def respond_node(state: AgentState) -> dict:
     """
     Agent 5: Responder - Formats and presents the results
 
@@ -10,7 +10,7 @@ def respond_node(state: AgentState) -> AgentState:
         state: Current agent state
 
     Returns:
-        Updated agent state with final response
+        Partial state update with the final response message
     """
     response_parts = [f"\n{'=' * 80}\nSUMMARY\n{'=' * 80}\n"]
 
@@ -31,4 +31,4 @@ def respond_node(state: AgentState) -> AgentState:
             "To generate titles, provide a new_video_summary parameter."
         )
 
-    return add_message_to_state(state, "\n".join(response_parts))
+    return add_message_to_state("\n".join(response_parts))
@@ -0,0 +1,124 @@
+import asyncio
+import heapq
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+from langchain_core.messages import AIMessage
+
+from config import DATA_PATH, STREAM_CHUNK_SIZE
+from src.agents.data_retriever import RETRIEVER_COLUMNS
+from src.agents.performance_analyser import summarize_top_performers
+from src.data_store import RANKING_METRICS, ranking_scores
+from src.state import AgentState
+from src.utils import top_performer_records
+
+
+def stream_channel_top_n(
+    data_path: str, channel_id: str, top_n: int, chunk_size: int = STREAM_CHUNK_SIZE
+) -> Tuple[pd.DataFrame, int]:
+    """
+    Scan the CSV in chunks and keep a bounded heap of a channel's top videos.
+
+    Memory stays O(chunk_size + top_n) rows regardless of file size, plus
+    the channel's view counts, which are needed for its ranking scores. Ties
+    on views are broken by file order, matching DataFrame.nlargest(keep="first").
+
+    Args:
+        data_path: Path to the CSV dataset
+        channel_id: YouTube channel ID
+        top_n: Number of top videos to keep
+        chunk_size: Rows parsed per chunk
+
+    Returns:
+        Tuple of (top performers sorted by views descending with their
+        ranking scores, total channel videos)
+    """
+    # Min-heap of (views, -row_number, row); the root is the weakest kept video
+    heap: List[Tuple[int, int, tuple]] = []
+    channel_views: List[np.ndarray] = []
+    total_videos = 0
+
+    for chunk in pd.read_csv(data_path, usecols=RETRIEVER_COLUMNS, chunksize=chunk_size):
+        rows = chunk[chunk["channel_id"] == channel_id]
+        if rows.empty:
+            continue
+        total_videos += len(rows)
+        channel_views.append(rows["views_in_period"].to_numpy())
+
+        # Only the chunk's own top_n can enter the overall top_n
+        candidates = rows.nlargest(top_n, "views_in_period")[RETRIEVER_COLUMNS]
+        for row_number, row in zip(candidates.index, candidates.itertuples(index=False)):
+            entry = (row.views_in_period, -row_number, tuple(row))
+            if len(heap) < top_n:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+    ranked = sorted(heap, reverse=True)
+    df_top = pd.DataFrame([row for _, _, row in ranked], columns=RETRIEVER_COLUMNS)
+
+    if total_videos:
+        views = np.concatenate(channel_views)
+        df_top = df_top.assign(
+            **ranking_scores(df_top["views_in_period"], np.median(views), views.mean(), views.std())
+        )
+    return df_top, total_videos
+
+
+def stream_top_performers_node(state: AgentState) -> dict:
+    """
+    Agents 1+2 (streaming): Finds a channel's top performers in one chunked pass
+
+    Used instead of the data retriever and performance analyzer when the
+    dataset does not fit in memory. Only the top N rows are kept, and
+    total_videos carries the channel size.
+
+    Args:
+        state: Current agent state
+
+    Returns:
+        Partial state update with the top performer records
+    """
+    try:
+        df_top, total_videos = stream_channel_top_n(DATA_PATH, state.channel_id, state.top_n)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Data file not found: {DATA_PATH}")
+
+    if total_videos == 0:
+        raise ValueError(f"Channel ID '{state.channel_id}' not found in the dataset")
+
+    metric = state.ranking_metric
+    if metric not in RANKING_METRICS:
+        raise ValueError(f"Unknown ranking metric '{metric}'")
+    if metric == "outliers":
+        df_top = df_top[df_top["is_outlier"]]
+
+    messages = [
+        AIMessage(content=f"Retrieved {total_videos} videos for channel {state.channel_id}")
+    ]
+    if df_top.empty:
+        messages.append(AIMessage(content=f"No videos qualify as top performers by {metric}."))
+        return {"messages": messages, "total_videos": total_videos}
+
+    top_performers = top_performer_records(df_top)
+    messages.append(AIMessage(content=summarize_top_performers(top_performers, metric)))
+
+    return {
+        "messages": messages,
+        "top_performers": top_performers,
+        "total_videos": total_videos,
+    }
+
+
+async def astream_top_performers_node(state: AgentState) -> dict:
+    """
+    Agents 1+2 (streaming, async): Runs the chunked scan in a worker thread
+
+    Args:
+        state: Current agent state
+
+    Returns:
+        Partial state update with the top performer records
+    """
+    return await asyncio.to_thread(stream_top_performers_node, state)
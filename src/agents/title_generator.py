@@ -4,14 +4,21 @@ from config import TITLE_GENERATION_TEMPERATURE
 from src.state import AgentState
 from src.utils import (
     get_anthropic_client,
+    get_async_anthropic_client,
     call_claude_with_retry,
+    acall_claude_with_retry,
     add_message_to_state,
+    get_token_writer,
     get_example_titles,
 )
 from src.prompt_manager import prompt_manager
+from src.summary_cache import summary_cache, summary_scope
+from src.title_stats import format_title_stats
 
+SKIP_MESSAGE = "Skipping title generation (missing API key or patterns)"
 
-def generate_titles_node(state: AgentState) -> AgentState:
+
+def generate_titles_node(state: AgentState) -> dict:
     """
     Agent 4: Title Generator - Creates new titles based on patterns
 
@@ -19,52 +26,110 @@ def generate_titles_node(state: AgentState) -> AgentState:
         state: Current agent state
 
     Returns:
-        Updated agent state with generated titles
+        Partial state update with generated titles
     """
     # Skip if no summary provided
     if not state.new_video_summary:
-        return state
+        return {}
 
     # Get Anthropic client
     client = get_anthropic_client()
     if not client or not state.title_patterns:
-        return add_message_to_state(
-            state, "Skipping title generation (missing API key or patterns)"
-        )
+        return add_message_to_state(SKIP_MESSAGE)
 
-    # Prepare example titles
-    example_titles = get_example_titles(state.top_performers)
+    # Reuse titles of an identical or near-duplicate summary
+    scope = summary_scope(state.channel_id, state.title_patterns, state.top_performers)
+    cached_titles = summary_cache.get(scope, state.new_video_summary)
+    if cached_titles is not None:
+        return _titles_state(cached_titles, True, cached=True)
 
-    # Render prompt using Jinja2 template
-    prompt = prompt_manager.render(
-        "title_generation.jinja2",
-        video_summary=state.new_video_summary,
-        pattern_analysis=state.title_patterns,
-        example_titles=example_titles,
+    # Call Claude API with retry logic
+    generated_titles, success = call_claude_with_retry(
+        client=client,
+        **_render_prompt(state),
+        temperature=TITLE_GENERATION_TEMPERATURE,
+        operation_name="Title generation",
+        deadline=state.deadline,
     )
 
+    if success:
+        summary_cache.set(scope, state.new_video_summary, generated_titles)
+    return _titles_state(generated_titles, success)
+
+
+async def agenerate_titles_node(state: AgentState) -> dict:
+    """
+    Agent 4 (async): Title Generator - Uses AsyncAnthropic so the event loop stays free
+
+    Args:
+        state: Current agent state
+
+    Returns:
+        Partial state update with generated titles
+    """
+    # Skip if no summary provided
+    if not state.new_video_summary:
+        return {}
+
+    # Get Anthropic client
+    client = get_async_anthropic_client()
+    if not client or not state.title_patterns:
+        return add_message_to_state(SKIP_MESSAGE)
+
+    # Reuse titles of an identical or near-duplicate summary
+    scope = summary_scope(state.channel_id, state.title_patterns, state.top_performers)
+    cached_titles = summary_cache.get(scope, state.new_video_summary)
+    if cached_titles is not None:
+        return _titles_state(cached_titles, True, cached=True)
+
     # Call Claude API with retry logic
-    generated_titles, success = call_claude_with_retry(
+    generated_titles, success = await acall_claude_with_retry(
         client=client,
-        prompt=prompt,
+        **_render_prompt(state),
         temperature=TITLE_GENERATION_TEMPERATURE,
         operation_name="Title generation",
+        deadline=state.deadline,
+        on_event=get_token_writer("title_generation"),
     )
 
+    if success:
+        summary_cache.set(scope, state.new_video_summary, generated_titles)
+    return _titles_state(generated_titles, success)
+
+
+def _render_prompt(state: AgentState) -> dict:
+    # Prepare example titles
+    example_titles = get_example_titles(state.top_performers)
+    # Statistics go in as compact context, unless they already are the pattern analysis
+    title_stats = format_title_stats(state.title_stats) if state.title_stats else ""
+    if title_stats == state.title_patterns:
+        title_stats = ""
+
+    # Instructions and channel context form a cacheable prefix shared by every
+    # summary of the channel; only the summary is new input per call
+    return {
+        "system": prompt_manager.render("title_generation_system.jinja2"),
+        "context": prompt_manager.render(
+            "title_generation_context.jinja2",
+            pattern_analysis=state.title_patterns,
+            example_titles=example_titles,
+            title_stats=title_stats,
+        ),
+        "prompt": prompt_manager.render(
+            "title_generation.jinja2", video_summary=state.new_video_summary
+        ),
+    }
+
+
+def _titles_state(generated_titles: str, success: bool, cached: bool = False) -> dict:
     if success:
         message = "Generated Title Options:\n\n" + generated_titles
     else:
         message = generated_titles  # Error message already formatted
         generated_titles = ""
 
-    return AgentState(
-        messages=state.messages + [AIMessage(content=message)],
-        raw_data=state.raw_data,
-        top_performers=state.top_performers,
-        filtered_data=state.filtered_data,
-        title_patterns=state.title_patterns,
-        generated_titles=generated_titles,
-        channel_id=state.channel_id,
-        top_n=state.top_n,
-        new_video_summary=state.new_video_summary,
-    )
+    return {
+        "messages": [AIMessage(content=message)],
+        "generated_titles": generated_titles,
+        "titles_cached": cached,
+    }
@@ -0,0 +1,49 @@
+from langchain_core.messages import AIMessage
+
+from src.state import AgentState
+from src.title_stats import format_title_stats, title_stats_cache
+from src.utils import add_message_to_state
+
+
+def compute_title_stats_node(state: AgentState) -> dict:
+    """
+    Agent 2b: Title Statistician - Compares the top titles with the channel's titles locally
+
+    Args:
+        state: Current agent state
+
+    Returns:
+        Partial state update with the title statistics
+    """
+    if not state.top_performers:
+        return {}
+
+    stats = title_stats_cache.get_or_compute(
+        state.channel_id, state.top_performers, state.dataset_version
+    )
+    message = (
+        f"Computed title statistics of the top {stats['top_titles']} titles "
+        f"against {stats['channel_titles']} channel titles"
+    )
+    return {"messages": [AIMessage(content=message)], "title_stats": stats}
+
+
+def summarize_title_stats_node(state: AgentState) -> dict:
+    """
+    Agent 3 (fast mode): Uses the title statistics as the pattern analysis, without an LLM call
+
+    Args:
+        state: Current agent state
+
+    Returns:
+        Partial state update with the statistics as extracted patterns
+    """
+    if not state.title_stats:
+        return add_message_to_state("No title statistics to summarize.")
+
+    pattern_analysis = format_title_stats(state.title_stats)
+    return {
+        "messages": [AIMessage(content="Title Statistics:\n\n" + pattern_analysis)],
+        "title_patterns": pattern_analysis,
+        "patterns_cached": False,
+    }
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from config import PATTERN_CACHE_DB, PATTERN_CACHE_MAX_ENTRIES, PATTERN_CACHE_TTL
+
+
+def pattern_cache_key(channel_id: str, top_n: int, top_performers: List[dict]) -> str:
+    """
+    Build the cache key for a channel's pattern analysis.
+
+    The analysis only depends on the top-N titles and their views, so those
+    are hashed into the key: any change to the ranking yields a new key.
+
+    Args:
+        channel_id: YouTube channel ID
+        top_n: Number of top videos analyzed
+        top_performers: Top performer records with 'title' and 'views_in_period'
+
+    Returns:
+        Cache key string
+    """
+    payload = json.dumps(
+        [(video["title"], video["views_in_period"]) for video in top_performers],
+        ensure_ascii=False,
+        default=int,
+    )
+    digest = hashlib.blake2b(payload.encode(), digest_size=12).hexdigest()
+    return f"{channel_id}:{top_n}:{digest}"
+
+
+class PatternCache:
+    """LRU + TTL cache of pattern analyses with an optional SQLite store"""
+
+    def __init__(
+        self,
+        max_entries: int = PATTERN_CACHE_MAX_ENTRIES,
+        ttl: float = PATTERN_CACHE_TTL,
+        db_path: Optional[str] = PATTERN_CACHE_DB,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of analyses kept in memory
+            ttl: Seconds an analysis stays valid
+            db_path: SQLite file that persists analyses across restarts (None to disable)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS pattern_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached analysis.
+
+        Args:
+            key: Key from pattern_cache_key
+
+        Returns:
+            The cached analysis, or None on a miss or expired entry
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM pattern_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], row[1])
+                    self._store(key, entry)
+
+            if entry is not None and now - entry[1] > self.ttl:
+                self._delete(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Store an analysis.
+
+        Args:
+            key: Key from pattern_cache_key
+            value: Pattern analysis text
+        """
+        entry = (value, time.time())
+        with self._lock:
+            self._store(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO pattern_cache (key, value, created_at) "
+                    "VALUES (?, ?, ?)",
+                    (key, entry[0], entry[1]),
+                )
+                self._db.commit()
+
+    def invalidate_channel(self, channel_id: str, unchanged_top_n: int = 0) -> int:
+        """
+        Drop a channel's analyses whose top N reaches past an unchanged ranking prefix.
+
+        Args:
+            channel_id: YouTube channel ID
+            unchanged_top_n: Number of leading ranks that did not change; analyses
+                of at most that many videos stay cached
+
+        Returns:
+            Number of analyses dropped
+        """
+        prefix = f"{channel_id}:"
+
+        def is_stale(key: str) -> bool:
+            return int(key[len(prefix) :].split(":", 1)[0]) > unchanged_top_n
+
+        with self._lock:
+            keys = {key for key in self._entries if key.startswith(prefix)}
+            if self._db is not None:
+                rows = self._db.execute(
+                    "SELECT key FROM pattern_cache WHERE substr(key, 1, ?) = ?",
+                    (len(prefix), prefix),
+                ).fetchall()
+                keys.update(row[0] for row in rows)
+
+            stale = [key for key in keys if is_stale(key)]
+            for key in stale:
+                self._entries.pop(key, None)
+            if self._db is not None and stale:
+                self._db.executemany(
+                    "DELETE FROM pattern_cache WHERE key = ?", [(key,) for key in stale]
+                )
+                self._db.commit()
+            return len(stale)
+
+    def clear(self) -> None:
+        """Drop all cached analyses, including the on-disk store"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM pattern_cache")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "persistent": self._db is not None,
+            }
+
+    def _store(self, key: str, entry: Tuple[str, float]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM pattern_cache WHERE key = ?", (key,))
+            self._db.commit()
+
+
+pattern_cache = PatternCache()
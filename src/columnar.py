@@ -0,0 +1,130 @@
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from src.data_store import CHANNEL_COLUMNS, SCORE_COLUMNS, file_fingerprint, rank_channels
+
+INDEX_METADATA_KEY = b"channel_index"
+SOURCE_METADATA_KEY = b"source_version"
+
+
+def write_columnar(csv_path: str, output_path: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Convert the CSV dataset into a channel-sorted Arrow IPC file.
+
+    Rows are grouped by channel_id and sorted by views within a channel, with
+    the ranking scores stored as extra columns. The per-channel (offset,
+    length) index is stored in the schema metadata, so a reader can slice
+    one channel, or its top N videos, without scanning.
+
+    Args:
+        csv_path: Path to the source CSV
+        output_path: Path of the Arrow IPC file to write
+
+    Returns:
+        Mapping of channel_id to (row offset, row count)
+    """
+    df = rank_channels(pd.read_csv(csv_path, usecols=CHANNEL_COLUMNS)[CHANNEL_COLUMNS])
+
+    index = {}
+    counts = df.groupby("channel_id", sort=False).size()
+    offset = 0
+    for channel_id, count in counts.items():
+        index[channel_id] = (offset, int(count))
+        offset += int(count)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {
+            INDEX_METADATA_KEY: json.dumps(index).encode(),
+            SOURCE_METADATA_KEY: file_fingerprint(csv_path).encode(),
+        }
+    )
+
+    # Write uncompressed so readers can memory-map buffers without copying,
+    # and swap the file in atomically so readers never see a partial file
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, output_path)
+
+    return index
+
+
+def columnar_source_version(path: str) -> str:
+    """
+    Read the fingerprint of the CSV an Arrow file was converted from.
+
+    Only the schema is read, so this is cheap even for a large file.
+
+    Args:
+        path: Path to an Arrow IPC file produced by write_columnar
+
+    Returns:
+        The source CSV's file_fingerprint, or "" if the file does not record it
+    """
+    with pa.memory_map(path, "r") as source:
+        metadata = ipc.open_file(source).schema.metadata or {}
+    return metadata.get(SOURCE_METADATA_KEY, b"").decode()
+
+
+class ColumnarDataset:
+    """Read-only, memory-mapped view of a channel-sorted Arrow IPC file"""
+
+    def __init__(self, path: str):
+        """
+        Memory-map the file and load its channel index.
+
+        Args:
+            path: Path to an Arrow IPC file produced by write_columnar
+        """
+        self.path = path
+        source = pa.memory_map(path, "r")
+        self.table = ipc.open_file(source).read_all()
+
+        metadata = self.table.schema.metadata or {}
+        if INDEX_METADATA_KEY not in metadata:
+            raise ValueError(f"{path} has no channel index; re-run the columnar converter")
+        if not set(SCORE_COLUMNS) <= set(self.table.column_names):
+            raise ValueError(f"{path} has no ranking scores; re-run the columnar converter")
+
+        self.index: Dict[str, Tuple[int, int]] = {
+            channel_id: tuple(span)
+            for channel_id, span in json.loads(metadata[INDEX_METADATA_KEY]).items()
+        }
+        self.source_version = metadata.get(SOURCE_METADATA_KEY, b"").decode()
+
+    def read_channel(
+        self, channel_id: str, columns: Optional[List[str]] = None, limit: Optional[int] = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        Read one channel's row range, optionally projecting columns.
+
+        Args:
+            channel_id: YouTube channel ID
+            columns: Columns to materialize (all columns if None)
+            limit: Read only the first `limit` rows (the channel's top videos by views)
+
+        Returns:
+            DataFrame with the channel's videos, or None if the channel is unknown
+        """
+        span = self.index.get(channel_id)
+        if span is None:
+            return None
+
+        offset, length = span
+        if limit is not None:
+            length = min(length, limit)
+        rows = self.table.slice(offset, length)
+        if columns is not None:
+            rows = rows.select(columns)
+        return rows.to_pandas()
+
+    def channel_sizes(self) -> Dict[str, int]:
+        """Number of videos per channel"""
+        return {channel_id: length for channel_id, (_, length) in self.index.items()}
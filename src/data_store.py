@@ -0,0 +1,690 @@
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    COLUMNAR_AUTO_CONVERT,
+    COLUMNAR_DATA_PATH,
+    DATA_FORMAT,
+    DATA_PATH,
+    DATA_RELOAD_INTERVAL,
+    DEFAULT_RANKING_METRIC,
+    INGEST_LOG_DIR,
+    OUTLIER_ZSCORE,
+)
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_COLUMNS = ["channel_id", "video_id", "title", "summary", "views_in_period"]
+SCORE_COLUMNS = ["median_ratio", "zscore", "is_outlier"]
+# Columns whose change at some rank changes every top N at and below it
+RANKING_IDENTITY_COLUMNS = ["video_id", "title", "views_in_period", "is_outlier"]
+
+# channel_id -> first rank whose video changed (None if its ranking is unchanged)
+ChannelChanges = Dict[str, Optional[int]]
+
+# Metrics top performers can be selected by: the views-sorted order, or only
+# its flagged outlier prefix. Within a channel, median_ratio and zscore are
+# monotonic in views and would select the same videos, so they annotate each
+# top performer instead of ranking them.
+RANKING_METRICS = ("views", "outliers")
+
+
+def ranking_scores(views, median, mean, std, outlier_zscore: float = OUTLIER_ZSCORE) -> dict:
+    """
+    Compute the alternative performance scores of videos against their channel.
+
+    Works element-wise, so the channel statistics can be scalars (one channel)
+    or arrays aligned with views (many channels at once).
+
+    Args:
+        views: Views of each video
+        median: Median views of the video's channel
+        mean: Mean views of the video's channel
+        std: Population standard deviation of the channel's views
+
+    Returns:
+        Dict of median_ratio, zscore and is_outlier arrays
+    """
+    views = np.asarray(views, dtype=float)
+    median = np.broadcast_to(np.asarray(median, dtype=float), views.shape)
+    mean = np.broadcast_to(np.asarray(mean, dtype=float), views.shape)
+    std = np.broadcast_to(np.asarray(std, dtype=float), views.shape)
+
+    # Channels with a zero median or no spread score 0 rather than inf/nan
+    median_ratio = np.divide(views, median, out=np.zeros_like(views), where=median > 0)
+    zscore = np.divide(views - mean, std, out=np.zeros_like(views), where=std > 0)
+    return {
+        "median_ratio": median_ratio,
+        "zscore": zscore,
+        "is_outlier": zscore >= outlier_zscore,
+    }
+
+
+def rank_channels(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Score every video against its channel and sort each channel by views.
+
+    The scores are computed in one vectorized pass over all channels. Rows
+    are ordered by channel, then views descending, keeping file order among
+    ties (as DataFrame.nlargest(keep="first") does), so a channel's top N is
+    its first N rows.
+
+    Args:
+        df: DataFrame with 'channel_id' and 'views_in_period' columns
+
+    Returns:
+        Sorted copy of df with the SCORE_COLUMNS added
+    """
+    views = df["views_in_period"]
+    by_channel = views.groupby(df["channel_id"], sort=False)
+    scores = ranking_scores(
+        views,
+        median=by_channel.transform("median"),
+        mean=by_channel.transform("mean"),
+        std=by_channel.transform("std", ddof=0),
+    )
+
+    df = df.assign(**scores)
+    df = df.sort_values(["channel_id", "views_in_period"], ascending=[True, False], kind="stable")
+    return df.reset_index(drop=True)
+
+
+def upsert_videos(df: Optional[pd.DataFrame], records: List[dict]) -> pd.DataFrame:
+    """
+    Apply ingested video records to one channel and re-rank it.
+
+    Records for videos already in the channel update the fields they carry;
+    records for new videos are appended (they must carry a title). For each
+    field of a video, the last record giving it wins.
+
+    Args:
+        df: The channel's ranked rows, or None for a new channel
+        records: Dicts with channel_id, video_id, views_in_period and
+            optionally title and summary
+
+    Returns:
+        The channel's rows with the records applied, ranked as by rank_channels
+    """
+    base = pd.DataFrame(columns=CHANNEL_COLUMNS) if df is None else df[CHANNEL_COLUMNS].copy()
+    # Per video, the last value given for each field
+    updates = pd.DataFrame(records).groupby("video_id", sort=False).last()
+    for column in ("title", "summary"):
+        if column not in updates:
+            updates[column] = None
+
+    existing = base["video_id"].isin(updates.index)
+    if existing.any():
+        matched = updates.loc[base.loc[existing, "video_id"]]
+        base.loc[existing, "views_in_period"] = matched["views_in_period"].to_numpy()
+        for column in ("title", "summary"):
+            values = matched[column].to_numpy()
+            given = pd.notna(values)
+            if given.any():
+                rows = base.index[existing][given]
+                base.loc[rows, column] = values[given]
+
+    new = updates[~updates.index.isin(base["video_id"])].reset_index()
+    if new["title"].isna().any():
+        missing = new.loc[new["title"].isna(), "video_id"].tolist()
+        raise ValueError(f"New videos need a title: {', '.join(missing)}")
+    new["summary"] = new["summary"].fillna("")
+
+    frames = [frame for frame in (base, new[CHANNEL_COLUMNS]) if not frame.empty]
+    channel = pd.concat(frames, ignore_index=True)
+    channel["views_in_period"] = channel["views_in_period"].astype("int64")
+    return rank_channels(channel)
+
+
+def first_changed_rank(old: Optional[pd.DataFrame], new: pd.DataFrame) -> Optional[int]:
+    """
+    Find the first rank at which two rankings of a channel differ.
+
+    Analyses of the top N videos with N up to this rank are still valid.
+
+    Args:
+        old: Ranking before the change, or None for a new channel
+        new: Ranking after the change
+
+    Returns:
+        0-based rank of the first difference, or None if the rankings are identical
+    """
+    if old is None:
+        return 0
+    n = min(len(old), len(new))
+    differs = np.zeros(n, dtype=bool)
+    for column in RANKING_IDENTITY_COLUMNS:
+        differs |= old[column].to_numpy()[:n] != new[column].to_numpy()[:n]
+    changed = np.flatnonzero(differs)
+    if len(changed):
+        return int(changed[0])
+    return n if len(old) != len(new) else None
+
+
+def merge_changes(first: ChannelChanges, second: ChannelChanges) -> ChannelChanges:
+    """Combine two sets of channel changes, keeping the earliest changed rank"""
+    merged = dict(first)
+    for channel_id, rank in second.items():
+        ranks = [r for r in (merged.get(channel_id), rank) if r is not None]
+        merged[channel_id] = min(ranks) if ranks else None
+    return merged
+
+
+@dataclass(frozen=True)
+class DatasetSnapshot:
+    """Immutable, channel-partitioned view of the dataset at a given version"""
+
+    # Every channel of a CSV; over an Arrow file, the channels changed by ingestion
+    channels: Dict[str, pd.DataFrame] = field(default_factory=dict)
+    columnar: Optional[Any] = None  # ColumnarDataset when serving an Arrow file
+    version: str = ""  # base_version, plus "+<log offset>" once ingested records apply
+    base_version: str = ""  # fingerprint of the source file
+    log_offset: int = 0  # bytes of the ingestion log applied
+    mtime_ns: int = 0
+    size: int = 0
+
+    def get_channel(
+        self, channel_id: str, columns: Optional[List[str]] = None
+    ) -> Optional[pd.DataFrame]:
+        df = self.channels.get(channel_id)
+        if df is None and self.columnar is not None:
+            return self.columnar.read_channel(channel_id, columns)
+        if df is None or columns is None:
+            return df
+        return df[columns]
+
+    def top_videos(
+        self,
+        channel_id: str,
+        top_n: int,
+        metric: str = DEFAULT_RANKING_METRIC,
+        columns: Optional[List[str]] = None,
+    ) -> Optional[pd.DataFrame]:
+        """
+        Slice a channel's top videos from the precomputed ranking.
+
+        Args:
+            channel_id: YouTube channel ID
+            top_n: Number of videos to return
+            metric: One of RANKING_METRICS
+            columns: Columns to return in addition to the SCORE_COLUMNS
+
+        Returns:
+            Up to top_n videos, best first (only outliers for "outliers"),
+            or None if the channel is unknown
+        """
+        if metric not in RANKING_METRICS:
+            raise ValueError(f"Unknown ranking metric '{metric}'")
+        if columns is not None:
+            columns = list(dict.fromkeys(columns + SCORE_COLUMNS))
+
+        df = self.channels.get(channel_id)
+        if df is not None:
+            df = df.head(top_n) if columns is None else df.iloc[:top_n][columns]
+        elif self.columnar is not None:
+            df = self.columnar.read_channel(channel_id, columns, limit=top_n)
+
+        if df is not None and metric == "outliers":
+            # Outliers have the highest views, so they form a prefix of the ranking
+            df = df[df["is_outlier"]]
+        return df
+
+    def channel_size(self, channel_id: str) -> int:
+        df = self.channels.get(channel_id)
+        if df is None and self.columnar is not None:
+            _, length = self.columnar.index.get(channel_id, (0, 0))
+            return length
+        return 0 if df is None else len(df)
+
+    def channel_sizes(self) -> Dict[str, int]:
+        sizes = self.columnar.channel_sizes() if self.columnar is not None else {}
+        sizes.update({channel_id: len(df) for channel_id, df in self.channels.items()})
+        return sizes
+
+    def all_rows(self, columns: List[str]) -> pd.DataFrame:
+        """Rows of every channel, grouped by channel and ranked best first within each"""
+        frames = []
+        if self.columnar is not None:
+            rows = self.columnar.table.select(columns).to_pandas()
+            if self.channels:
+                # Channels changed by ingestion are served from self.channels
+                rows = rows[~rows["channel_id"].isin(list(self.channels))]
+            frames.append(rows)
+        frames.extend(df[columns] for df in self.channels.values())
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)
+
+
+def file_fingerprint(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Compute a short content hash of a file.
+
+    Args:
+        path: Path to the file
+        chunk_size: Number of bytes to read per chunk
+
+    Returns:
+        Hex digest identifying the file contents
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DataStore:
+    """Keeps the dataset resident in memory, partitioned by channel_id"""
+
+    def __init__(
+        self,
+        data_path: Optional[str] = None,
+        data_format: str = DATA_FORMAT,
+        reload_interval: float = DATA_RELOAD_INTERVAL,
+        source_path: Optional[str] = None,
+        ingest_log_dir: Optional[str] = INGEST_LOG_DIR,
+    ):
+        """
+        Initialize the data store.
+
+        Args:
+            data_path: Path to the dataset (defaults to the path for data_format)
+            data_format: "csv" to parse the CSV, "columnar" to map the Arrow file
+            reload_interval: Seconds between checks for a changed source file
+            source_path: In columnar mode, CSV to rebuild the Arrow file from when
+                it changes (defaults to DATA_PATH for the default Arrow file if
+                COLUMNAR_AUTO_CONVERT is set; None disables rebuilding)
+            ingest_log_dir: Directory of the ingestion logs (None disables ingestion)
+        """
+        if data_format not in ("csv", "columnar"):
+            raise ValueError(f"Unknown data format '{data_format}'")
+
+        self.data_format = data_format
+        if data_path is None:
+            data_path = COLUMNAR_DATA_PATH if data_format == "columnar" else DATA_PATH
+            if data_format == "columnar" and source_path is None and COLUMNAR_AUTO_CONVERT:
+                source_path = DATA_PATH
+        self.data_path = data_path
+        self.source_path = source_path if data_format == "columnar" else None
+        self.reload_interval = reload_interval
+        self.ingest_log_dir = ingest_log_dir
+        self._source_stat: Optional[tuple] = None
+        self._snapshot: Optional[DatasetSnapshot] = None
+        self._reload_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._change_listeners: List[Callable[[ChannelChanges], None]] = []
+        self._load_listeners: List[Callable[[DatasetSnapshot], None]] = []
+
+    @property
+    def snapshot(self) -> DatasetSnapshot:
+        """Current snapshot, loading the dataset on first access"""
+        if self._snapshot is None:
+            self.load()
+        return self._snapshot
+
+    @property
+    def version(self) -> str:
+        """Version of the resident dataset, usable as a cache key"""
+        return self.snapshot.version
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._snapshot is not None
+
+    def get_channel(
+        self, channel_id: str, columns: Optional[List[str]] = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        Look up the rows of a single channel.
+
+        Args:
+            channel_id: YouTube channel ID
+            columns: Columns to return (all stored columns if None)
+
+        Returns:
+            DataFrame with the channel's videos, or None if the channel is unknown
+        """
+        return self.snapshot.get_channel(channel_id, columns)
+
+    def top_videos(
+        self,
+        channel_id: str,
+        top_n: int,
+        metric: str = DEFAULT_RANKING_METRIC,
+        columns: Optional[List[str]] = None,
+    ) -> Optional[pd.DataFrame]:
+        """
+        Look up a channel's top videos by a ranking metric.
+
+        Args:
+            channel_id: YouTube channel ID
+            top_n: Number of videos to return
+            metric: One of RANKING_METRICS
+            columns: Columns to return in addition to the score columns
+
+        Returns:
+            Up to top_n videos, best first, or None if the channel is unknown
+        """
+        return self.snapshot.top_videos(channel_id, top_n, metric, columns)
+
+    def channel_size(self, channel_id: str) -> int:
+        """Number of videos of one channel in the current snapshot (0 if unknown)"""
+        return self.snapshot.channel_size(channel_id)
+
+    def channel_sizes(self) -> Dict[str, int]:
+        """Number of videos per channel in the current snapshot"""
+        return self.snapshot.channel_sizes()
+
+    def load(self) -> DatasetSnapshot:
+        """
+        Read the source file and atomically swap in a new snapshot.
+
+        Returns:
+            The newly loaded snapshot
+        """
+        with self._reload_lock:
+            self._refresh_columnar()
+            stat = os.stat(self.data_path)
+            snapshot = self._build_snapshot(stat, self._file_version())
+            snapshot, _ = self._apply_log(snapshot)
+            self._snapshot = snapshot
+            logger.info(
+                f"Loaded dataset version {snapshot.version} "
+                f"({len(snapshot.channel_sizes())} channels) from {self.data_path}"
+            )
+        self._notify_load(snapshot)
+        return snapshot
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reload the dataset if the source file changed since the last load, and
+        apply records other processes appended to the ingestion log.
+
+        Channels changed by the log are passed to the change listeners.
+
+        Returns:
+            True if a new snapshot was swapped in
+        """
+        if self._snapshot is None:
+            self.load()
+            return True
+
+        reloaded = False
+        with self._reload_lock:
+            self._refresh_columnar()
+            current = previous = self._snapshot
+            stat = os.stat(self.data_path)
+            if stat.st_mtime_ns != current.mtime_ns or stat.st_size != current.size:
+                version = self._file_version()
+                if version != current.base_version:
+                    # A new base file starts a new ingestion log
+                    current = self._build_snapshot(stat, version)
+                    reloaded = True
+                else:
+                    # Touched but not modified: remember the new stat, keep the data
+                    current = replace(current, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                self._snapshot = current
+
+            snapshot, changes = self._apply_log(current)
+            self._snapshot = snapshot
+
+        if reloaded:
+            logger.info(f"Reloaded dataset: version {previous.version} -> {snapshot.version}")
+            self._notify_load(snapshot)
+            return True
+        if not changes:
+            return False
+        logger.info(f"Applied ingested records for {len(changes)} channels -> {snapshot.version}")
+        self._notify(changes)
+        return True
+
+    def ingest(self, records: List[dict]) -> ChannelChanges:
+        """
+        Append or update videos without reloading the dataset.
+
+        The records are appended to the ingestion log of the current base file,
+        then every record not yet applied (including other processes') is
+        applied to the affected channels, which are re-ranked. Other processes
+        sharing the log apply the records on their next reload check. The
+        caller is responsible for invalidating results derived from the
+        returned channels; change listeners are not called.
+
+        Args:
+            records: Dicts with channel_id, video_id, views_in_period and
+                optionally title and summary (required for new videos)
+
+        Returns:
+            Changed channels with the first rank whose video changed
+        """
+        if self.ingest_log_dir is None:
+            raise RuntimeError("Ingestion is disabled (no ingestion log directory)")
+        if self._snapshot is None:
+            self.load()
+
+        # Imported lazily like the columnar lock
+        import fcntl
+
+        with self._reload_lock:
+            snapshot, pending = self._apply_log(self._snapshot)
+            self._snapshot = snapshot
+            self._validate_records(snapshot, records)
+
+            path = self.ingest_log_path(snapshot.base_version)
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            now = time.time()
+            lines = "".join(
+                json.dumps({**record, "ingested_at": now}, ensure_ascii=False) + "\n"
+                for record in records
+            )
+            with open(path, "ab") as log:
+                # One write under an exclusive lock keeps concurrent writers' lines whole
+                fcntl.flock(log, fcntl.LOCK_EX)
+                log.write(lines.encode())
+
+            snapshot, changes = self._apply_log(snapshot)
+            self._snapshot = snapshot
+
+        logger.info(f"Ingested {len(records)} records for {len(changes)} channels")
+        return merge_changes(pending, changes)
+
+    def ingest_log_path(self, base_version: str) -> str:
+        """Ingestion log of a base file version; a new base file starts a new log"""
+        stem = os.path.splitext(os.path.basename(self.data_path))[0]
+        return os.path.join(self.ingest_log_dir, f"{stem}.{base_version}.jsonl")
+
+    def add_change_listener(self, listener: Callable[[ChannelChanges], None]) -> None:
+        """Call listener with the changed channels whenever reload_if_changed applies records"""
+        self._change_listeners.append(listener)
+
+    def add_load_listener(self, listener: Callable[[DatasetSnapshot], None]) -> None:
+        """Call listener with every snapshot loaded from a new version of the source file"""
+        self._load_listeners.append(listener)
+
+    def start_watcher(self) -> None:
+        """Start a background thread that reloads the dataset when the file changes"""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._watcher = threading.Thread(target=self._watch, name="data-store-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        """Stop the background reload thread"""
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=self.reload_interval)
+            self._watcher = None
+
+    def _watch(self) -> None:
+        while not self._stop_event.wait(self.reload_interval):
+            try:
+                self.reload_if_changed()
+            except Exception as e:
+                # Keep serving the previous snapshot if the new file is unreadable
+                logger.error(f"Dataset reload failed: {str(e)}")
+
+    def _notify(self, changes: ChannelChanges) -> None:
+        for listener in self._change_listeners:
+            try:
+                listener(changes)
+            except Exception as e:
+                logger.error(f"Dataset change listener failed: {str(e)}")
+
+    def _notify_load(self, snapshot: DatasetSnapshot) -> None:
+        for listener in self._load_listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                logger.error(f"Dataset load listener failed: {str(e)}")
+
+    def _validate_records(self, snapshot: DatasetSnapshot, records: List[dict]) -> None:
+        # Reject a bad batch before it reaches the log, where it would fail every replay
+        known = set()
+        for record in records:
+            for key in ("channel_id", "video_id", "views_in_period"):
+                if record.get(key) is None:
+                    raise ValueError(f"Record is missing '{key}': {record}")
+            if record.get("title") is not None:
+                known.add((record["channel_id"], record["video_id"]))
+                continue
+            if (record["channel_id"], record["video_id"]) in known:
+                continue
+            df = snapshot.get_channel(record["channel_id"], ["video_id"])
+            if df is None or not (df["video_id"] == record["video_id"]).any():
+                raise ValueError(f"New video '{record['video_id']}' needs a title")
+            known.add((record["channel_id"], record["video_id"]))
+
+    def _apply_log(self, snapshot: DatasetSnapshot) -> Tuple[DatasetSnapshot, ChannelChanges]:
+        """Apply the ingestion log records after snapshot.log_offset to a snapshot"""
+        if self.ingest_log_dir is None:
+            return snapshot, {}
+        try:
+            with open(self.ingest_log_path(snapshot.base_version), "rb") as log:
+                log.seek(snapshot.log_offset)
+                data = log.read()
+        except FileNotFoundError:
+            return snapshot, {}
+
+        # A line being written by another process is applied on the next check
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return snapshot, {}
+        records: Dict[str, List[dict]] = {}
+        for line in data[:end].splitlines():
+            if line.strip():
+                record = json.loads(line)
+                records.setdefault(record["channel_id"], []).append(record)
+
+        channels = dict(snapshot.channels)
+        changes = {}
+        for channel_id, channel_records in records.items():
+            old = snapshot.get_channel(channel_id)
+            channels[channel_id] = upsert_videos(old, channel_records)
+            changes[channel_id] = first_changed_rank(old, channels[channel_id])
+
+        log_offset = snapshot.log_offset + end
+        snapshot = replace(
+            snapshot,
+            channels=channels,
+            version=f"{snapshot.base_version}+{log_offset}",
+            log_offset=log_offset,
+        )
+        return snapshot, changes
+
+    def _file_version(self) -> str:
+        if self.data_format == "columnar":
+            from src.columnar import columnar_source_version
+
+            # The fingerprint of the source CSV is stored in the file's metadata,
+            # which saves every worker hashing the whole Arrow file
+            version = columnar_source_version(self.data_path)
+            if version:
+                return version
+        return file_fingerprint(self.data_path)
+
+    def _refresh_columnar(self) -> None:
+        """
+        Rebuild the Arrow file if the source CSV changed since it was converted.
+
+        Workers share the file through an exclusive lock next to it: the first
+        to see the change converts, the others wait and then find the file
+        current. The conversion runs in a child process so the worker does not
+        keep the memory of parsing the CSV, and write_columnar swaps the file
+        in atomically; every worker then maps the new file on its next reload.
+        """
+        if self.source_path is None:
+            return
+        try:
+            stat = os.stat(self.source_path)
+        except FileNotFoundError:
+            return  # serve the Arrow file as it is
+        source_stat = (stat.st_mtime_ns, stat.st_size)
+        if source_stat == self._source_stat:
+            return
+
+        # Imported lazily so the CSV path does not require pyarrow
+        import fcntl
+
+        from src.columnar import columnar_source_version, write_columnar
+
+        def is_current() -> bool:
+            return (
+                os.path.exists(self.data_path)
+                and columnar_source_version(self.data_path) == source_version
+            )
+
+        source_version = file_fingerprint(self.source_path)
+        if not is_current():
+            with open(f"{self.data_path}.lock", "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                if not is_current():
+                    logger.info(f"Converting {self.source_path} to {self.data_path}")
+                    context = multiprocessing.get_context("spawn")
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                        executor.submit(write_columnar, self.source_path, self.data_path).result()
+        self._source_stat = source_stat
+
+    def _build_snapshot(self, stat: os.stat_result, version: str) -> DatasetSnapshot:
+        if self.data_format == "columnar":
+            # Imported lazily so the CSV path does not require pyarrow
+            from src.columnar import ColumnarDataset
+
+            dataset = ColumnarDataset(self.data_path)
+            # The mapped file may have been replaced since version was read
+            version = dataset.source_version or version
+            return DatasetSnapshot(
+                columnar=dataset,
+                version=version,
+                base_version=version,
+                mtime_ns=stat.st_mtime_ns,
+                size=stat.st_size,
+            )
+
+        df = rank_channels(pd.read_csv(self.data_path, usecols=CHANNEL_COLUMNS)[CHANNEL_COLUMNS])
+        channels = {
+            channel_id: group.reset_index(drop=True)
+            for channel_id, group in df.groupby("channel_id", sort=False)
+        }
+        return DatasetSnapshot(
+            channels=channels,
+            version=version,
+            base_version=version,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+        )
+
+
+data_store = DataStore()
@@ -0,0 +1,426 @@
+"""
+Local stand-in for the Anthropic client, used for load tests and benchmarks.
+
+Enable it in the API with LLM_BACKEND=fake. Calls sleep for a configurable
+latency and return a canned response shaped like anthropic's Message.
+
+Prompt caching is simulated: prefixes ending at a cache_control breakpoint
+are remembered, later calls report them as cache_read_input_tokens, and only
+uncached input adds FAKE_LLM_PREFILL_PER_1K_TOKENS of time-to-first-token.
+
+Decoding can be made realistic: FAKE_LLM_OUTPUT_TOKENS pads the canned
+response to a given length and FAKE_LLM_OUTPUT_TOKENS_PER_SECOND adds the
+time to generate it on top of the fixed latency. Requests that force a tool
+call (tool_choice {"type": "tool"}) get a tool_use block whose input fills
+the tool's input schema with canned values.
+
+Faults can be injected to exercise the retry policy: a share of calls fail
+with 529 Overloaded (FAKE_LLM_ERROR_RATE), a share are slow by
+FAKE_LLM_SLOW_LATENCY seconds (FAKE_LLM_SLOW_RATE), and calls that would
+outlast their `timeout` raise APITimeoutError like the real client.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import List, Optional, Tuple
+
+import anthropic
+import httpx
+
+from config import (
+    FAKE_LLM_ERROR_RATE,
+    FAKE_LLM_LATENCY,
+    FAKE_LLM_OUTPUT_TOKENS,
+    FAKE_LLM_OUTPUT_TOKENS_PER_SECOND,
+    FAKE_LLM_PREFILL_PER_1K_TOKENS,
+    FAKE_LLM_SLOW_LATENCY,
+    FAKE_LLM_SLOW_RATE,
+    PROMPT_CACHE_MIN_TOKENS,
+)
+
+FAKE_RESPONSE = (
+    "1. **Fake Title One**\n"
+    "Reasoning: canned response from the fake LLM backend.\n\n"
+    "2. **Fake Title Two**\n"
+    "Reasoning: canned response from the fake LLM backend.\n"
+)
+
+
+def _count_tokens(text: str) -> int:
+    return len(text) // 4
+
+
+def fake_response_text(output_tokens: int = 0) -> str:
+    """
+    Canned response, padded with numbered title options to about output_tokens.
+
+    Args:
+        output_tokens: Target length in tokens (0 or less returns the short canned text)
+
+    Returns:
+        Response text
+    """
+    parts = [FAKE_RESPONSE]
+    length = _count_tokens(FAKE_RESPONSE)
+    number = 3
+    while length < output_tokens:
+        part = (
+            f"\n{number}. **Fake Title {number}**\n"
+            "Reasoning: padding that stands in for a longer model response.\n"
+        )
+        parts.append(part)
+        length += _count_tokens(part)
+        number += 1
+    return "".join(parts)
+
+
+def fake_tool_input(schema: dict, text: str, depth: int = 0, name: str = "value") -> object:
+    """
+    Canned value matching a JSON schema.
+
+    Top-level string properties get the canned response text, nested strings
+    a short placeholder, and arrays their minItems (default 3) elements.
+
+    Args:
+        schema: JSON schema of the value (a tool's input_schema at the top)
+        text: Canned response text
+        depth: Nesting level of schema
+        name: Property name the value is for, used in placeholders
+
+    Returns:
+        Value of the schema's type
+    """
+    kind = schema.get("type")
+    if kind == "object":
+        return {
+            key: fake_tool_input(prop, text, depth + 1, key)
+            for key, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        item = schema.get("items", {})
+        count = schema.get("minItems", 3)
+        return [fake_tool_input(item, text, depth + 1, name) for _ in range(count)]
+    if kind in ("integer", "number"):
+        return 0
+    if kind == "boolean":
+        return False
+    return text if depth == 1 else f"Fake {name}"
+
+
+class FakeDecoding:
+    """Response text and generation time of the fake model"""
+
+    def __init__(
+        self,
+        latency: float = FAKE_LLM_LATENCY,
+        output_tokens: int = FAKE_LLM_OUTPUT_TOKENS,
+        output_tokens_per_second: float = FAKE_LLM_OUTPUT_TOKENS_PER_SECOND,
+    ):
+        """
+        Initialize the decoding model.
+
+        Args:
+            latency: Fixed seconds per call
+            output_tokens: Response length in tokens (0 keeps the short canned text)
+            output_tokens_per_second: Output speed (0 makes generation instant)
+        """
+        self.latency = latency
+        self.output_tokens_per_second = output_tokens_per_second
+        self.text = fake_response_text(output_tokens)
+        self.output_tokens = _count_tokens(self.text)
+        self.seconds = self.seconds_for(self.output_tokens)
+
+    def seconds_for(self, output_tokens: int) -> float:
+        """Time to generate a response of output_tokens tokens"""
+        if self.output_tokens_per_second > 0:
+            return self.latency + output_tokens / self.output_tokens_per_second
+        return self.latency
+
+    def respond(self, tools: Optional[list] = None, tool_choice: Optional[dict] = None) -> tuple:
+        """
+        Content of a response and the time to generate it.
+
+        Args:
+            tools: Tools of the request
+            tool_choice: Tool choice of the request; {"type": "tool", "name": ...}
+                makes the response a call of that tool
+
+        Returns:
+            Tuple of (content blocks, output tokens, seconds)
+        """
+        if not tool_choice or tool_choice.get("type") != "tool":
+            return [SimpleNamespace(type="text", text=self.text)], self.output_tokens, self.seconds
+
+        tool = next(tool for tool in tools if tool["name"] == tool_choice["name"])
+        tool_input = fake_tool_input(tool["input_schema"], self.text)
+        output_tokens = _count_tokens(json.dumps(tool_input))
+        block = SimpleNamespace(
+            type="tool_use", id="toolu_fake", name=tool["name"], input=tool_input
+        )
+        return [block], output_tokens, self.seconds_for(output_tokens)
+
+
+def _blocks(content) -> List[Tuple[str, bool]]:
+    # (text, ends a cache breakpoint) for a string or a list of content blocks
+    if isinstance(content, str):
+        return [(content, False)]
+    return [(block.get("text", ""), "cache_control" in block) for block in content]
+
+
+class _FakePromptCache:
+    """Remembers prompt prefixes the way the API's prompt cache does (without expiry)"""
+
+    def __init__(self, min_tokens: int = PROMPT_CACHE_MIN_TOKENS):
+        self.min_tokens = min_tokens
+        self._prefixes = set()
+        self._lock = threading.Lock()
+
+    def usage(self, system, messages: list) -> SimpleNamespace:
+        """Split a request's input tokens into uncached, cache read and cache write"""
+        blocks = _blocks(system or [])
+        for message in messages:
+            blocks += _blocks(message["content"])
+
+        digest = hashlib.sha256()
+        total = 0
+        breakpoints = []  # (prefix hash, prefix tokens) at each cache_control block
+        for text, is_breakpoint in blocks:
+            digest.update(text.encode())
+            total += _count_tokens(text)
+            if is_breakpoint:
+                breakpoints.append((digest.hexdigest(), total))
+
+        with self._lock:
+            read = max((tokens for key, tokens in breakpoints if key in self._prefixes), default=0)
+            cacheable = [(key, tokens) for key, tokens in breakpoints if tokens >= self.min_tokens]
+            written = max((tokens for _, tokens in cacheable), default=read)
+            self._prefixes.update(key for key, _ in cacheable)
+
+        created = max(0, written - read)
+        return SimpleNamespace(
+            input_tokens=total - read - created,
+            cache_read_input_tokens=read,
+            cache_creation_input_tokens=created,
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._prefixes.clear()
+
+
+# One cache shared by the sync and async fakes, like the real API
+fake_prompt_cache = _FakePromptCache()
+
+
+_FAKE_REQUEST = httpx.Request("POST", "https://fake-llm.local/v1/messages")
+
+
+class FaultInjector:
+    """Decides, per call, whether the fake fails, is slow, or times out"""
+
+    def __init__(
+        self,
+        error_rate: float = FAKE_LLM_ERROR_RATE,
+        slow_rate: float = FAKE_LLM_SLOW_RATE,
+        slow_latency: float = FAKE_LLM_SLOW_LATENCY,
+        retry_after: Optional[float] = None,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize the fault model.
+
+        Args:
+            error_rate: Share of calls failing with 529 Overloaded
+            slow_rate: Share of calls taking slow_latency extra seconds
+            slow_latency: Extra seconds of a slow call
+            retry_after: Retry-After header value sent with errors (None omits it)
+            seed: Seed for reproducible fault sequences
+        """
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def plan(self, delay: float, timeout: Optional[float]) -> Tuple[float, Optional[Exception]]:
+        """
+        Decide one call's outcome.
+
+        Args:
+            delay: Seconds the call takes when healthy
+            timeout: Per-request timeout passed by the caller
+
+        Returns:
+            Tuple of (seconds to wait, exception to raise afterwards or None)
+        """
+        with self._lock:
+            failed = self._rng.random() < self.error_rate
+            slow = self._rng.random() < self.slow_rate
+
+        if failed:
+            # Overload errors come back quickly
+            return min(delay, 0.05), self._overloaded()
+        if slow:
+            delay += self.slow_latency
+        if timeout is not None and delay > timeout:
+            return timeout, anthropic.APITimeoutError(request=_FAKE_REQUEST)
+        return delay, None
+
+    def _overloaded(self) -> anthropic.APIStatusError:
+        headers = {} if self.retry_after is None else {"retry-after": str(self.retry_after)}
+        response = httpx.Response(529, headers=headers, request=_FAKE_REQUEST)
+        return anthropic.InternalServerError(
+            "Overloaded",
+            response=response,
+            body={"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded"}},
+        )
+
+
+def _fake_message(usage: SimpleNamespace, content: list, output_tokens: int) -> SimpleNamespace:
+    usage.output_tokens = output_tokens
+    return SimpleNamespace(
+        content=content,
+        usage=usage,
+        stop_reason="tool_use" if content[0].type == "tool_use" else "end_turn",
+    )
+
+
+def _prefill_seconds(usage: SimpleNamespace, per_1k_tokens: float) -> float:
+    # Cache reads are nearly free; new and cache-written input is processed in full
+    uncached = usage.input_tokens + usage.cache_creation_input_tokens
+    return per_1k_tokens * uncached / 1000
+
+
+class _FakeMessages:
+    def __init__(self, decoding: FakeDecoding, prefill_per_1k_tokens: float, faults: FaultInjector):
+        self.decoding = decoding
+        self.prefill_per_1k_tokens = prefill_per_1k_tokens
+        self.faults = faults
+
+    def create(
+        self, messages: list, system=None, timeout=None, tools=None, tool_choice=None, **kwargs
+    ) -> SimpleNamespace:
+        usage = fake_prompt_cache.usage(system, messages)
+        content, output_tokens, seconds = self.decoding.respond(tools, tool_choice)
+        delay = seconds + _prefill_seconds(usage, self.prefill_per_1k_tokens)
+        delay, error = self.faults.plan(delay, timeout)
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return _fake_message(usage, content, output_tokens)
+
+
+class _FakeAsyncStream:
+    """Mimics anthropic's AsyncMessageStream: text arrives in chunks over the latency"""
+
+    def __init__(
+        self,
+        usage: SimpleNamespace,
+        response: tuple,
+        prefill: float,
+        faults: FaultInjector,
+        timeout: Optional[float],
+        chunks: int = 20,
+    ):
+        self.usage = usage
+        self.content, self.output_tokens, self.seconds = response
+        self.prefill = prefill
+        self.faults = faults
+        self.timeout = timeout
+        self.chunks = chunks
+
+    async def __aenter__(self) -> "_FakeAsyncStream":
+        # Faults surface before the first token, like a failed or stalled response
+        delay, error = self.faults.plan(self.prefill, self.timeout)
+        if error is not None:
+            await asyncio.sleep(delay)
+            raise error
+        self.prefill = delay
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        return None
+
+    @property
+    async def text_stream(self):
+        await asyncio.sleep(self.prefill)
+        # A tool call streams its input as JSON deltas, which text_stream skips
+        text = self.content[0].text if self.content[0].type == "text" else ""
+        step = max(1, len(text) // self.chunks)
+        for start in range(0, len(text), step):
+            await asyncio.sleep(self.seconds / self.chunks)
+            yield text[start : start + step]
+        if not text:
+            await asyncio.sleep(self.seconds)
+
+    async def get_final_message(self) -> SimpleNamespace:
+        return _fake_message(self.usage, self.content, self.output_tokens)
+
+
+class _FakeAsyncMessages:
+    def __init__(self, decoding: FakeDecoding, prefill_per_1k_tokens: float, faults: FaultInjector):
+        self.decoding = decoding
+        self.prefill_per_1k_tokens = prefill_per_1k_tokens
+        self.faults = faults
+
+    async def create(
+        self, messages: list, system=None, timeout=None, tools=None, tool_choice=None, **kwargs
+    ) -> SimpleNamespace:
+        usage = fake_prompt_cache.usage(system, messages)
+        content, output_tokens, seconds = self.decoding.respond(tools, tool_choice)
+        delay = seconds + _prefill_seconds(usage, self.prefill_per_1k_tokens)
+        delay, error = self.faults.plan(delay, timeout)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return _fake_message(usage, content, output_tokens)
+
+    def stream(
+        self, messages: list, system=None, timeout=None, tools=None, tool_choice=None, **kwargs
+    ) -> _FakeAsyncStream:
+        usage = fake_prompt_cache.usage(system, messages)
+        prefill = _prefill_seconds(usage, self.prefill_per_1k_tokens)
+        response = self.decoding.respond(tools, tool_choice)
+        return _FakeAsyncStream(usage, response, prefill, self.faults, timeout)
+
+
+class FakeAnthropic:
+    """Synchronous fake with the subset of the Anthropic client API we use"""
+
+    def __init__(
+        self,
+        latency: float = FAKE_LLM_LATENCY,
+        prefill_per_1k_tokens: float = FAKE_LLM_PREFILL_PER_1K_TOKENS,
+        faults: Optional[FaultInjector] = None,
+        output_tokens: int = FAKE_LLM_OUTPUT_TOKENS,
+        output_tokens_per_second: float = FAKE_LLM_OUTPUT_TOKENS_PER_SECOND,
+    ):
+        self.messages = _FakeMessages(
+            FakeDecoding(latency, output_tokens, output_tokens_per_second),
+            prefill_per_1k_tokens,
+            faults or FaultInjector(),
+        )
+
+
+class FakeAsyncAnthropic:
+    """Asynchronous fake with the subset of the AsyncAnthropic client API we use"""
+
+    def __init__(
+        self,
+        latency: float = FAKE_LLM_LATENCY,
+        prefill_per_1k_tokens: float = FAKE_LLM_PREFILL_PER_1K_TOKENS,
+        faults: Optional[FaultInjector] = None,
+        output_tokens: int = FAKE_LLM_OUTPUT_TOKENS,
+        output_tokens_per_second: float = FAKE_LLM_OUTPUT_TOKENS_PER_SECOND,
+    ):
+        self.messages = _FakeAsyncMessages(
+            FakeDecoding(latency, output_tokens, output_tokens_per_second),
+            prefill_per_1k_tokens,
+            faults or FaultInjector(),
+        )
@@ -1,37 +1,226 @@
+from typing import Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, END
+from langgraph.types import StateSnapshot
 
+from config import DATA_LOAD_MODE
+from src.metrics import instrument_node
 from src.state import AgentState
 from src.agents import (
     load_channel_data_node,
     identify_top_performers_node,
+    compute_title_stats_node,
+    summarize_title_stats_node,
     extract_title_patterns_with_llm_node,
+    aextract_title_patterns_with_llm_node,
     generate_titles_node,
+    agenerate_titles_node,
+    analyze_and_generate_titles_node,
+    aanalyze_and_generate_titles_node,
     respond_node,
+    stream_top_performers_node,
+    astream_top_performers_node,
 )
 
 
-def build_agent_graph() -> StateGraph:
+# State fields each node needs from the nodes before it. A checkpoint about to run a node
+# whose inputs are missing follows a failed node, so a run does not resume from it.
+NODE_INPUTS = {
+    "identify_top_performers": ("total_videos",),
+    "compute_title_stats": ("top_performers",),
+    "summarize_title_stats": ("title_stats",),
+    "extract_title_patterns": ("top_performers",),
+    "analyze_and_generate_titles": ("top_performers",),
+    "generate_titles": ("title_patterns",),
+    "respond": ("generated_titles",),
+}
+
+
+def _add_node(graph: StateGraph, name: str, func, afunc=None) -> None:
+    # Every node is timed into the node_duration_seconds metric
+    graph.add_node(name, instrument_node(name, func, afunc))
+
+
+def _add_data_stages(graph: StateGraph, data_load_mode: str) -> str:
+    """
+    Add the data loading, ranking and title statistics stages to a graph.
+
+    Returns:
+        Name of the last node added
+    """
+    if data_load_mode == "streaming":
+        _add_node(
+            graph, "stream_top_performers", stream_top_performers_node, astream_top_performers_node
+        )
+        graph.set_entry_point("stream_top_performers")
+        last_data_node = "stream_top_performers"
+    else:
+        _add_node(graph, "load_channel_data", load_channel_data_node)
+        _add_node(graph, "identify_top_performers", identify_top_performers_node)
+        graph.set_entry_point("load_channel_data")
+        graph.add_edge("load_channel_data", "identify_top_performers")
+        last_data_node = "identify_top_performers"
+
+    _add_node(graph, "compute_title_stats", compute_title_stats_node)
+    graph.add_edge(last_data_node, "compute_title_stats")
+    return "compute_title_stats"
+
+
+def _add_analysis_stages(graph: StateGraph, data_load_mode: str) -> str:
+    """
+    Add the data loading, ranking and pattern analysis stages to a graph.
+
+    Returns:
+        Name of the last node added
+    """
+    last_data_node = _add_data_stages(graph, data_load_mode)
+    _add_node(
+        graph,
+        "extract_title_patterns",
+        extract_title_patterns_with_llm_node,
+        aextract_title_patterns_with_llm_node,
+    )
+    graph.add_edge(last_data_node, "extract_title_patterns")
+
+    return "extract_title_patterns"
+
+
+def build_agent_graph(
+    data_load_mode: str = DATA_LOAD_MODE, checkpointer: Optional[BaseCheckpointSaver] = None
+) -> StateGraph:
     """
     Build and return the compiled agent graph
 
+    Args:
+        data_load_mode: "resident" to use the in-memory data store, or
+            "streaming" to find top performers in a single chunked pass over
+            the CSV (for datasets larger than RAM)
+        checkpointer: Saves the state after every node; runs then need a thread_id
+            (the run ID) in config["configurable"] and can be resumed with resume_point
+
+    Returns:
+        Compiled StateGraph ready for execution. Nodes doing I/O carry both a
+        sync and an async implementation, so the graph supports invoke() and
+        a non-blocking ainvoke().
+    """
+    graph = StateGraph(AgentState)
+    last_analysis_node = _add_analysis_stages(graph, data_load_mode)
+
+    _add_node(graph, "generate_titles", generate_titles_node, agenerate_titles_node)
+    _add_node(graph, "respond", respond_node)
+
+    graph.add_edge(last_analysis_node, "generate_titles")
+    graph.add_edge("generate_titles", "respond")
+    graph.add_edge("respond", END)
+
+    return graph.compile(checkpointer=checkpointer)
+
+
+def build_fused_graph(
+    data_load_mode: str = DATA_LOAD_MODE, checkpointer: Optional[BaseCheckpointSaver] = None
+) -> StateGraph:
+    """
+    Build the agent graph with pattern analysis and title generation fused
+
+    One Claude call returns both the analysis and the titles as structured
+    output, so a channel without a cached analysis costs one round trip
+    instead of two. The final state has the same fields as build_agent_graph's.
+
+    Args:
+        data_load_mode: "resident" or "streaming", as for build_agent_graph
+        checkpointer: Saves the state after every node, as for build_agent_graph
+
     Returns:
         Compiled StateGraph ready for execution
     """
     graph = StateGraph(AgentState)
+    last_data_node = _add_data_stages(graph, data_load_mode)
 
-    # Add nodes
-    graph.add_node("load_channel_data", load_channel_data_node)
-    graph.add_node("identify_top_performers", identify_top_performers_node)
-    graph.add_node("extract_title_patterns", extract_title_patterns_with_llm_node)
-    graph.add_node("generate_titles", generate_titles_node)
-    graph.add_node("respond", respond_node)
-
-    # Define the flow
-    graph.set_entry_point("load_channel_data")
-    graph.add_edge("load_channel_data", "identify_top_performers")
-    graph.add_edge("identify_top_performers", "extract_title_patterns")
-    graph.add_edge("extract_title_patterns", "generate_titles")
+    _add_node(
+        graph,
+        "analyze_and_generate_titles",
+        analyze_and_generate_titles_node,
+        aanalyze_and_generate_titles_node,
+    )
+    _add_node(graph, "respond", respond_node)
+
+    graph.add_edge(last_data_node, "analyze_and_generate_titles")
+    graph.add_edge("analyze_and_generate_titles", "respond")
+    graph.add_edge("respond", END)
+
+    return graph.compile(checkpointer=checkpointer)
+
+
+def build_fast_graph(
+    data_load_mode: str = DATA_LOAD_MODE, checkpointer: Optional[BaseCheckpointSaver] = None
+) -> StateGraph:
+    """
+    Build the agent graph with the LLM pattern analysis replaced by local statistics
+
+    The title statistics (length, features, keyword lift and view-weighted
+    n-grams) serve as the pattern analysis, so only title generation calls
+    the LLM. The final state has the same fields as build_agent_graph's.
+
+    Args:
+        data_load_mode: "resident" or "streaming", as for build_agent_graph
+        checkpointer: Saves the state after every node, as for build_agent_graph
+
+    Returns:
+        Compiled StateGraph ready for execution
+    """
+    graph = StateGraph(AgentState)
+    last_data_node = _add_data_stages(graph, data_load_mode)
+
+    _add_node(graph, "summarize_title_stats", summarize_title_stats_node)
+    _add_node(graph, "generate_titles", generate_titles_node, agenerate_titles_node)
+    _add_node(graph, "respond", respond_node)
+
+    graph.add_edge(last_data_node, "summarize_title_stats")
+    graph.add_edge("summarize_title_stats", "generate_titles")
     graph.add_edge("generate_titles", "respond")
     graph.add_edge("respond", END)
 
+    return graph.compile(checkpointer=checkpointer)
+
+
+def build_analysis_graph(data_load_mode: str = DATA_LOAD_MODE) -> StateGraph:
+    """
+    Build the graph that stops after pattern analysis
+
+    Used to analyze a channel once and then generate titles for many
+    summaries from the same analysis.
+
+    Args:
+        data_load_mode: "resident" or "streaming", as for build_agent_graph
+
+    Returns:
+        Compiled StateGraph ready for execution
+    """
+    graph = StateGraph(AgentState)
+    last_analysis_node = _add_analysis_stages(graph, data_load_mode)
+    graph.add_edge(last_analysis_node, END)
+
     return graph.compile()
+
+
+async def resume_point(graph, config: dict) -> Optional[StateSnapshot]:
+    """
+    Find the checkpoint a failed or interrupted run should resume from.
+
+    Args:
+        graph: Compiled graph with a checkpointer
+        config: Config with the run's thread_id
+
+    Returns:
+        The newest checkpoint whose next node has all its inputs (the node after
+        the last one that completed), or None if the run finished with titles or is unknown
+    """
+    async for snapshot in graph.aget_state_history(config):
+        if not snapshot.next:
+            if snapshot.values.get("generated_titles"):
+                return None
+            continue
+        if all(snapshot.values.get(field) for field in NODE_INPUTS.get(snapshot.next[0], ())):
+            return snapshot
+    return None
@@ -0,0 +1,46 @@
+import logging
+from typing import Dict
+
+from config import MAX_TOP_N
+from src.cache import pattern_cache
+from src.data_store import ChannelChanges
+from src.summary_cache import summary_cache
+from src.title_stats import title_stats_index
+
+logger = logging.getLogger(__name__)
+
+
+def invalidate_derived(changes: ChannelChanges) -> Dict[str, dict]:
+    """
+    Drop cached results derived from channels whose ranking changed.
+
+    A channel whose ranking changed only below rank MAX_TOP_N keeps every
+    cached result. Otherwise pattern analyses reaching the first changed rank
+    are dropped, along with the channel's cached titles, which were generated
+    from those analyses. Precomputed title statistics compare the top titles
+    with all of the channel's titles, so they are dropped for every changed channel.
+
+    Args:
+        changes: Changed channels with the first changed rank, from DataStore.ingest
+
+    Returns:
+        Per channel, the first changed rank and the number of pattern analyses
+        and cached summaries dropped
+    """
+    title_stats_index.invalidate_channels(changes)
+    results = {}
+    for channel_id, rank in changes.items():
+        analyses = titles = 0
+        if rank is not None and rank < MAX_TOP_N:
+            analyses = pattern_cache.invalidate_channel(channel_id, unchanged_top_n=rank)
+            titles = summary_cache.invalidate_channel(channel_id)
+        results[channel_id] = {
+            "top_changed_at": rank,
+            "pattern_analyses_invalidated": analyses,
+            "titles_invalidated": titles,
+        }
+
+    dropped = sum(r["pattern_analyses_invalidated"] for r in results.values())
+    if dropped:
+        logger.info(f"Invalidated {dropped} pattern analyses of {len(results)} changed channels")
+    return results
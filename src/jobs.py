@@ -0,0 +1,532 @@
+"""
+Persistent queue of title generation jobs, drained by in-process workers.
+
+Jobs are rows in a SQLite table, so queued work survives a restart and
+several API processes can share one queue: a worker claims a job in a write
+transaction and holds it for a lease. A job whose worker died is claimed
+again once its lease expires, unless it has used up its attempts or its
+TTL, in which case it fails. Failed attempts are retried with a growing
+delay up to max_attempts; jobs still queued after their TTL expire. A
+webhook, if given, receives the job once it reaches a final state; its URL
+is checked when the job is submitted and again before each delivery.
+"""
+
+import asyncio
+import functools
+import ipaddress
+import json
+import logging
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from config import (
+    JOB_MAX_ATTEMPTS,
+    JOB_POLL_INTERVAL,
+    JOB_RETENTION,
+    JOB_RETRY_DELAY,
+    JOB_TTL,
+    JOB_WEBHOOK_ALLOW_PRIVATE,
+    JOB_WEBHOOK_ALLOWED_HOSTS,
+    JOB_WEBHOOK_TIMEOUT,
+    JOB_WORKERS,
+    JOBS_DB,
+)
+
+logger = logging.getLogger(__name__)
+
+FINAL_STATUSES = ("succeeded", "failed", "expired")
+STATUSES = ("queued", "running") + FINAL_STATUSES
+WEBHOOK_ATTEMPTS = 3
+ABANDONED_ERROR = "Worker lease expired with no attempts or time left"
+EXPIRED_ERROR = "Job expired before it ran"
+EXPIRED_RETRY_ERROR = "Job expired before its retry ran; last attempt failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    request TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    webhook_url TEXT,
+    webhook_status TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    run_after REAL NOT NULL,
+    lease_expires_at REAL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_run_after ON jobs (status, run_after);
+"""
+
+
+class JobFailed(Exception):
+    """A job attempt produced no usable result; the job is retried if attempts remain"""
+
+
+class JobQueue:
+    """SQLite-backed job queue with leases, retries and expiry"""
+
+    def __init__(
+        self,
+        db_path: str = JOBS_DB,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        retry_delay: float = JOB_RETRY_DELAY,
+        ttl: float = JOB_TTL,
+        retention: float = JOB_RETENTION,
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            db_path: SQLite file holding the jobs (":memory:" for a throwaway queue)
+            max_attempts: Attempts before a job fails for good
+            retry_delay: Delay before the first retry; doubles with every attempt
+            ttl: Seconds a job may wait in the queue before it expires
+            retention: Seconds finished jobs are kept for polling
+        """
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.ttl = ttl
+        self.retention = retention
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def submit(self, request: dict, webhook_url: Optional[str] = None) -> dict:
+        """
+        Queue a job.
+
+        Args:
+            request: Title request body
+            webhook_url: URL that receives the job once it succeeds, fails or expires
+
+        Returns:
+            The queued job
+        """
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            db = self._connection()
+            db.execute(
+                "INSERT INTO jobs (id, status, request, max_attempts, webhook_url, created_at, "
+                "updated_at, run_after, expires_at) VALUES (?, 'queued', ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    json.dumps(request),
+                    self.max_attempts,
+                    webhook_url,
+                    now,
+                    now,
+                    now,
+                    now + self.ttl,
+                ),
+            )
+            return self._get(db, job_id)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """The job with this id, or None if it is unknown or was purged"""
+        with self._lock:
+            return self._get(self._connection(), job_id)
+
+    def claim(self, lease: float) -> Optional[dict]:
+        """
+        Take the oldest runnable job and lease it to the caller.
+
+        Runnable jobs are queued jobs due for a (re)try, and running jobs whose
+        lease expired because their worker died or hung. In the same
+        transaction, lease-expired jobs with no attempts or time left fail;
+        the sweeper delivers their webhooks.
+
+        Args:
+            lease: Seconds the caller may hold the job before others can claim it
+
+        Returns:
+            The claimed job with attempts incremented, or None if none is runnable
+        """
+        now = time.time()
+        with self._lock:
+            db = self._connection()
+            # BEGIN IMMEDIATE takes the write lock, so no other process claims the same row
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                self._fail_abandoned(db, now)
+                row = db.execute(
+                    "SELECT id FROM jobs WHERE (status = 'queued' AND run_after <= ?) "
+                    "OR (status = 'running' AND lease_expires_at <= ? "
+                    "AND attempts < max_attempts AND expires_at > ?) "
+                    "ORDER BY run_after LIMIT 1",
+                    (now, now, now),
+                ).fetchone()
+                if row is not None:
+                    db.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1, "
+                        "lease_expires_at = ?, updated_at = ? WHERE id = ?",
+                        (now + lease, now, row[0]),
+                    )
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+            return None if row is None else self._get(db, row[0])
+
+    def complete(self, job_id: str, attempt: int, result: dict) -> Optional[dict]:
+        """
+        Record a job's result.
+
+        Args:
+            job_id: Job ID
+            attempt: The caller's attempt (attempts of the job it claimed)
+            result: Result of the attempt
+
+        Returns:
+            The finished job, or None if the caller no longer holds it (its lease
+            expired and the job was claimed again or failed)
+        """
+        with self._lock:
+            db = self._connection()
+            if not self._holds(db, job_id, attempt):
+                return None
+            return self._finish_locked(db, job_id, "succeeded", result=json.dumps(result))
+
+    def fail(self, job_id: str, attempt: int, error: str) -> Optional[dict]:
+        """
+        Record a failed attempt: requeue the job with backoff, or fail it for good.
+
+        Args:
+            job_id: Job ID
+            attempt: The caller's attempt (attempts of the job it claimed)
+            error: Error of the attempt
+
+        Returns:
+            The job, queued again or failed, or None if the caller no longer holds it
+        """
+        now = time.time()
+        with self._lock:
+            db = self._connection()
+            if not self._holds(db, job_id, attempt):
+                return None
+            job = self._get(db, job_id)
+            if job["attempts"] >= job["max_attempts"] or now >= job["expires_at"]:
+                return self._finish_locked(db, job_id, "failed", error=error)
+
+            delay = self.retry_delay * 2 ** (job["attempts"] - 1)
+            db.execute(
+                "UPDATE jobs SET status = 'queued', error = ?, run_after = ?, "
+                "lease_expires_at = NULL, updated_at = ? WHERE id = ?",
+                (error, now + delay, now, job_id),
+            )
+            return self._get(db, job_id)
+
+    def expire(self) -> list:
+        """
+        Expire queued jobs past their TTL, fail abandoned jobs and purge old finished jobs.
+
+        Returns:
+            The jobs that expired or were abandoned, whose webhooks are still to be sent
+        """
+        now = time.time()
+        with self._lock:
+            db = self._connection()
+            self._fail_abandoned(db, now)
+            rows = db.execute(
+                "SELECT id, error FROM jobs WHERE status = 'queued' AND expires_at <= ?", (now,)
+            ).fetchall()
+            # A job requeued after a failed attempt keeps that attempt's error
+            expired = [
+                self._finish_locked(
+                    db,
+                    job_id,
+                    "expired",
+                    error=f"{EXPIRED_RETRY_ERROR}: {error}" if error else EXPIRED_ERROR,
+                )
+                for job_id, error in rows
+            ]
+            abandoned = [
+                self._get(db, row[0])
+                for row in db.execute(
+                    "SELECT id FROM jobs WHERE status = 'failed' AND webhook_status = 'pending'"
+                ).fetchall()
+            ]
+            db.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed', 'expired') "
+                "AND updated_at <= ?",
+                (now - self.retention,),
+            )
+            return expired + abandoned
+
+    def set_webhook_status(self, job_id: str, status: str) -> None:
+        with self._lock:
+            self._connection().execute(
+                "UPDATE jobs SET webhook_status = ? WHERE id = ?", (status, job_id)
+            )
+
+    def stats(self) -> dict:
+        """Number of jobs in each status"""
+        with self._lock:
+            counts = dict(
+                self._connection().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+            )
+        return {status: counts.get(status, 0) for status in STATUSES}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened on first use, so importing the module does not create the file
+        if self._db is None:
+            self._db = sqlite3.connect(
+                self.db_path, timeout=30, isolation_level=None, check_same_thread=False
+            )
+            self._db.row_factory = sqlite3.Row
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+        return self._db
+
+    @staticmethod
+    def _holds(db: sqlite3.Connection, job_id: str, attempt: int) -> bool:
+        # A worker whose lease expired must not overwrite the attempt that replaced it
+        row = db.execute(
+            "SELECT 1 FROM jobs WHERE id = ? AND status = 'running' AND attempts = ?",
+            (job_id, attempt),
+        ).fetchone()
+        return row is not None
+
+    @staticmethod
+    def _fail_abandoned(db: sqlite3.Connection, now: float) -> None:
+        # Jobs whose worker died or hung on the last attempt, or after the TTL, are not
+        # claimed again; their webhook is left to the sweeper
+        db.execute(
+            "UPDATE jobs SET status = 'failed', error = COALESCE(error, ?), "
+            "lease_expires_at = NULL, updated_at = ?, "
+            "webhook_status = CASE WHEN webhook_url IS NULL THEN NULL ELSE 'pending' END "
+            "WHERE status = 'running' AND lease_expires_at <= ? "
+            "AND (attempts >= max_attempts OR expires_at <= ?)",
+            (ABANDONED_ERROR, now, now, now),
+        )
+
+    def _finish_locked(self, db: sqlite3.Connection, job_id: str, status: str, **fields) -> dict:
+        values = {"result": None, "error": None, **fields}
+        db.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, lease_expires_at = NULL, "
+            "updated_at = ? WHERE id = ?",
+            (status, values["result"], values["error"], time.time(), job_id),
+        )
+        return self._get(db, job_id)
+
+    @staticmethod
+    def _get(db: sqlite3.Connection, job_id: str) -> Optional[dict]:
+        row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["request"] = json.loads(job["request"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+class JobRunner:
+    """Pool of asyncio workers draining a JobQueue"""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handler: Callable[[dict], Awaitable[dict]],
+        lease: float,
+        workers: int = JOB_WORKERS,
+        poll_interval: float = JOB_POLL_INTERVAL,
+        webhook_timeout: float = JOB_WEBHOOK_TIMEOUT,
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            queue: Queue to drain
+            handler: Runs a claimed job and returns its result; raises on failure
+            lease: Seconds a claimed job may run before another worker may claim it
+            workers: Number of jobs run concurrently (0 disables the runner)
+            poll_interval: Seconds an idle worker waits before polling again
+            webhook_timeout: Per-attempt timeout of webhook deliveries
+        """
+        self.queue = queue
+        self.handler = handler
+        self.lease = lease
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.webhook_timeout = webhook_timeout
+        self._tasks: list = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def start(self) -> None:
+        """Start the workers and the expiry sweeper on the running event loop"""
+        if self._tasks or self.workers <= 0:
+            return
+        self._wakeup = asyncio.Event()
+        self._client = httpx.AsyncClient(timeout=self.webhook_timeout)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweep()))
+
+    def notify(self) -> None:
+        """Wake idle workers (a job was submitted)"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self) -> None:
+        """Cancel the workers; jobs they were running are claimed again after their lease"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _work(self) -> None:
+        while True:
+            try:
+                job = await asyncio.to_thread(self.queue.claim, self.lease)
+            except Exception as e:
+                # E.g. "database is locked": keep the worker alive and poll again later
+                logger.error(f"Claiming a job failed: {str(e)}")
+                await asyncio.sleep(self.poll_interval)
+                continue
+            if job is None:
+                await self._idle()
+                continue
+            await self._run(job)
+
+    async def _run(self, job: dict) -> None:
+        attempt = job["attempts"]
+        try:
+            result = await self.handler(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Job {job['id']} attempt {attempt} failed: {str(e)}")
+            record = functools.partial(self.queue.fail, job["id"], attempt, str(e))
+        else:
+            record = functools.partial(self.queue.complete, job["id"], attempt, result)
+
+        try:
+            finished = await asyncio.to_thread(record)
+        except Exception as e:
+            # The job is claimed again once its lease expires
+            logger.error(f"Recording job {job['id']} attempt {attempt} failed: {str(e)}")
+            await asyncio.sleep(self.poll_interval)
+            return
+        if finished is None:
+            logger.warning(f"Job {job['id']} attempt {attempt} lost its lease; result dropped")
+        elif finished["status"] in FINAL_STATUSES:
+            await self._deliver(finished)
+
+    async def _idle(self) -> None:
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _sweep(self) -> None:
+        while True:
+            try:
+                for job in await asyncio.to_thread(self.queue.expire):
+                    await self._deliver(job)
+            except Exception as e:
+                logger.error(f"Job sweep failed: {str(e)}")
+            await asyncio.sleep(max(self.poll_interval, 10.0))
+
+    async def _deliver(self, job: dict) -> None:
+        """POST a finished job to its webhook, retrying failed deliveries"""
+        if not job["webhook_url"]:
+            return
+        try:
+            # Checked again: the host may resolve elsewhere than when the job was submitted
+            await asyncio.to_thread(check_webhook_url, job["webhook_url"])
+        except ValueError as e:
+            logger.warning(f"Webhook for job {job['id']} refused: {e}")
+            await asyncio.to_thread(self.queue.set_webhook_status, job["id"], "failed")
+            return
+        payload = job_view(job)
+        for attempt in range(1, WEBHOOK_ATTEMPTS + 1):
+            try:
+                response = await self._client.post(job["webhook_url"], json=payload)
+                response.raise_for_status()
+                status = "delivered"
+                break
+            except httpx.HTTPError as e:
+                logger.warning(f"Webhook for job {job['id']} attempt {attempt} failed: {e}")
+                status = "failed"
+                if attempt < WEBHOOK_ATTEMPTS:
+                    await asyncio.sleep(2**attempt)
+        await asyncio.to_thread(self.queue.set_webhook_status, job["id"], status)
+
+
+def check_webhook_url(
+    url: str,
+    allowed_hosts: List[str] = JOB_WEBHOOK_ALLOWED_HOSTS,
+    allow_private: bool = JOB_WEBHOOK_ALLOW_PRIVATE,
+) -> None:
+    """
+    Refuse webhook URLs that would make the server call internal services.
+
+    Args:
+        url: Webhook URL
+        allowed_hosts: Host names allowed (".example.com" allows its subdomains); empty allows any
+        allow_private: Also allow http and hosts resolving to private or loopback addresses
+
+    Raises:
+        ValueError: The URL is not allowed
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if not host:
+        raise ValueError("Webhook URL has no host")
+    if allowed_hosts and not any(
+        host == allowed or (allowed.startswith(".") and host.endswith(allowed))
+        for allowed in allowed_hosts
+    ):
+        raise ValueError(f"Webhook host '{host}' is not in the allowed hosts")
+    if allow_private:
+        return
+    if parts.scheme != "https":
+        raise ValueError("Webhook URL must use https")
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, parts.port or 443)}
+    except socket.gaierror as e:
+        raise ValueError(f"Webhook host '{host}' does not resolve") from e
+    for address in addresses:
+        # Private, loopback, link-local and reserved ranges are not global
+        if not ipaddress.ip_address(address.split("%")[0]).is_global:
+            raise ValueError(f"Webhook host '{host}' resolves to a non-public address")
+
+
+def job_view(job: dict) -> dict:
+    """The public fields of a job, as returned by the API and sent to webhooks"""
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "max_attempts": job["max_attempts"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+        "expires_at": job["expires_at"],
+        "result": job["result"],
+        "error": job["error"],
+        "webhook_status": job["webhook_status"],
+    }
+
+
+job_queue = JobQueue()
@@ -0,0 +1,314 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import TYPE_CHECKING, Optional
+
+import httpx
+
+if TYPE_CHECKING:
+    from anthropic import Anthropic, AsyncAnthropic
+
+from config import (
+    ANTHROPIC_API_KEY,
+    ANTHROPIC_TIMEOUT,
+    LLM_BACKEND,
+    LLM_KEEPALIVE_EXPIRY,
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE_CONNECTIONS,
+)
+
+
+class LLMConcurrencyLimiter:
+    """
+    Caps the number of in-flight LLM calls across the process.
+
+    Sync callers (CLI and bulk threads) and async callers (the API, on any
+    event loop) draw from one budget of slots and wait in one FIFO queue. A
+    released slot is handed to the oldest waiter: a thread is woken through
+    its event, a coroutine through its future on its own loop.
+    """
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY):
+        """
+        Initialize the limiter.
+
+        Args:
+            max_concurrency: Maximum number of simultaneous LLM calls, sync and async together
+        """
+        self.max_concurrency = max_concurrency
+        self._lock = threading.Lock()
+        self._available = max_concurrency
+        # threading.Event of a waiting thread, or (loop, future) of a waiting coroutine
+        self._waiters: deque = deque()
+        self._stats_lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+        self.peak_in_flight = 0
+        self.total_calls = 0
+        self.total_wait_seconds = 0.0
+
+    @contextmanager
+    def acquire(self):
+        """Hold a slot for the duration of a synchronous LLM call"""
+        self._on_wait()
+        start = time.perf_counter()
+        with self._lock:
+            event = None if self._take() else threading.Event()
+            if event is not None:
+                self._waiters.append(event)
+        if event is not None:
+            event.wait()  # set once a released slot is handed to this thread
+        self._on_acquire(time.perf_counter() - start)
+        try:
+            yield
+        finally:
+            self._on_release()
+            self._release()
+
+    @asynccontextmanager
+    async def aacquire(self):
+        """Hold a slot for the duration of an async LLM call"""
+        loop = asyncio.get_running_loop()
+        self._on_wait()
+        start = time.perf_counter()
+        with self._lock:
+            future = None if self._take() else loop.create_future()
+            if future is not None:
+                self._waiters.append((loop, future))
+        if future is not None:
+            try:
+                await future
+            except asyncio.CancelledError:
+                # A slot handed over just before the cancellation is passed on
+                if future.done() and not future.cancelled():
+                    self._release()
+                self._on_cancel()
+                raise
+        self._on_acquire(time.perf_counter() - start)
+        try:
+            yield
+        finally:
+            self._on_release()
+            self._release()
+
+    def stats(self) -> dict:
+        """Current and cumulative limiter counters"""
+        with self._stats_lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "peak_in_flight": self.peak_in_flight,
+                "total_calls": self.total_calls,
+                "avg_wait_seconds": (
+                    self.total_wait_seconds / self.total_calls if self.total_calls else 0.0
+                ),
+            }
+
+    def _take(self) -> bool:
+        # Called with self._lock held; queued waiters go first
+        if self._available > 0 and not self._waiters:
+            self._available -= 1
+            return True
+        return False
+
+    def _release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                    return
+                loop, future = waiter
+                if future.done():  # cancelled while queued
+                    continue
+                try:
+                    loop.call_soon_threadsafe(self._hand_over, future)
+                    return
+                except RuntimeError:  # its loop is closed
+                    continue
+            self._available += 1
+
+    def _hand_over(self, future: asyncio.Future) -> None:
+        # Runs on the waiter's loop; a waiter cancelled meanwhile passes the slot on
+        if future.cancelled():
+            self._release()
+        else:
+            future.set_result(None)
+
+    def _on_wait(self) -> None:
+        with self._stats_lock:
+            self.waiting += 1
+
+    def _on_acquire(self, waited: float) -> None:
+        with self._stats_lock:
+            self.waiting -= 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.total_calls += 1
+            self.total_wait_seconds += waited
+
+    def _on_release(self) -> None:
+        with self._stats_lock:
+            self.in_flight -= 1
+
+    def _on_cancel(self) -> None:
+        with self._stats_lock:
+            self.waiting -= 1
+
+
+class LLMUsageStats:
+    """Cumulative token usage reported by the API, including prompt cache hits"""
+
+    FIELDS = (
+        "input_tokens",
+        "output_tokens",
+        "cache_read_input_tokens",
+        "cache_creation_input_tokens",
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.totals = dict.fromkeys(self.FIELDS, 0)
+
+    def record(self, usage) -> None:
+        """
+        Add one response's usage.
+
+        Args:
+            usage: message.usage of an Anthropic response (missing fields count as 0)
+        """
+        with self._lock:
+            self.calls += 1
+            for field in self.FIELDS:
+                self.totals[field] += getattr(usage, field, None) or 0
+
+    def stats(self) -> dict:
+        """Token totals and the share of cacheable input served from cache"""
+        with self._lock:
+            totals = dict(self.totals)
+            calls = self.calls
+        cached = totals["cache_read_input_tokens"]
+        prompt_tokens = cached + totals["cache_creation_input_tokens"] + totals["input_tokens"]
+        return {
+            "calls": calls,
+            **totals,
+            "cache_read_ratio": cached / prompt_tokens if prompt_tokens else 0.0,
+        }
+
+
+class LLMClientPool:
+    """Process-wide Anthropic clients sharing pooled keep-alive connections"""
+
+    def __init__(
+        self,
+        max_connections: int = LLM_MAX_CONNECTIONS,
+        max_keepalive_connections: int = LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = LLM_KEEPALIVE_EXPIRY,
+        timeout: float = ANTHROPIC_TIMEOUT,
+    ):
+        """
+        Initialize the pool settings; clients are created on first use.
+
+        Args:
+            max_connections: Maximum open HTTP connections per client
+            max_keepalive_connections: Idle connections kept open for reuse
+            keepalive_expiry: Seconds an idle connection is kept
+            timeout: Request timeout in seconds
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._client = None
+        self._async_client = None
+
+    def get_client(self) -> Optional["Anthropic"]:
+        """Shared synchronous client, or None if no API key is configured"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._build_client()
+        return self._client
+
+    def get_async_client(self) -> Optional["AsyncAnthropic"]:
+        """Shared async client, or None if no API key is configured"""
+        if self._async_client is None:
+            with self._lock:
+                if self._async_client is None:
+                    self._async_client = self._build_async_client()
+        return self._async_client
+
+    async def aclose(self) -> None:
+        """Close both clients and their connection pools"""
+        with self._lock:
+            client, async_client = self._client, self._async_client
+            self._client = self._async_client = None
+        if client is not None and hasattr(client, "close"):
+            client.close()
+        if async_client is not None and hasattr(async_client, "close"):
+            await async_client.close()
+
+    def stats(self) -> dict:
+        """Pool configuration and open connection counts"""
+        return {
+            "backend": LLM_BACKEND,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "sync_connections": _open_connections(self._client),
+            "async_connections": _open_connections(self._async_client),
+        }
+
+    # The SDK is imported with the first client, not when the API module loads
+    def _build_client(self) -> Optional["Anthropic"]:
+        if LLM_BACKEND == "fake":
+            from src.fake_llm import FakeAnthropic
+
+            return FakeAnthropic()
+        if not ANTHROPIC_API_KEY:
+            return None
+        from anthropic import Anthropic, DefaultHttpxClient
+
+        return Anthropic(
+            api_key=ANTHROPIC_API_KEY,
+            timeout=self.timeout,
+            max_retries=0,  # retries are handled by src/retry.py
+            http_client=DefaultHttpxClient(limits=self.limits, timeout=self.timeout),
+        )
+
+    def _build_async_client(self) -> Optional["AsyncAnthropic"]:
+        if LLM_BACKEND == "fake":
+            from src.fake_llm import FakeAsyncAnthropic
+
+            return FakeAsyncAnthropic()
+        if not ANTHROPIC_API_KEY:
+            return None
+        from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+
+        return AsyncAnthropic(
+            api_key=ANTHROPIC_API_KEY,
+            timeout=self.timeout,
+            max_retries=0,  # retries are handled by src/retry.py
+            http_client=DefaultAsyncHttpxClient(limits=self.limits, timeout=self.timeout),
+        )
+
+
+def _open_connections(client) -> Optional[int]:
+    # httpx does not expose pool stats publicly; read them from httpcore if available
+    http_client = getattr(client, "_client", None)
+    pool = getattr(getattr(http_client, "_transport", None), "_pool", None)
+    connections = getattr(pool, "connections", None)
+    return len(connections) if connections is not None else None
+
+
+llm_limiter = LLMConcurrencyLimiter()
+llm_usage = LLMUsageStats()
+llm_client_pool = LLMClientPool()
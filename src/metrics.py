@@ -0,0 +1,341 @@
+"""
+Process metrics in the Prometheus text exposition format.
+
+Graph nodes, LLM calls and HTTP requests record wall-time histograms and
+counters here; existing stats objects (caches, limiter, retries) are exported
+through collectors read at scrape time. GET /metrics serves render().
+
+A request can also collect its own timing breakdown: inside
+`with request_timings() as timings:` every node and LLM call of the run is
+added to `timings`, which the API returns in the response metadata.
+"""
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableLambda
+
+LabelValues = Tuple[str, ...]
+
+NAMESPACE = "title_optimizer"
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # label values -> [per-bucket counts, sum, count]
+        self._values: Dict[LabelValues, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = {key: (list(e[0]), e[1], e[2]) for key, e in self._values.items()}
+
+        lines = []
+        for key, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(
+                    self.labelnames + ("le",), key + (_format_value(float(bound)),)
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and collectors and renders them for scraping"""
+
+    def __init__(self, namespace: str = NAMESPACE):
+        self.namespace = namespace
+        self._metrics: list = []
+        self._collectors: List[Tuple[str, Callable[[], dict], Tuple[str, ...]]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        metric = Counter(f"{self.namespace}_{name}", documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(f"{self.namespace}_{name}", documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_stats(
+        self, prefix: str, stats: Callable[[], dict], counters: Tuple[str, ...] = ()
+    ) -> None:
+        """
+        Export the numeric fields of a stats() dict at scrape time.
+
+        Args:
+            prefix: Metric name prefix (e.g. "pattern_cache")
+            stats: Function returning the stats dict
+            counters: Fields that only ever increase; exported as <field>_total
+                counters, every other numeric field as a gauge
+        """
+        self._collectors.append((prefix, stats, counters))
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+
+        for prefix, stats, counters in self._collectors:
+            for field, value in stats().items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name = f"{self.namespace}_{prefix}_{field}"
+                if field in counters:
+                    name += "_total"
+                    lines.append(f"# TYPE {name} counter")
+                else:
+                    lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+node_seconds = metrics.histogram(
+    "node_duration_seconds", "Wall time of graph node executions", ("node",)
+)
+node_errors = metrics.counter("node_errors_total", "Graph node executions that raised", ("node",))
+llm_call_seconds = metrics.histogram(
+    "llm_call_duration_seconds",
+    "Wall time of LLM calls including retries and backoff",
+    ("operation", "outcome"),
+)
+llm_attempts = metrics.counter(
+    "llm_attempts_total", "LLM request attempts, including retries and hedges", ("operation",)
+)
+llm_tokens = metrics.counter(
+    "llm_tokens_total",
+    "Tokens reported in message.usage (input, output, cache_read, cache_creation)",
+    ("operation", "type"),
+)
+http_request_seconds = metrics.histogram(
+    "http_request_duration_seconds", "Wall time of HTTP requests", ("method", "path", "status")
+)
+
+
+class RequestTimings:
+    """Timing breakdown of one request's graph nodes and LLM calls"""
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self.nodes: List[Tuple[str, float]] = []
+        self.llm_calls: List[dict] = []
+
+    def add_node(self, node: str, seconds: float) -> None:
+        with self._lock:
+            self.nodes.append((node, seconds))
+
+    def add_llm_call(self, call: dict) -> None:
+        with self._lock:
+            self.llm_calls.append(call)
+
+    def summary(self) -> dict:
+        """Node and LLM call timings in milliseconds, in execution order"""
+        with self._lock:
+            return {
+                "total_ms": round(1000 * (time.perf_counter() - self._start), 2),
+                "nodes": [{"node": n, "ms": round(1000 * s, 2)} for n, s in self.nodes],
+                "llm_calls": list(self.llm_calls),
+            }
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def request_timings():
+    """Collect the timings of graph runs started inside the block"""
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        try:
+            _current_timings.reset(token)
+        except ValueError:
+            # A streaming generator closed from another context; nothing to restore
+            pass
+
+
+def _record_node(node: str, seconds: float, failed: bool) -> None:
+    node_seconds.observe(seconds, node=node)
+    if failed:
+        node_errors.inc(node=node)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add_node(node, seconds)
+
+
+def instrument_node(
+    node: str, func: Callable, afunc: Optional[Callable] = None
+) -> "RunnableLambda":
+    """
+    Wrap a graph node so every execution is timed.
+
+    Args:
+        node: Node name used as the metric label
+        func: Synchronous node function
+        afunc: Optional async node function
+
+    Returns:
+        RunnableLambda with the same sync/async implementations
+    """
+    # Imported here so the API can import its metrics before LangChain is loaded
+    from langchain_core.runnables import RunnableLambda
+
+    @functools.wraps(func)
+    def timed(state):
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = func(state)
+            failed = False
+            return result
+        finally:
+            _record_node(node, time.perf_counter() - start, failed)
+
+    if afunc is None:
+        return RunnableLambda(timed)
+
+    @functools.wraps(afunc)
+    async def atimed(state):
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = await afunc(state)
+            failed = False
+            return result
+        finally:
+            _record_node(node, time.perf_counter() - start, failed)
+
+    return RunnableLambda(timed, afunc=atimed)
+
+
+def record_llm_call(operation: str, seconds: float, attempts: int, usage=None) -> None:
+    """
+    Record one LLM call (all its attempts) in the metrics and request timings.
+
+    Args:
+        operation: Operation name (e.g. "Title generation")
+        seconds: Wall time including retries and backoff
+        attempts: Number of attempts made
+        usage: message.usage of the successful response, or None if the call failed
+    """
+    outcome = "ok" if usage is not None else "error"
+    llm_call_seconds.observe(seconds, operation=operation, outcome=outcome)
+    llm_attempts.inc(attempts, operation=operation)
+
+    tokens = {}
+    if usage is not None:
+        tokens = {
+            "input": usage.input_tokens,
+            "output": usage.output_tokens,
+            "cache_read": getattr(usage, "cache_read_input_tokens", None) or 0,
+            "cache_creation": getattr(usage, "cache_creation_input_tokens", None) or 0,
+        }
+        for token_type, count in tokens.items():
+            llm_tokens.inc(count, operation=operation, type=token_type)
+
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add_llm_call(
+            {
+                "operation": operation,
+                "ms": round(1000 * seconds, 2),
+                "attempts": attempts,
+                "outcome": outcome,
+                **{f"{token_type}_tokens": count for token_type, count in tokens.items()},
+            }
+        )
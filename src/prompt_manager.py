@@ -1,26 +1,55 @@
 import os
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+import threading
+from typing import Dict
+
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
 from config import PROMPTS_DIR
 
+TEMPLATE_SUFFIX = ".jinja2"
+
 
 class PromptManager:
     """Manages loading and rendering of Jinja2 prompt templates"""
 
     def __init__(self, templates_dir: str = PROMPTS_DIR):
         """
-        Initialize the prompt manager.
+        Initialize the prompt manager; templates are compiled on first use or by precompile().
 
         Args:
             templates_dir: Directory containing Jinja2 templates
         """
-        os.makedirs(templates_dir, exist_ok=True)
-
+        self.templates_dir = templates_dir
         self.env = Environment(
             loader=FileSystemLoader(templates_dir),
             autoescape=select_autoescape(),
             trim_blocks=True,
             lstrip_blocks=True,
+            auto_reload=False,  # compiled once per process; no stat of the file per render
         )
+        self._templates: Dict[str, Template] = {}
+        self._lock = threading.Lock()
+
+    def precompile(self) -> int:
+        """
+        Compile every template of the directory, so no request pays for it.
+
+        Returns:
+            Number of compiled templates
+        """
+        for name in sorted(os.listdir(self.templates_dir)):
+            if name.endswith(TEMPLATE_SUFFIX):
+                self.get_template(name)
+        return len(self._templates)
+
+    def get_template(self, template_name: str) -> Template:
+        """The compiled template, compiled on first use"""
+        template = self._templates.get(template_name)
+        if template is None:
+            with self._lock:
+                template = self._templates.get(template_name)
+                if template is None:
+                    template = self._templates[template_name] = self.env.get_template(template_name)
+        return template
 
     def render(self, template_name: str, **kwargs) -> str:
         """
@@ -33,8 +62,7 @@ class PromptManager:
         Returns:
             Rendered prompt string
         """
-        template = self.env.get_template(template_name)
-        return template.render(**kwargs)
+        return self.get_template(template_name).render(**kwargs)
 
 
 prompt_manager = PromptManager()
@@ -0,0 +1,430 @@
+"""
+Retry policy for LLM calls.
+
+- Errors are classified: connection errors, timeouts, 408/409/429 and 5xx
+  are retried, other 4xx errors fail immediately.
+- Backoff is exponential with full jitter, capped at RETRY_MAX_DELAY, and a
+  server Retry-After header takes precedence.
+- An optional deadline (unix timestamp) bounds the whole call: attempts get
+  at most the remaining time and no sleep outlives it.
+- A process-wide circuit breaker fails fast while the upstream is unhealthy.
+- Async calls can be hedged: if an attempt is still running after
+  hedge_delay seconds, a duplicate is started and the first success wins.
+  The attempt as a whole is reported to the breaker, and a half-open
+  circuit's single probe is never duplicated.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from config import (
+    ANTHROPIC_TIMEOUT,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    MAX_RETRIES,
+    RETRY_DELAY,
+    RETRY_MAX_DELAY,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+class DeadlineExceeded(Exception):
+    """The request's time budget ran out before the call succeeded"""
+
+
+class CircuitOpenError(Exception):
+    """The circuit breaker is open; the upstream is not called"""
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    Decide whether a failed LLM call is worth retrying.
+
+    Args:
+        exc: Exception raised by the call
+
+    Returns:
+        True for connection errors, timeouts, 408/409/429 and 5xx responses
+    """
+    import anthropic  # loaded by the client already; not imported with the API module
+
+    if isinstance(exc, (anthropic.APIConnectionError, TimeoutError)):  # incl. APITimeoutError
+        return True
+    if isinstance(exc, anthropic.APIStatusError):
+        return exc.status_code in RETRYABLE_STATUS_CODES or exc.status_code >= 500
+    return False
+
+
+def is_upstream_failure(exc: BaseException) -> bool:
+    """Whether an error says the upstream is unhealthy (counted by the circuit breaker)"""
+    import anthropic
+
+    if isinstance(exc, (anthropic.APIConnectionError, TimeoutError)):
+        return True
+    return isinstance(exc, anthropic.APIStatusError) and exc.status_code >= 500
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """
+    Read the server's requested wait from a failed response.
+
+    Args:
+        exc: Exception raised by the call
+
+    Returns:
+        Seconds to wait, or None if the response has no usable Retry-After header
+    """
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(
+    attempt: int,
+    base: float = RETRY_DELAY,
+    cap: float = RETRY_MAX_DELAY,
+    rng: random.Random = random,
+) -> float:
+    """
+    Exponential backoff with full jitter.
+
+    Args:
+        attempt: Zero-based number of the attempt that just failed
+        base: Delay scale in seconds
+        cap: Maximum delay in seconds
+
+    Returns:
+        Seconds to sleep, uniform in [0, min(cap, base * 2**attempt)]
+    """
+    return rng.uniform(0, min(cap, base * 2**attempt))
+
+
+def time_remaining(deadline: Optional[float]) -> Optional[float]:
+    """Seconds left until a unix-timestamp deadline (None if there is no deadline)"""
+    if deadline is None:
+        return None
+    return deadline - time.time()
+
+
+def attempt_timeout(deadline: Optional[float]) -> float:
+    """Timeout for one attempt: the client timeout, shortened to the remaining budget"""
+    remaining = time_remaining(deadline)
+    if remaining is None:
+        return ANTHROPIC_TIMEOUT
+    return max(0.0, min(ANTHROPIC_TIMEOUT, remaining))
+
+
+class CircuitBreaker:
+    """Fails calls fast after repeated upstream failures, then probes for recovery"""
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT,
+    ):
+        """
+        Initialize the breaker in the closed state.
+
+        Args:
+            failure_threshold: Consecutive upstream failures that open the circuit
+            reset_timeout: Seconds to stay open before letting a trial call through
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected_calls = 0
+        self._probe_in_flight = False
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go to the upstream now"""
+        with self._lock:
+            if self.state == "closed":
+                return
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probe_in_flight:
+                # Let exactly one trial call through
+                self._probe_in_flight = True
+                return
+            self.rejected_calls += 1
+            raise CircuitOpenError("LLM upstream circuit is open after repeated failures")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self, exc: BaseException) -> None:
+        with self._lock:
+            self._probe_in_flight = False
+            if not is_upstream_failure(exc):
+                # The upstream answered; a bad request says nothing about its health
+                if self.state == "half_open":
+                    self.state = "closed"
+                return
+            self.consecutive_failures += 1
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def allows_hedge(self) -> bool:
+        """Whether a duplicate attempt may be started (not while probing or open)"""
+        with self._lock:
+            return self.state == "closed"
+
+    def abandon(self) -> None:
+        """Forget a call that was cancelled before it finished"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "times_opened": self.times_opened,
+                "rejected_calls": self.rejected_calls,
+            }
+
+
+class RetryStats:
+    """Counters describing how LLM calls were retried"""
+
+    FIELDS = (
+        "retries",
+        "non_retryable_errors",
+        "deadline_exceeded",
+        "retry_after_honored",
+        "hedges_started",
+        "hedges_won",
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = dict.fromkeys(self.FIELDS, 0)
+
+    def incr(self, field: str) -> None:
+        with self._lock:
+            self.counts[field] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+
+def _next_delay(exc: BaseException, attempt: int) -> float:
+    server_delay = retry_after(exc)
+    if server_delay is not None:
+        retry_stats.incr("retry_after_honored")
+        delay = min(server_delay, RETRY_MAX_DELAY)
+    else:
+        delay = backoff_delay(attempt)
+    logger.warning(
+        f"Attempt {attempt + 1} failed: {type(exc).__name__}; retrying in {delay:.1f} seconds"
+    )
+    return delay
+
+
+def _check_budget(delay: float, deadline: Optional[float], exc: BaseException) -> None:
+    # Give up now rather than sleep past the deadline
+    remaining = time_remaining(deadline)
+    if remaining is not None and remaining <= delay:
+        retry_stats.incr("deadline_exceeded")
+        raise DeadlineExceeded(f"Deadline exceeded after {type(exc).__name__}: {str(exc)}") from exc
+
+
+def call_with_retry(
+    call: Callable[[float], T],
+    operation_name: str = "API call",
+    max_retries: int = MAX_RETRIES,
+    deadline: Optional[float] = None,
+    breaker: Optional[CircuitBreaker] = None,
+) -> T:
+    """
+    Run a synchronous LLM call under the retry policy.
+
+    Args:
+        call: Makes one attempt; receives the attempt timeout in seconds
+        operation_name: Name of operation for logging
+        max_retries: Maximum number of attempts
+        deadline: Unix timestamp after which no attempt is started
+        breaker: Circuit breaker to consult (the shared one by default)
+
+    Returns:
+        The call's result
+
+    Raises:
+        The last error, DeadlineExceeded or CircuitOpenError
+    """
+    breaker = breaker or llm_circuit_breaker
+
+    for attempt in range(max_retries):
+        timeout = attempt_timeout(deadline)
+        if timeout <= 0:
+            retry_stats.incr("deadline_exceeded")
+            raise DeadlineExceeded(f"Deadline exceeded before {operation_name} attempt")
+        breaker.before_call()
+        logger.info(f"{operation_name} (attempt {attempt + 1}/{max_retries})...")
+
+        try:
+            result = call(timeout)
+        except Exception as e:
+            breaker.record_failure(e)
+            if not is_retryable(e):
+                retry_stats.incr("non_retryable_errors")
+                raise
+            if attempt == max_retries - 1:
+                raise
+            delay = _next_delay(e, attempt)
+            _check_budget(delay, deadline, e)
+            retry_stats.incr("retries")
+            time.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
+
+
+async def acall_with_retry(
+    call: Callable[[float], Awaitable[T]],
+    operation_name: str = "API call",
+    max_retries: int = MAX_RETRIES,
+    deadline: Optional[float] = None,
+    hedge_delay: float = 0.0,
+    on_retry: Optional[Callable[[int], None]] = None,
+    breaker: Optional[CircuitBreaker] = None,
+) -> T:
+    """
+    Run an async LLM call under the retry policy, optionally hedged.
+
+    Args:
+        call: Makes one attempt; receives the attempt timeout in seconds
+        operation_name: Name of operation for logging
+        max_retries: Maximum number of attempts
+        deadline: Unix timestamp after which no attempt is started
+        hedge_delay: Start a duplicate attempt if the first has not finished
+            after this many seconds (0 disables hedging)
+        on_retry: Called with the 1-based attempt number before each retry
+        breaker: Circuit breaker to consult (the shared one by default)
+
+    Returns:
+        The call's result
+
+    Raises:
+        The last error, DeadlineExceeded or CircuitOpenError
+    """
+    breaker = breaker or llm_circuit_breaker
+
+    for attempt in range(max_retries):
+        timeout = attempt_timeout(deadline)
+        if timeout <= 0:
+            retry_stats.incr("deadline_exceeded")
+            raise DeadlineExceeded(f"Deadline exceeded before {operation_name} attempt")
+        breaker.before_call()
+        logger.info(f"{operation_name} (attempt {attempt + 1}/{max_retries})...")
+        if on_retry is not None and attempt > 0:
+            on_retry(attempt + 1)
+
+        try:
+            # Bound the whole attempt (not just each socket read); a timeout here
+            # is retried like any other if the deadline leaves time for it
+            attempt_call = _hedged(call, timeout, hedge_delay, breaker) if hedge_delay else call
+            result = await asyncio.wait_for(attempt_call(timeout), timeout)
+        except asyncio.CancelledError:
+            breaker.abandon()
+            raise
+        except Exception as e:
+            # The attempt as a whole (both legs, or its timeout) settles the breaker,
+            # so a timed-out half-open probe reopens the circuit instead of wedging it
+            breaker.record_failure(e)
+            if not is_retryable(e):
+                retry_stats.incr("non_retryable_errors")
+                raise
+            if attempt == max_retries - 1:
+                raise
+            delay = _next_delay(e, attempt)
+            _check_budget(delay, deadline, e)
+            retry_stats.incr("retries")
+            await asyncio.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
+
+
+def _hedged(
+    call: Callable[[float], Awaitable[T]],
+    timeout: float,
+    hedge_delay: float,
+    breaker: CircuitBreaker,
+) -> Callable[[float], Awaitable[T]]:
+    async def run(_timeout: float) -> T:
+        primary = asyncio.ensure_future(call(timeout))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            # A half-open circuit lets a single probe through; never duplicate it
+            if not done and breaker.allows_hedge():
+                retry_stats.incr("hedges_started")
+                tasks.add(asyncio.ensure_future(call(timeout)))
+
+            error: Optional[BaseException] = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            retry_stats.incr("hedges_won")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return run
+
+
+llm_circuit_breaker = CircuitBreaker()
+retry_stats = RetryStats()
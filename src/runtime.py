@@ -0,0 +1,152 @@
+"""
+The process runtime: resident dataset, LLM client, prompt templates and agent graphs.
+
+The API module imports only what it needs to accept requests (FastAPI,
+pydantic, the stats objects). pandas, LangGraph, LangChain and the Anthropic
+SDK are imported here, when the runtime loads, and the graph of a generation
+mode is only built once a request uses it. The lifespan loads the runtime
+before serving, or in the background with FAST_START; requests that need it
+await runtime.wait(). A failed load is reported (load_error) and tried again
+by the next request that needs the runtime.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from config import DATA_LOAD_MODE, FAST_START, GENERATION_MODE
+from src.llm_client import llm_client_pool
+from src.prompt_manager import prompt_manager
+
+logger = logging.getLogger(__name__)
+
+GRAPH_NAMES = ("separate", "fused", "fast", "analysis")  # generation modes and the batch graph
+
+
+class Runtime:
+    """Loads the dataset and builds the agent graphs once per process"""
+
+    def __init__(self):
+        self.load_seconds: Optional[float] = None
+        self.load_error: Optional[str] = None
+        self._graphs: Dict[str, Any] = {}
+        self._graph_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._watching = False
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether the runtime has loaded"""
+        return self.load_seconds is not None
+
+    def start(self) -> asyncio.Task:
+        """Start loading in a worker thread, unless it is loading or loaded; serving continues"""
+        if self._task is None:
+            self._task = asyncio.create_task(asyncio.to_thread(self._load))
+            self._task.add_done_callback(self._on_load_done)
+        return self._task
+
+    async def wait(self) -> None:
+        """Wait until the runtime has loaded, starting it if needed; raises its load error"""
+        if not self.is_ready:
+            # Shielded: a cancelled request must not cancel the load others wait for
+            await asyncio.shield(self.start())
+
+    def graph(self, name: str):
+        """
+        The compiled graph, built on first use.
+
+        Args:
+            name: A generation mode ("separate", "fused", "fast") or "analysis"
+
+        Returns:
+            The compiled LangGraph graph
+        """
+        graph = self._graphs.get(name)
+        if graph is None:
+            with self._graph_lock:
+                graph = self._graphs.get(name)
+                if graph is None:
+                    graph = self._graphs[name] = _build_graph(name)
+        return graph
+
+    def stats(self) -> dict:
+        """Startup mode, load time, the last load error and the graphs built so far"""
+        return {
+            "fast_start": FAST_START,
+            "ready": self.is_ready,
+            "load_seconds": self.load_seconds or 0.0,
+            "load_error": self.load_error,
+            "graphs": [name for name in GRAPH_NAMES if name in self._graphs],
+        }
+
+    def checkpoint_stats(self) -> dict:
+        """Checkpointer stats, empty until the runtime has loaded"""
+        if not self.is_ready:
+            return {}
+        from src.checkpoints import checkpointer
+
+        return checkpointer.stats()
+
+    def close(self) -> None:
+        """Stop the dataset watcher"""
+        if self._watching:
+            from src.data_store import data_store
+
+            data_store.stop_watcher()
+
+    def _on_load_done(self, task: asyncio.Task) -> None:
+        error = None if task.cancelled() else task.exception()
+        if task.cancelled() or error is not None:
+            # Forget the failed attempt so the next request loads again
+            self.load_error = "cancelled" if error is None else f"{type(error).__name__}: {error}"
+            self._task = None
+            logger.error(f"Runtime load failed: {self.load_error}")
+        else:
+            self.load_error = None
+
+    def _load(self) -> None:
+        start = time.perf_counter()
+        if DATA_LOAD_MODE != "streaming" and not self._watching:
+            from src.data_store import data_store
+            from src.ingest import invalidate_derived
+            from src.title_stats import title_stats_index
+
+            logger.info("Loading dataset...")
+            data_store.load()
+            # Records other workers ingest reach this one through the watcher
+            data_store.add_change_listener(invalidate_derived)
+            # Title statistics of every channel, rebuilt in the background for each new file
+            data_store.add_load_listener(title_stats_index.rebuild)
+            title_stats_index.rebuild(data_store.snapshot)
+            data_store.start_watcher()
+            self._watching = True
+
+        # Create the shared LLM client (and its connection pool) once per process
+        llm_client_pool.get_async_client()
+        logger.info(f"Compiled {prompt_manager.precompile()} prompt templates")
+
+        logger.info("Building agent graph...")
+        self.graph(GENERATION_MODE)
+        self.load_seconds = time.perf_counter() - start
+        logger.info(f"Agent graph ready! (loaded in {self.load_seconds:.2f}s)")
+
+
+def _build_graph(name: str):
+    from src.checkpoints import checkpointer
+    from src.graph import (
+        build_agent_graph,
+        build_analysis_graph,
+        build_fast_graph,
+        build_fused_graph,
+    )
+
+    if name == "analysis":
+        return build_analysis_graph()
+    builders = {"separate": build_agent_graph, "fused": build_fused_graph, "fast": build_fast_graph}
+    return builders[name](checkpointer=checkpointer)
+
+
+runtime = Runtime()
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesces concurrent async calls with the same key into one execution"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Run fn, or wait for the in-flight run started by another caller with the same key.
+
+        The run is a separate task: a caller that is cancelled stops waiting
+        without cancelling the run for the others. Errors reach every caller.
+
+        Args:
+            key: Identity of the work (e.g. a cache key)
+            fn: Starts the work; only called when no run for key is in flight
+
+        Returns:
+            Tuple of (result, True if the result came from another caller's run)
+        """
+        task = self._calls.get(key)
+        coalesced = task is not None
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        with self._lock:
+            if coalesced:
+                self.coalesced += 1
+            else:
+                self.executions += 1
+
+        return await asyncio.shield(task), coalesced
+
+    def stats(self) -> dict:
+        """Runs started, callers that joined a run, and runs in flight"""
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here so an error nobody awaits is not logged
+
+
+# Pattern analyses by pattern cache key
+pattern_analysis_flight = SingleFlight()
+# Whole /generate-titles runs by identical request
+title_request_flight = SingleFlight()
@@ -1,21 +1,32 @@
-from typing import List, Optional
-import pandas as pd
+from typing import Annotated, List, Optional
 from pydantic import BaseModel, Field
 from langchain_core.messages import BaseMessage
+from langgraph.graph.message import add_messages
+
+from config import DEFAULT_RANKING_METRIC
 
 
 class AgentState(BaseModel):
-    """State object passed between agents in the graph"""
+    """
+    State object passed between agents in the graph
+
+    Nodes return only the fields they change; messages are appended by the
+    add_messages reducer. Channel rows stay in the data store, so the state
+    only carries the compact top performer records (video_id, title,
+    views_in_period, median_ratio and zscore) the prompts need.
+    """
 
-    messages: List[BaseMessage] = Field(default_factory=list)
-    raw_data: Optional[pd.DataFrame] = None
-    top_performers: Optional[pd.DataFrame] = None
-    filtered_data: str = ""
+    messages: Annotated[List[BaseMessage], add_messages] = Field(default_factory=list)
+    top_performers: List[dict] = Field(default_factory=list)
+    title_stats: dict = Field(default_factory=dict)  # local statistics of the top titles
+    total_videos: int = 0
+    dataset_version: str = ""
     title_patterns: str = ""
+    patterns_cached: bool = False
     channel_id: str = ""
     top_n: int = 10
+    ranking_metric: str = DEFAULT_RANKING_METRIC
     new_video_summary: str = ""
     generated_titles: str = ""
-
-    class Config:
-        arbitrary_types_allowed = True
+    titles_cached: bool = False  # titles reused from a near-duplicate summary
+    deadline: Optional[float] = None  # unix timestamp bounding the run's LLM calls
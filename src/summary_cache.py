@@ -0,0 +1,289 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import (
+    SUMMARY_CACHE_ENABLED,
+    SUMMARY_CACHE_MAX_ENTRIES,
+    SUMMARY_CACHE_NUM_PERM,
+    SUMMARY_CACHE_THRESHOLD,
+)
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def normalize_summary(summary: str) -> str:
+    """
+    Normalize a summary so trivially different resubmits compare equal.
+
+    Lowercases, drops punctuation and collapses whitespace.
+
+    Args:
+        summary: Video summary as submitted
+
+    Returns:
+        Normalized text
+    """
+    return " ".join(_WORD_RE.findall(summary.lower()))
+
+
+def summary_scope(channel_id: str, title_patterns: str, top_performers: List[dict]) -> str:
+    """
+    Build the cache scope for a channel's title generation prompt.
+
+    Titles are only reusable while the prompt context is unchanged, so the
+    pattern analysis and the example titles are hashed into the scope: a new
+    analysis or ranking starts an empty scope.
+
+    Args:
+        channel_id: YouTube channel ID
+        title_patterns: Pattern analysis the titles were generated from
+        top_performers: Top performer records with 'title'
+
+    Returns:
+        Scope string
+    """
+    digest = hashlib.blake2b(title_patterns.encode(), digest_size=12)
+    for video in top_performers:
+        digest.update(b"\0" + video["title"].encode())
+    return f"{channel_id}:{digest.hexdigest()}"
+
+
+class MinHasher:
+    """MinHash signatures over word unigrams and bigrams"""
+
+    def __init__(self, num_perm: int = SUMMARY_CACHE_NUM_PERM, seed: int = 1):
+        """
+        Initialize the hash permutations.
+
+        Args:
+            num_perm: Signature length (more is more accurate and slower)
+            seed: Seed of the permutation coefficients
+        """
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, normalized: str) -> np.ndarray:
+        """
+        Compute the MinHash signature of a normalized summary.
+
+        Args:
+            normalized: Text from normalize_summary
+
+        Returns:
+            uint64 array of length num_perm
+        """
+        words = normalized.split()
+        shingles = set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+        if not shingles:
+            return np.full(self.num_perm, _MERSENNE_PRIME, dtype=np.uint64)
+
+        hashes = np.fromiter(
+            (
+                int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "little")
+                for s in shingles
+            ),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        # (a * x + b) mod p for every permutation and shingle; fits in uint64 as a, x < 2**32
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return permuted.min(axis=0)
+
+
+class _Scope:
+    """Entries of one channel/prompt scope with their signatures stacked for scanning"""
+
+    def __init__(self):
+        self.exact: Dict[str, int] = {}  # normalized text -> entry id
+        self.ids: List[int] = []
+        self.signatures: List[np.ndarray] = []
+        self._matrix: Optional[np.ndarray] = None
+
+    def add(self, entry_id: int, normalized: str, signature: np.ndarray) -> None:
+        self.exact[normalized] = entry_id
+        self.ids.append(entry_id)
+        self.signatures.append(signature)
+        self._matrix = None
+
+    def remove(self, entry_id: int, normalized: str) -> None:
+        if self.exact.get(normalized) == entry_id:
+            del self.exact[normalized]
+        index = self.ids.index(entry_id)
+        del self.ids[index]
+        del self.signatures[index]
+        self._matrix = None
+
+    def nearest(self, signature: np.ndarray) -> Tuple[Optional[int], float]:
+        if not self.ids:
+            return None, 0.0
+        if self._matrix is None:
+            self._matrix = np.stack(self.signatures)
+        similarity = (self._matrix == signature).mean(axis=1)
+        best = int(similarity.argmax())
+        return self.ids[best], float(similarity[best])
+
+
+class SummaryCache:
+    """Size-bounded LRU cache of generated titles, matched by summary similarity"""
+
+    def __init__(
+        self,
+        max_entries: int = SUMMARY_CACHE_MAX_ENTRIES,
+        threshold: float = SUMMARY_CACHE_THRESHOLD,
+        num_perm: int = SUMMARY_CACHE_NUM_PERM,
+        enabled: bool = SUMMARY_CACHE_ENABLED,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of summaries kept across all scopes
+            threshold: Estimated Jaccard similarity at which a summary counts as a duplicate
+            num_perm: MinHash signature length
+            enabled: False turns get/set into no-ops
+        """
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.enabled = enabled
+        self._hasher = MinHasher(num_perm)
+        # entry id -> (scope, normalized summary, titles), in LRU order
+        self._entries: "OrderedDict[int, Tuple[str, str, str]]" = OrderedDict()
+        self._scopes: Dict[str, _Scope] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, scope: str, summary: str) -> Optional[str]:
+        """
+        Look up titles generated for the same or a near-duplicate summary.
+
+        Args:
+            scope: Scope from summary_scope
+            summary: Video summary
+
+        Returns:
+            The cached titles, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        normalized = normalize_summary(summary)
+        with self._lock:
+            entries = self._scopes.get(scope)
+            entry_id = entries.exact.get(normalized) if entries else None
+            if entry_id is not None:
+                self.exact_hits += 1
+                return self._touch(entry_id)
+
+        # Hashing happens outside the lock; only the scan needs it
+        signature = self._hasher.signature(normalized)
+        with self._lock:
+            entries = self._scopes.get(scope)
+            if entries is not None:
+                entry_id, similarity = entries.nearest(signature)
+                if entry_id is not None and similarity >= self.threshold:
+                    self.near_hits += 1
+                    return self._touch(entry_id)
+            self.misses += 1
+            return None
+
+    def set(self, scope: str, summary: str, titles: str) -> None:
+        """
+        Store the titles generated for a summary.
+
+        Args:
+            scope: Scope from summary_scope
+            summary: Video summary
+            titles: Generated titles text
+        """
+        if not self.enabled:
+            return
+
+        normalized = normalize_summary(summary)
+        signature = self._hasher.signature(normalized)
+        with self._lock:
+            entries = self._scopes.setdefault(scope, _Scope())
+            previous = entries.exact.get(normalized)
+            if previous is not None:
+                self._delete(previous)
+                entries = self._scopes.setdefault(scope, _Scope())
+
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (scope, normalized, titles)
+            entries.add(entry_id, normalized, signature)
+
+            while len(self._entries) > self.max_entries:
+                self._delete(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_channel(self, channel_id: str) -> int:
+        """
+        Drop all titles cached for a channel.
+
+        Args:
+            channel_id: YouTube channel ID
+
+        Returns:
+            Number of cached summaries dropped
+        """
+        prefix = f"{channel_id}:"
+        with self._lock:
+            entry_ids = [
+                entry_id
+                for scope, entries in self._scopes.items()
+                if scope.startswith(prefix)
+                for entry_id in entries.ids
+            ]
+            for entry_id in entry_ids:
+                self._delete(entry_id)
+            return len(entry_ids)
+
+    def clear(self) -> None:
+        """Drop all cached titles"""
+        with self._lock:
+            self._entries.clear()
+            self._scopes.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            hits = self.exact_hits + self.near_hits
+            lookups = hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "scopes": len(self._scopes),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "exact_hits": self.exact_hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
+
+    def _touch(self, entry_id: int) -> str:
+        self._entries.move_to_end(entry_id)
+        return self._entries[entry_id][2]
+
+    def _delete(self, entry_id: int) -> None:
+        scope, normalized, _ = self._entries.pop(entry_id)
+        entries = self._scopes[scope]
+        entries.remove(entry_id, normalized)
+        if not entries.ids:
+            del self._scopes[scope]
+
+
+summary_cache = SummaryCache()
@@ -0,0 +1,429 @@
+"""
+Deterministic title statistics, computed locally with vectorized pandas.
+
+A channel's top titles are compared with all of its titles: length
+distribution, use of title features (questions, numbers, colons, ...),
+keywords over-represented in the top titles (lift) and n-grams weighted by
+the views of the top titles using them. Any number of channels is computed
+in one pass, so the same code serves a request's channel and bulk runs over
+the whole dataset.
+
+The statistics of every channel are precomputed in the background for each
+loaded snapshot (TitleStatsIndex), so a request is a lookup; a top_n that is
+not precomputed, a channel changed by ingestion, or a request arriving before
+the build finished computes its channel on demand (TitleStatsCache).
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import TITLE_STATS_CACHE_ENTRIES, TITLE_STATS_PRECOMPUTE_TOP_N, TITLE_STATS_TOP_K
+from src.data_store import ChannelChanges, DatasetSnapshot, data_store
+from src.prompt_manager import prompt_manager
+
+logger = logging.getLogger(__name__)
+
+# Title features: name -> regex matched anywhere in the title
+TITLE_FEATURES = {
+    "question": r"\?",
+    "number": r"\d",
+    "colon": r":",
+    "brackets": r"[\(\[]",
+    "exclamation": r"!",
+    "caps_word": r"\b[A-Z]{2,}\b",
+    "you": r"(?i)\byou(?:r|'re)?\b",
+    "how_to": r"(?i)\bhow to\b",
+}
+TOKEN_PATTERN = r"[a-z0-9][a-z0-9']*"
+STOPWORDS = frozenset(
+    "a an the and or but nor of to in on at by for with from into about as is are was were be "
+    "been it its this that these those i me my we our vs so than then".split()
+)
+MIN_KEYWORD_TITLES = 2  # top titles a keyword must appear in to be reported
+
+_FEATURE_REGEXES = {name: re.compile(pattern) for name, pattern in TITLE_FEATURES.items()}
+
+
+def top_n_mask(ranked: pd.DataFrame, top_n: int) -> np.ndarray:
+    """
+    Mark each channel's top videos in rows ranked as by rank_channels.
+
+    Args:
+        ranked: Rows grouped by channel, best first within each channel
+        top_n: Videos per channel to mark
+
+    Returns:
+        Boolean array, True for the first top_n rows of each channel
+    """
+    return ranked.groupby("channel_id", sort=False).cumcount().to_numpy() < top_n
+
+
+def title_stats(df: pd.DataFrame, top_k: int = TITLE_STATS_TOP_K) -> Dict[str, dict]:
+    """
+    Compute the title statistics of every channel in df.
+
+    Args:
+        df: Rows with 'channel_id', 'title', 'views_in_period' and a boolean
+            'is_top' marking the titles to compare with the channel's
+        top_k: Keywords and n-grams reported per channel
+
+    Returns:
+        Per channel with at least one top title, a dict of title counts,
+        length, features, keywords and ngrams (see _channel_dict)
+    """
+    df = df[["channel_id", "title", "views_in_period", "is_top"]].reset_index(drop=True)
+    titles = df["title"].fillna("").astype(str)
+    channel = df["channel_id"]
+    is_top = df["is_top"].to_numpy(dtype=bool)
+
+    # Per-title features, then their share of the top titles and of all titles
+    values = titles.to_numpy(dtype=object)
+    features = pd.DataFrame(
+        {
+            name: np.fromiter((bool(regex.search(title)) for title in values), bool, len(values))
+            for name, regex in _FEATURE_REGEXES.items()
+        }
+    )
+    features["chars"] = titles.str.len()
+    features["words"] = titles.str.split().str.len().fillna(0)
+    all_titles = features.groupby(channel, sort=False)
+    top_titles = features[is_top].groupby(channel[is_top], sort=False)
+    channel_share = all_titles[list(TITLE_FEATURES)].mean()
+    top_share = top_titles[list(TITLE_FEATURES)].mean()
+    top_chars = top_titles["chars"].quantile([0.25, 0.5, 0.75]).unstack()
+    top_words = top_titles["words"].median()
+    channel_chars = all_titles["chars"].median()
+    channel_words = all_titles["words"].median()
+
+    counts = pd.DataFrame(
+        {
+            "channel": channel.value_counts(sort=False),
+            "top": channel[is_top].value_counts(sort=False),
+            "top_views": df.loc[is_top, "views_in_period"].groupby(channel[is_top]).sum(),
+        }
+    ).dropna()
+    keywords, ngrams = _term_stats(titles, df, is_top, counts, top_k)
+
+    # Plain dicts per channel: indexing pandas objects once per channel is the slow part
+    top_chars, top_share, channel_share = (
+        frame.to_dict("index") for frame in (top_chars, top_share, channel_share)
+    )
+    top_words, channel_chars, channel_words = (
+        series.to_dict() for series in (top_words, channel_chars, channel_words)
+    )
+    return {
+        channel_id: _channel_dict(
+            n_top=int(n_top),
+            n_channel=int(n_channel),
+            top_chars=top_chars[channel_id],
+            top_words=top_words[channel_id],
+            channel_chars=channel_chars[channel_id],
+            channel_words=channel_words[channel_id],
+            top_share=top_share[channel_id],
+            channel_share=channel_share[channel_id],
+            keywords=keywords.get(channel_id, []),
+            ngrams=ngrams.get(channel_id, []),
+        )
+        for channel_id, n_channel, n_top in zip(counts.index, counts["channel"], counts["top"])
+    }
+
+
+def _term_stats(
+    titles: pd.Series, df: pd.DataFrame, is_top: np.ndarray, counts: pd.DataFrame, top_k: int
+):
+    """Per channel, the top keywords by lift and the top n-grams by share of top views"""
+    tokens = titles.str.lower().str.findall(TOKEN_PATTERN).explode().dropna()
+    rows = tokens.index.to_numpy()
+    words = tokens.to_numpy(dtype=object)
+    stop = pd.Series(words).isin(STOPWORDS).to_numpy()
+
+    # Bigrams of adjacent tokens of the same title, unless both are stopwords
+    adjacent = (rows[1:] == rows[:-1]) & ~(stop[1:] & stop[:-1])
+    bigrams = words[:-1][adjacent] + " " + words[1:][adjacent]
+    terms = pd.DataFrame(
+        {
+            "row": np.concatenate([rows[~stop], rows[:-1][adjacent]]),
+            "term": np.concatenate([words[~stop], bigrams]),
+            "unigram": np.repeat([True, False], [int((~stop).sum()), len(bigrams)]),
+        }
+    )
+    terms = terms.drop_duplicates(["row", "term"])  # a term counts once per title
+    terms["channel_id"] = df["channel_id"].to_numpy()[terms["row"]]
+    terms["is_top"] = is_top[terms["row"]]
+    terms["top_views"] = np.where(
+        terms["is_top"], df["views_in_period"].to_numpy()[terms["row"]], 0
+    )
+
+    by_term = terms.groupby(["channel_id", "term"], sort=False)
+    stats = pd.DataFrame(
+        {
+            "titles": by_term.size(),
+            "top_titles": by_term["is_top"].sum(),
+            "top_views": by_term["top_views"].sum(),
+            "unigram": by_term["unigram"].first(),
+        }
+    )
+    stats = stats[stats["top_titles"] > 0].reset_index()
+    channel_counts = counts.reindex(stats["channel_id"])
+    stats["top_share"] = stats["top_titles"].to_numpy() / channel_counts["top"].to_numpy()
+    stats["lift"] = stats["top_share"] / (
+        stats["titles"].to_numpy() / channel_counts["channel"].to_numpy()
+    )
+    stats["view_share"] = stats["top_views"].to_numpy() / np.maximum(
+        channel_counts["top_views"].to_numpy(), 1
+    )
+
+    keywords = stats[stats["unigram"] & (stats["top_titles"] >= MIN_KEYWORD_TITLES)]
+    keywords = keywords.sort_values(
+        ["channel_id", "lift", "top_titles"], ascending=[True, False, False], kind="stable"
+    )
+    ngrams = stats.sort_values(["channel_id", "view_share"], ascending=[True, False], kind="stable")
+    return (
+        _top_terms(keywords, top_k, ["term", "top_share", "lift"]),
+        _top_terms(ngrams, top_k, ["term", "view_share"]),
+    )
+
+
+def _top_terms(stats: pd.DataFrame, top_k: int, columns: List[str]) -> Dict[str, List[dict]]:
+    top = stats.groupby("channel_id", sort=False).head(top_k)
+    terms: Dict[str, List[dict]] = {}
+    for channel_id, *values in zip(top["channel_id"], *(top[column] for column in columns)):
+        terms.setdefault(channel_id, []).append(
+            {column: _round(value) for column, value in zip(columns, values)}
+        )
+    return terms
+
+
+def _channel_dict(
+    n_top: int,
+    n_channel: int,
+    top_chars: Dict[float, float],
+    top_words: float,
+    channel_chars: float,
+    channel_words: float,
+    top_share: Dict[str, float],
+    channel_share: Dict[str, float],
+    keywords: List[dict],
+    ngrams: List[dict],
+) -> dict:
+    return {
+        "top_titles": n_top,
+        "channel_titles": n_channel,
+        "length": {
+            "top_chars": [_round(top_chars[q]) for q in (0.25, 0.5, 0.75)],
+            "top_words": _round(top_words),
+            "channel_chars": _round(channel_chars),
+            "channel_words": _round(channel_words),
+        },
+        "features": {
+            name: {
+                "top": _round(top_share[name]),
+                "channel": _round(channel_share[name]),
+                "lift": _lift(top_share[name], channel_share[name]),
+            }
+            for name in TITLE_FEATURES
+        },
+        "keywords": keywords,
+        "ngrams": ngrams,
+    }
+
+
+def _lift(top_share: float, channel_share: float) -> Optional[float]:
+    # Features no title of the channel uses have no lift
+    return _round(top_share / channel_share) if channel_share > 0 else None
+
+
+def _round(value):
+    if isinstance(value, str):
+        return value
+    return round(float(value), 3)
+
+
+def format_title_stats(stats: dict) -> str:
+    """Render title statistics as the compact text given to the LLM"""
+    return prompt_manager.render("title_stats.jinja2", stats=stats).strip()
+
+
+class TitleStatsIndex:
+    """Title statistics of every channel, precomputed in bulk for the loaded snapshot"""
+
+    def __init__(self, top_ns: List[int] = TITLE_STATS_PRECOMPUTE_TOP_N):
+        """
+        Initialize an empty index.
+
+        Args:
+            top_ns: top_n values whose top titles are precomputed for every channel
+        """
+        self.top_ns = sorted(set(top_ns))
+        self._stats: Dict[str, Dict[tuple, dict]] = {}  # channel_id -> top video ids -> stats
+        self._base_version: Optional[str] = None
+        self._pending: Optional[DatasetSnapshot] = None
+        self._changed: set = set()  # channels ingested since the pending snapshot
+        self._builder: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.build_seconds = 0.0
+
+    def rebuild(self, snapshot: DatasetSnapshot) -> None:
+        """Precompute the statistics of a snapshot in a background thread (the latest wins)"""
+        if not self.top_ns:
+            return
+        with self._lock:
+            self._pending = snapshot
+            self._changed = set()
+            if self._builder is None:
+                self._builder = threading.Thread(
+                    target=self._build_pending, name="title-stats-index", daemon=True
+                )
+                self._builder.start()
+
+    def get(self, channel_id: str, top_ids: tuple, version: str) -> Optional[dict]:
+        """
+        Precomputed statistics of a channel's top titles.
+
+        Args:
+            channel_id: YouTube channel ID
+            top_ids: Video IDs of the request's top performers, best first
+            version: Dataset version the top performers were ranked in
+
+        Returns:
+            The statistics, or None if they are not precomputed for this version
+        """
+        with self._lock:
+            if version.split("+")[0] != self._base_version:
+                return None
+            return self._stats.get(channel_id, {}).get(top_ids)
+
+    def invalidate_channels(self, changes: ChannelChanges) -> None:
+        """Drop the channels whose videos changed; their titles are no longer the snapshot's"""
+        with self._lock:
+            for channel_id in changes:
+                self._stats.pop(channel_id, None)
+                self._changed.add(channel_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "channels": len(self._stats),
+                "top_n": self.top_ns,
+                "builds": self.builds,
+                "build_seconds": self.build_seconds,
+            }
+
+    def build(self, snapshot: DatasetSnapshot) -> int:
+        """
+        Precompute the statistics of a snapshot in this thread and serve them.
+
+        Args:
+            snapshot: Loaded dataset snapshot
+
+        Returns:
+            Number of channels precomputed
+        """
+        start = time.perf_counter()
+        stats = _snapshot_stats(snapshot, self.top_ns)
+        with self._lock:
+            for channel_id in self._changed:
+                stats.pop(channel_id, None)
+            self._stats = stats
+            self._base_version = snapshot.base_version
+            self.builds += 1
+            self.build_seconds = time.perf_counter() - start
+        logger.info(
+            f"Precomputed title statistics of {len(stats)} channels in {self.build_seconds:.2f}s"
+        )
+        return len(stats)
+
+    def _build_pending(self) -> None:
+        while True:
+            with self._lock:
+                snapshot, self._pending = self._pending, None
+                if snapshot is None:
+                    self._builder = None
+                    return
+            try:
+                self.build(snapshot)
+            except Exception as e:
+                logger.error(f"Precomputing title statistics failed: {str(e)}")
+
+
+def _snapshot_stats(snapshot: DatasetSnapshot, top_ns: List[int]) -> Dict[str, Dict[tuple, dict]]:
+    ranked = snapshot.all_rows(["channel_id", "video_id", "title", "views_in_period"])
+    stats: Dict[str, Dict[tuple, dict]] = {}
+    for top_n in top_ns:
+        is_top = top_n_mask(ranked, top_n)
+        top_ids = ranked.loc[is_top].groupby("channel_id", sort=False)["video_id"].agg(tuple)
+        for channel_id, channel_stats in title_stats(ranked.assign(is_top=is_top)).items():
+            stats.setdefault(channel_id, {})[top_ids[channel_id]] = channel_stats
+    return stats
+
+
+class TitleStatsCache:
+    """Title statistics of recently requested channels, per dataset version and top videos"""
+
+    def __init__(self, max_entries: int = TITLE_STATS_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, channel_id: str, top_performers: List[dict], version: str) -> dict:
+        """
+        Title statistics of a channel's top performers against all its titles.
+
+        Args:
+            channel_id: YouTube channel ID
+            top_performers: Top performer records of the request
+            version: Dataset version the records were ranked in
+
+        Returns:
+            The channel's statistics, as from title_stats
+        """
+        top_ids = tuple(video["video_id"] for video in top_performers)
+        stats = title_stats_index.get(channel_id, top_ids, version)
+        if stats is not None:
+            return stats
+
+        key = (version, channel_id, top_ids)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        stats = _channel_stats(channel_id, top_performers, top_ids)
+        with self._lock:
+            self._entries[key] = stats
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _channel_stats(channel_id: str, top_performers: List[dict], top_ids: tuple) -> dict:
+    channel = None
+    if data_store.is_loaded:
+        channel = data_store.get_channel(channel_id, ["title", "views_in_period", "video_id"])
+    if channel is None:
+        # Without the resident dataset the top titles are their own baseline
+        channel = pd.DataFrame(top_performers, columns=["title", "views_in_period", "video_id"])
+
+    df = channel.assign(channel_id=channel_id, is_top=channel["video_id"].isin(top_ids))
+    stats = title_stats(df).get(channel_id)
+    if stats is None:
+        # A reload swapped the snapshot since the ranking; the top titles are their own baseline
+        df = pd.DataFrame(top_performers, columns=["title", "views_in_period"])
+        stats = title_stats(df.assign(channel_id=channel_id, is_top=True))[channel_id]
+    return stats
+
+
+title_stats_index = TitleStatsIndex()
+title_stats_cache = TitleStatsCache()
@@ -1,140 +1,349 @@
-from typing import List, Optional, Tuple
+import logging
 import time
+from typing import Callable, List, Optional, Tuple, Union
 import pandas as pd
-from anthropic import Anthropic
+from anthropic import Anthropic, AsyncAnthropic
 from langchain_core.messages import AIMessage
+from langgraph.config import get_config, get_stream_writer
 
 from config import (
-    ANTHROPIC_API_KEY,
     ANTHROPIC_MODEL,
-    ANTHROPIC_TIMEOUT,
     MAX_RETRIES,
-    RETRY_DELAY,
     DEFAULT_MAX_TOKENS,
+    LLM_HEDGE_DELAY,
+    PROMPT_CACHING,
+    PROMPT_CACHE_MIN_TOKENS,
 )
-from src.state import AgentState
+from src.llm_client import llm_client_pool, llm_limiter, llm_usage
+from src.metrics import record_llm_call
+from src.retry import (
+    CircuitOpenError,
+    DeadlineExceeded,
+    acall_with_retry,
+    call_with_retry,
+    is_retryable,
+)
+
+logger = logging.getLogger(__name__)
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def get_anthropic_client() -> Optional[Anthropic]:
+    """
+    Return the process-wide Anthropic client with pooled keep-alive connections.
+
+    Returns:
+        Anthropic client or None if API key not found
+    """
+    return llm_client_pool.get_client()
 
 
-def get_anthropic_client(timeout: float = ANTHROPIC_TIMEOUT) -> Optional[Anthropic]:
+def get_async_anthropic_client() -> Optional[AsyncAnthropic]:
     """
-    Initialize and return Anthropic client with API key from environment.
+    Return the process-wide async Anthropic client with pooled keep-alive connections.
+
+    Returns:
+        AsyncAnthropic client or None if API key not found
+    """
+    return llm_client_pool.get_async_client()
+
+
+def _estimate_tokens(text: str) -> int:
+    # Rough English token count, good enough to tell whether a prefix is cacheable
+    return len(text) // 4
+
+
+def build_claude_request(
+    prompt: str,
+    system: Optional[str] = None,
+    context: Optional[str] = None,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    temperature: float = 0.7,
+    tool: Optional[dict] = None,
+) -> dict:
+    """
+    Build the messages.create arguments with the stable parts as a cacheable prefix.
+
+    The request is ordered system prompt -> context -> prompt. The system
+    prompt and context each end with a cache_control breakpoint, so calls
+    sharing them (e.g. many summaries for one channel) read the prefix from
+    Anthropic's prompt cache and only the prompt is processed as new input.
+    A breakpoint is only set once the prefix up to it reaches
+    PROMPT_CACHE_MIN_TOKENS (estimated at ~4 characters per token); the API
+    does not cache shorter prefixes, so marking them would have no effect.
 
     Args:
-        timeout: Request timeout in seconds
+        prompt: Per-call suffix (e.g. the video summary)
+        system: Static instructions shared by every call of an operation
+        context: Data shared by calls for the same channel
+        max_tokens: Maximum tokens in response
+        temperature: Sampling temperature
+        tool: Tool definition the model is forced to call, for structured output
 
     Returns:
-        Anthropic client or None if API key not found
+        Keyword arguments for client.messages.create / stream
     """
-    if not ANTHROPIC_API_KEY:
-        return None
-    return Anthropic(api_key=ANTHROPIC_API_KEY, timeout=timeout)
+    prefix_tokens = _estimate_tokens(system or "")
+
+    def breakpoint_for(tokens: int) -> dict:
+        cacheable = PROMPT_CACHING and tokens >= PROMPT_CACHE_MIN_TOKENS
+        return {"cache_control": CACHE_CONTROL} if cacheable else {}
+
+    content = []
+    if context:
+        context_tokens = prefix_tokens + _estimate_tokens(context)
+        content.append({"type": "text", "text": context, **breakpoint_for(context_tokens)})
+    content.append({"type": "text", "text": prompt})
+
+    request = dict(
+        model=ANTHROPIC_MODEL,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        messages=[{"role": "user", "content": content}],
+    )
+    if system:
+        request["system"] = [{"type": "text", "text": system, **breakpoint_for(prefix_tokens)}]
+    if tool:
+        request["tools"] = [tool]
+        request["tool_choice"] = {"type": "tool", "name": tool["name"]}
+    return request
 
 
 def call_claude_with_retry(
     client: Anthropic,
     prompt: str,
+    system: Optional[str] = None,
+    context: Optional[str] = None,
     max_retries: int = MAX_RETRIES,
     max_tokens: int = DEFAULT_MAX_TOKENS,
     temperature: float = 0.7,
     operation_name: str = "API call",
-) -> Tuple[str, bool]:
+    deadline: Optional[float] = None,
+    tool: Optional[dict] = None,
+) -> Tuple[Union[str, dict], bool]:
     """
-    Call Claude API with exponential backoff retry logic.
+    Call Claude API under the retry policy in src/retry.py.
 
     Args:
         client: Anthropic client instance
-        prompt: The prompt to send to Claude
-        max_retries: Maximum number of retry attempts
+        prompt: The per-call part of the prompt
+        system: Static instructions, sent as a cacheable system prompt
+        context: Shared context, sent as a cacheable block before the prompt
+        max_retries: Maximum number of attempts
+        max_tokens: Maximum tokens in response
+        temperature: Sampling temperature
+        operation_name: Name of operation for logging
+        deadline: Unix timestamp bounding all attempts and backoff sleeps
+        tool: Tool the model must call; its input is returned instead of text
+
+    Returns:
+        Tuple of (response text or tool input, success_boolean); on failure
+        the first element is the error message
+    """
+    request = build_claude_request(prompt, system, context, max_tokens, temperature, tool)
+    attempts = 0
+
+    def attempt(timeout: float):
+        nonlocal attempts
+        attempts += 1
+        with llm_limiter.acquire():
+            return client.messages.create(**request, timeout=timeout)
+
+    start = time.perf_counter()
+    try:
+        message = call_with_retry(attempt, operation_name, max_retries, deadline)
+    except Exception as e:
+        record_llm_call(operation_name, time.perf_counter() - start, attempts)
+        return _error_message(e, max_retries), False
+
+    record_llm_call(operation_name, time.perf_counter() - start, attempts, message.usage)
+    llm_usage.record(message.usage)
+    logger.info(f"{operation_name} complete!")
+    return _response_output(message, tool)
+
+
+async def acall_claude_with_retry(
+    client: AsyncAnthropic,
+    prompt: str,
+    system: Optional[str] = None,
+    context: Optional[str] = None,
+    max_retries: int = MAX_RETRIES,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    temperature: float = 0.7,
+    operation_name: str = "API call",
+    on_event: Optional[Callable[[dict], None]] = None,
+    deadline: Optional[float] = None,
+    hedge_delay: float = LLM_HEDGE_DELAY,
+    tool: Optional[dict] = None,
+) -> Tuple[Union[str, dict], bool]:
+    """
+    Async version of call_claude_with_retry that never blocks the event loop.
+
+    Args:
+        client: AsyncAnthropic client instance
+        prompt: The per-call part of the prompt
+        system: Static instructions, sent as a cacheable system prompt
+        context: Shared context, sent as a cacheable block before the prompt
+        max_retries: Maximum number of attempts
         max_tokens: Maximum tokens in response
         temperature: Sampling temperature
         operation_name: Name of operation for logging
+        on_event: If given, the response is streamed and this callback receives
+            {"type": "token", "text": ...} for each text delta and
+            {"type": "retry", "attempt": ...} before a retried attempt
+        deadline: Unix timestamp bounding all attempts and backoff sleeps
+        hedge_delay: Seconds before a duplicate request is raced against a slow
+            one (0 disables; streamed calls are never hedged)
+        tool: Tool the model must call; its input is returned instead of text
+            (a streamed tool call sends no token events)
 
     Returns:
-        Tuple of (response_text, success_boolean)
+        Tuple of (response text or tool input, success_boolean); on failure
+        the first element is the error message
     """
-    retry_delay = RETRY_DELAY
+    request = build_claude_request(prompt, system, context, max_tokens, temperature, tool)
+    attempts = 0
+
+    async def attempt(timeout: float):
+        nonlocal attempts
+        attempts += 1
+        async with llm_limiter.aacquire():
+            if on_event is None:
+                return await client.messages.create(**request, timeout=timeout)
+            async with client.messages.stream(**request, timeout=timeout) as stream:
+                async for text in stream.text_stream:
+                    on_event({"type": "token", "text": text})
+                return await stream.get_final_message()
 
-    for attempt in range(max_retries):
-        try:
-            print(f"{operation_name} (attempt {attempt + 1}/{max_retries})...")
+    def on_retry(attempt_number: int) -> None:
+        if on_event is not None:
+            on_event({"type": "retry", "attempt": attempt_number})
 
-            message = client.messages.create(
-                model=ANTHROPIC_MODEL,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                messages=[{"role": "user", "content": prompt}],
-            )
+    start = time.perf_counter()
+    try:
+        message = await acall_with_retry(
+            attempt,
+            operation_name,
+            max_retries,
+            deadline,
+            # Hedging a stream would interleave tokens from two responses
+            hedge_delay=hedge_delay if on_event is None else 0.0,
+            on_retry=on_retry,
+        )
+    except Exception as e:
+        record_llm_call(operation_name, time.perf_counter() - start, attempts)
+        return _error_message(e, max_retries), False
 
-            response_text = message.content[0].text
-            print(f"{operation_name} complete!")
-            return response_text, True
+    record_llm_call(operation_name, time.perf_counter() - start, attempts, message.usage)
+    llm_usage.record(message.usage)
+    logger.info(f"{operation_name} complete!")
+    return _response_output(message, tool)
 
-        except Exception as e:
-            error_type = type(e).__name__
 
-            if attempt < max_retries - 1:
-                wait_time = retry_delay * (2**attempt)
-                print(f"Attempt {attempt + 1} failed: {error_type}")
-                print(f"Retrying in {wait_time} seconds...")
-                time.sleep(wait_time)
-            else:
-                error_msg = (
-                    f"Error after {max_retries} attempts: {error_type}\n\n" f"Details: {str(e)}\n\n"
-                )
-                return error_msg, False
+def _response_output(message, tool: Optional[dict]) -> Tuple[Union[str, dict], bool]:
+    if tool is None:
+        return message.content[0].text, True
+    for block in message.content:
+        if block.type == "tool_use" and block.name == tool["name"]:
+            return block.input, True
+    return f"Error: response has no {tool['name']} call (stop reason {message.stop_reason})", False
 
-    return "Unexpected error in retry logic", False
 
+def _error_message(exc: Exception, max_retries: int) -> str:
+    error_type = type(exc).__name__
+    if isinstance(exc, (DeadlineExceeded, CircuitOpenError)) or not is_retryable(exc):
+        return f"Error: {error_type}\n\nDetails: {str(exc)}\n\n"
+    return f"Error after {max_retries} attempts: {error_type}\n\nDetails: {str(exc)}\n\n"
 
-def add_message_to_state(state: AgentState, content: str) -> AgentState:
+
+def get_token_writer(stage: str) -> Optional[Callable[[dict], None]]:
     """
-    Helper function to add a message to state and return updated state.
+    Return a callback that forwards LLM stream events to the graph's custom stream.
+
+    Token streaming is opt-in per run via config={"configurable": {"stream_tokens": True}}.
+
+    Args:
+        stage: Stage name attached to every event (e.g. "pattern_analysis")
+
+    Returns:
+        Event callback, or None when the current run did not request token streaming
+    """
+    try:
+        config = get_config()
+    except RuntimeError:
+        # Called outside a graph run
+        return None
+
+    if not config.get("configurable", {}).get("stream_tokens"):
+        return None
+
+    writer = get_stream_writer()
+    return lambda event: writer({"stage": stage, **event})
+
+
+def add_message_to_state(content: str) -> dict:
+    """
+    Helper function to build a state update that appends a message.
 
     Args:
-        state: Current agent state
         content: Message content to add
 
     Returns:
-        Updated AgentState with new message
-    """
-    return AgentState(
-        messages=state.messages + [AIMessage(content=content)],
-        raw_data=state.raw_data,
-        top_performers=state.top_performers,
-        filtered_data=state.filtered_data,
-        title_patterns=state.title_patterns,
-        generated_titles=state.generated_titles,
-        channel_id=state.channel_id,
-        top_n=state.top_n,
-        new_video_summary=state.new_video_summary,
-    )
+        Partial state update; the messages reducer appends the new message
+    """
+    return {"messages": [AIMessage(content=content)]}
+
+
+def top_performer_records(df: pd.DataFrame) -> List[dict]:
+    """
+    Convert ranked videos to the compact records kept in the agent state.
+
+    Args:
+        df: DataFrame with 'video_id', 'title', 'views_in_period', 'median_ratio'
+            and 'zscore' columns
+
+    Returns:
+        List of dicts with video_id, title, views_in_period (as int), median_ratio and zscore
+    """
+    return [
+        {
+            "video_id": video_id,
+            "title": title,
+            "views_in_period": int(views),
+            "median_ratio": float(median_ratio),
+            "zscore": float(zscore),
+        }
+        for video_id, title, views, median_ratio, zscore in zip(
+            df["video_id"], df["title"], df["views_in_period"], df["median_ratio"], df["zscore"]
+        )
+    ]
 
 
-def format_titles_with_views(df: pd.DataFrame) -> List[dict]:
+def format_titles_with_views(top_performers: List[dict]) -> List[dict]:
     """
-    Format DataFrame titles with view counts for template rendering.
+    Format top performer titles with view counts for template rendering.
 
     Args:
-        df: DataFrame with 'title' and 'views_in_period' columns
+        top_performers: Records with 'title' and 'views_in_period'
 
     Returns:
         List of dicts with title and view count
     """
-    titles = []
-    for idx, row in df.iterrows():
-        titles.append({"title": row["title"], "views": row["views_in_period"]})
-    return titles
+    return [
+        {"title": video["title"], "views": video["views_in_period"]} for video in top_performers
+    ]
 
 
-def get_example_titles(df: pd.DataFrame, n: int = 5) -> List[str]:
+def get_example_titles(top_performers: List[dict], n: int = 5) -> List[str]:
     """
-    Extract top N titles from DataFrame for examples.
+    Extract top N titles from the top performer records for examples.
 
     Args:
-        df: Pandas DataFrame with 'title' column
+        top_performers: Records with a 'title' key, best first
         n: Number of titles to extract
 
     Returns:
         List of title strings
     """
-    return [row["title"] for _, row in df.head(n).iterrows()]
+    return [video["title"] for video in top_performers[:n]]
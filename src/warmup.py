@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from typing import List
+
+from config import (
+    DEFAULT_TOP_N,
+    PATTERN_CACHE_WARMUP_CHANNELS,
+    PATTERN_CACHE_WARMUP_CONCURRENCY,
+)
+from src.agents import (
+    aextract_title_patterns_with_llm_node,
+    identify_top_performers_node,
+    load_channel_data_node,
+)
+from src.data_store import data_store
+from src.state import AgentState
+
+logger = logging.getLogger(__name__)
+
+
+def busiest_channels(limit: int) -> List[str]:
+    """
+    Return the channels with the most videos in the resident dataset.
+
+    Args:
+        limit: Maximum number of channels to return
+
+    Returns:
+        Channel IDs ordered by video count, largest first
+    """
+    sizes = data_store.channel_sizes()
+    return sorted(sizes, key=sizes.get, reverse=True)[:limit]
+
+
+async def warm_channel(channel_id: str, top_n: int = DEFAULT_TOP_N) -> bool:
+    """
+    Run the analysis stages for one channel so its pattern analysis is cached.
+
+    Args:
+        channel_id: YouTube channel ID
+        top_n: Number of top videos to analyze
+
+    Returns:
+        True if a pattern analysis is now available for the channel
+    """
+    state = AgentState(channel_id=channel_id, top_n=top_n)
+    # Nodes return partial updates; messages are not needed here
+    state = state.model_copy(update=load_channel_data_node(state))
+    state = state.model_copy(update=identify_top_performers_node(state))
+    update = await aextract_title_patterns_with_llm_node(state)
+    return bool(update.get("title_patterns"))
+
+
+async def warm_pattern_cache(
+    limit: int = PATTERN_CACHE_WARMUP_CHANNELS,
+    top_n: int = DEFAULT_TOP_N,
+    concurrency: int = PATTERN_CACHE_WARMUP_CONCURRENCY,
+) -> int:
+    """
+    Pre-compute pattern analyses for the busiest channels in the background.
+
+    Args:
+        limit: Number of channels to warm
+        top_n: Number of top videos to analyze per channel
+        concurrency: Maximum number of channels analyzed at once
+
+    Returns:
+        Number of channels with a cached analysis after warm-up
+    """
+    channels = busiest_channels(limit)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def warm(channel_id: str) -> bool:
+        async with semaphore:
+            try:
+                return await warm_channel(channel_id, top_n)
+            except Exception as e:
+                logger.error(f"Warm-up failed for channel {channel_id}: {str(e)}")
+                return False
+
+    results = await asyncio.gather(*(warm(channel_id) for channel_id in channels))
+    warmed = sum(results)
+    logger.info(f"Pattern cache warm-up complete: {warmed}/{len(channels)} channels")
+    return warmed
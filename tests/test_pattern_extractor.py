@@ -0,0 +1,37 @@
+import asyncio
+import time
+
+from src.agents import pattern_extractor
+from src.agents.pattern_extractor import DEADLINE_MESSAGE, aextract_title_patterns_with_llm_node
+from src.cache import pattern_cache
+from src.state import AgentState
+
+TOP_PERFORMERS = [{"title": "Driving an EV across the desert", "views_in_period": 120000}]
+
+
+def test_coalesced_follower_outlives_leader_deadline(monkeypatch):
+    deadlines = []
+
+    async def slow_analysis(deadline, **kwargs):
+        deadlines.append(deadline)
+        await asyncio.sleep(0.3)
+        return "Use questions.", True
+
+    monkeypatch.setattr(pattern_extractor, "get_async_anthropic_client", lambda: object())
+    monkeypatch.setattr(pattern_extractor, "acall_claude_with_retry", slow_analysis)
+    pattern_cache.clear()
+
+    async def run():
+        now = time.time()
+        states = [
+            AgentState(channel_id="UCtest", top_n=1, top_performers=TOP_PERFORMERS, deadline=d)
+            for d in (now + 0.1, now + 5)
+        ]
+        return now, await asyncio.gather(*map(aextract_title_patterns_with_llm_node, states))
+
+    now, (leader, follower) = asyncio.run(run())
+
+    assert len(deadlines) == 1  # one shared call
+    assert deadlines[0] >= now + 5  # not bounded by the leader's deadline
+    assert leader["messages"][0].content == DEADLINE_MESSAGE
+    assert follower["title_patterns"] == "Use questions."
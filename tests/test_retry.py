@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+import pytest
+
+from src.retry import CircuitBreaker, CircuitOpenError, acall_with_retry
+
+
+async def slow_call(timeout: float) -> str:
+    await asyncio.sleep(5)
+    return "late"
+
+
+def open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.1)
+    breaker.record_failure(TimeoutError())
+    assert breaker.state == "open"
+    time.sleep(0.15)  # past reset_timeout: the next call is the half-open probe
+    return breaker
+
+
+def test_timed_out_hedged_probe_reopens_circuit():
+    breaker = open_breaker()
+    with pytest.raises(TimeoutError):
+        asyncio.run(
+            acall_with_retry(
+                slow_call,
+                max_retries=1,
+                deadline=time.time() + 0.3,
+                hedge_delay=0.05,
+                breaker=breaker,
+            )
+        )
+
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    time.sleep(0.15)
+    breaker.before_call()  # a new probe is let through once reset_timeout passed
+
+
+def test_half_open_probe_is_not_hedged():
+    breaker = open_breaker()
+    legs = 0
+
+    async def call(timeout: float) -> str:
+        nonlocal legs
+        legs += 1
+        await asyncio.sleep(0.2)
+        return "ok"
+
+    result = asyncio.run(acall_with_retry(call, max_retries=1, hedge_delay=0.05, breaker=breaker))
+
+    assert result == "ok"
+    assert legs == 1
+    assert breaker.state == "closed"
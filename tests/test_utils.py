@@ -0,0 +1,26 @@
+from config import PROMPT_CACHE_MIN_TOKENS
+from src.utils import build_claude_request
+
+LONG_TEXT = "word " * PROMPT_CACHE_MIN_TOKENS  # ~1,280 estimated tokens
+
+
+def test_short_system_prompt_gets_no_breakpoint():
+    request = build_claude_request("prompt", system="Short instructions")
+
+    assert "cache_control" not in request["system"][0]
+    assert "cache_control" not in request["messages"][0]["content"][0]
+
+
+def test_breakpoint_counts_the_whole_prefix():
+    request = build_claude_request("prompt", system="Short instructions", context=LONG_TEXT)
+
+    context, prompt = request["messages"][0]["content"]
+    assert "cache_control" not in request["system"][0]
+    assert "cache_control" in context
+    assert "cache_control" not in prompt
+
+
+def test_long_system_prompt_gets_breakpoint():
+    request = build_claude_request("prompt", system=LONG_TEXT)
+
+    assert "cache_control" in request["system"][0]